@@ -0,0 +1,16 @@
+# Local development config (gitignored).
+key_file = "/tmp/fake_key.json"
+PRIV_SA = "sa@example.iam.gserviceaccount.com"
+ON_DUTY_DRIVE_ID = "on-duty-drive"
+MAIN_DRIVE_ID = "main-drive"
+MASTER_LOG_SPREADSHEET_ID = "master-log"
+TEMPLATE_SHEET_ID = "template-sheet"
+PARENT_FOLDER_ID = "parent-folder"
+INTERNAL_API_KEY = "internal-key"
+CLOCK_IN_ENTRY_NAME = "Clock In"
+CLOCK_OUT_ENTRY_NAME = "Clock Out"
+SLACK_WEBHOOK_URL = "https://hooks.slack.com/services/test"
+SLACK_TOKEN = "xoxb-test"
+SLACK_ON_DUTY_CHANNEL_ID = "C123"
+O_APIkey = "key"
+O_APIuser = "user"
@@ -1,17 +1,26 @@
 """
 Generate decrypted credentials from AWS KMS.
+
+Secrets are resolved lazily on first use and cached for the life of the container,
+so requests that never need a secret never pay for decrypting it. Access them as
+attributes of this module (e.g. credentials.SLACK_TOKEN) at the point of use, or
+resolve several at once in parallel with prefetch().
+
+Set SECRETS_BACKEND=local to read plaintext secrets from the JSON file at
+LOCAL_SECRETS_FILE instead of AWS. LOCAL_SECRETS_LATENCY_MS adds a delay to each
+lookup so cold-start cost can be measured offline.
 """
 
 from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
 import os
 import json
+import threading
+import time
 import boto3
 from botocore.exceptions import ClientError
 
 
-ENCRYPTED_OP_APIKEY = os.environ["O_APIkey"]
-ENCRYPTED_OP_APIUSER = os.environ["O_APIuser"]
-
 MASTER_LOG_SPREADSHEET_ID = os.environ["MASTER_LOG_SPREADSHEET_ID"]
 TEMPLATE_SHEET_ID = os.environ["TEMPLATE_SHEET_ID"]
 PARENT_FOLDER_ID = os.environ["PARENT_FOLDER_ID"]
@@ -19,82 +28,164 @@ ON_DUTY_DRIVE_ID = os.environ["ON_DUTY_DRIVE_ID"]
 MAIN_DRIVE_ID = os.environ["MAIN_DRIVE_ID"]
 
 SLACK_WEBHOOK_URL = os.environ["SLACK_WEBHOOK_URL"]
-ENCRYPTED_SLACK_TOKEN = os.environ["SLACK_TOKEN"]
 SLACK_ON_DUTY_CHANNEL_ID = os.environ["SLACK_ON_DUTY_CHANNEL_ID"]
 
 PRIV_SA = os.environ["PRIV_SA"]
-ENCRYPTED_INTERNAL_API_KEY = os.environ["INTERNAL_API_KEY"]
 
 CLOCK_IN_ENTRY_NAME = os.environ["CLOCK_IN_ENTRY_NAME"]
 CLOCK_OUT_ENTRY_NAME = os.environ["CLOCK_OUT_ENTRY_NAME"]
 
+# Secret name: environment variable holding the KMS encrypted value
+KMS_SECRETS = {
+    "O_APIkey": "O_APIkey",
+    "O_APIuser": "O_APIuser",
+    "INTERNAL_API_KEY": "INTERNAL_API_KEY",
+    "SLACK_TOKEN": "SLACK_TOKEN",
+}
+
+# Secret name: (Secrets Manager secret id, region)
+SECRETS_MANAGER_SECRETS = {
+    "key_file": ("google-timesheet-bot-private-key", "us-east-2"),
+}
+
+
+class AWSSecretsBackend:
+    """
+    Decrypt secrets with KMS and fetch them from Secrets Manager.
+    One client is created per service and shared by all lookups.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _client(self, service_name: str, region_name: str | None = None):
+        with self._lock:
+            key = (service_name, region_name)
+            if key not in self._clients:
+                self._clients[key] = boto3.session.Session().client(
+                    service_name=service_name, region_name=region_name
+                )
+
+            return self._clients[key]
+
+    def decrypt(self, name: str) -> str:
+        """Decrypt a KMS encrypted environment variable."""
+        return (
+            self._client("kms")
+            .decrypt(
+                CiphertextBlob=b64decode(os.environ[KMS_SECRETS[name]]),
+                EncryptionContext={
+                    "LambdaFunctionName": os.environ["AWS_LAMBDA_FUNCTION_NAME"]
+                },
+            )["Plaintext"]
+            .decode("utf-8")
+        )
+
+    def get_secret(self, name: str) -> dict:
+        """Get a JSON secret from Secrets Manager."""
+        secret_name, region_name = SECRETS_MANAGER_SECRETS[name]
+
+        try:
+            get_secret_value_response = self._client(
+                "secretsmanager", region_name
+            ).get_secret_value(SecretId=secret_name)
+        except ClientError as e:
+            # For a list of exceptions thrown, see
+            # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
+            raise e
+
+        return json.loads(get_secret_value_response["SecretString"])
+
+
+class LocalSecretsBackend:
+    """
+    Read plaintext secrets from a local JSON file. Stand-in for AWS when
+    measuring cold-start cost offline.
+    """
+
+    def __init__(self, path: str, latency_ms: float = 0):
+        with open(path, encoding="utf-8") as f:
+            self.secrets = json.load(f)
+        self.latency_ms = latency_ms
+
+    def _lookup(self, name: str):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        return self.secrets[name]
+
+    def decrypt(self, name: str) -> str:
+        """Get a plaintext secret."""
+        return self._lookup(name)
+
+    def get_secret(self, name: str) -> dict:
+        """Get a JSON secret."""
+        return self._lookup(name)
+
+
+class SecretsProvider:
+    """
+    Resolve each secret once, on first use. Safe to call from multiple threads.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._values = {}
+        self._locks = {name: threading.Lock() for name in self.names()}
+
+    @staticmethod
+    def names() -> list[str]:
+        """Names of all known secrets."""
+        return list(KMS_SECRETS) + list(SECRETS_MANAGER_SECRETS)
+
+    def get(self, name: str):
+        """Get a secret, resolving it if this is the first use."""
+        if name in self._values:
+            return self._values[name]
+
+        with self._locks[name]:
+            if name not in self._values:
+                if name in KMS_SECRETS:
+                    self._values[name] = self.backend.decrypt(name)
+                else:
+                    self._values[name] = self.backend.get_secret(name)
+
+        return self._values[name]
+
+    def prefetch(self, names: list[str]):
+        """Resolve several secrets in parallel."""
+        pending = [name for name in names if name not in self._values]
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            list(executor.map(self.get, pending))
+
+
+def _get_backend():
+    if os.environ.get("SECRETS_BACKEND") == "local":
+        return LocalSecretsBackend(
+            os.environ["LOCAL_SECRETS_FILE"],
+            float(os.environ.get("LOCAL_SECRETS_LATENCY_MS", 0)),
+        )
+
+    return AWSSecretsBackend()
+
+
+provider = SecretsProvider(_get_backend())
+
+
+def prefetch(*names: str):
+    """
+    Resolve the named secrets in parallel, or every secret if no names are given.
+    """
+    provider.prefetch(list(names) or SecretsProvider.names())
+
+
+def __getattr__(name: str):
+    # Secrets are resolved on first attribute access (PEP 562)
+    if name in SecretsProvider.names():
+        return provider.get(name)
 
-def get_secret():
-
-    secret_name = "google-timesheet-bot-private-key"
-    region_name = "us-east-2"
-
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
-    client = session.client(service_name="secretsmanager", region_name=region_name)
-
-    try:
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-    except ClientError as e:
-        # For a list of exceptions thrown, see
-        # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
-        raise e
-
-    secret = get_secret_value_response["SecretString"]
-
-    return json.loads(secret)
-
-
-# Decrypt code should run once and variables stored outside of the function
-# handler so that these are decrypted once per container
-
-O_APIkey = (
-    boto3.client("kms")
-    .decrypt(
-        CiphertextBlob=b64decode(ENCRYPTED_OP_APIKEY),
-        EncryptionContext={
-            "LambdaFunctionName": os.environ["AWS_LAMBDA_FUNCTION_NAME"]
-        },
-    )["Plaintext"]
-    .decode("utf-8")
-)
-
-O_APIuser = (
-    boto3.client("kms")
-    .decrypt(
-        CiphertextBlob=b64decode(ENCRYPTED_OP_APIUSER),
-        EncryptionContext={
-            "LambdaFunctionName": os.environ["AWS_LAMBDA_FUNCTION_NAME"]
-        },
-    )["Plaintext"]
-    .decode("utf-8")
-)
-
-INTERNAL_API_KEY = (
-    boto3.client("kms")
-    .decrypt(
-        CiphertextBlob=b64decode(ENCRYPTED_INTERNAL_API_KEY),
-        EncryptionContext={
-            "LambdaFunctionName": os.environ["AWS_LAMBDA_FUNCTION_NAME"]
-        },
-    )["Plaintext"]
-    .decode("utf-8")
-)
-
-SLACK_TOKEN = (
-    boto3.client("kms")
-    .decrypt(
-        CiphertextBlob=b64decode(ENCRYPTED_SLACK_TOKEN),
-        EncryptionContext={
-            "LambdaFunctionName": os.environ["AWS_LAMBDA_FUNCTION_NAME"]
-        },
-    )["Plaintext"]
-    .decode("utf-8")
-)
-
-key_file = get_secret()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,410 @@
+"""
+Key-value stores with expiry, used for per-container and persistent caches.
+
+MemoryStore lives for the life of the Lambda container. The persistent store is
+selected with the CACHE_BACKEND environment variable:
+
+- "dynamodb" stores entries in the DynamoDB table CACHE_TABLE, which has a
+  "namespace" partition key, a "key" sort key and "expiresAt" as its TTL
+  attribute. It is shared by every container.
+- "sqlite" stores entries in the file at CACHE_PATH, by default in /tmp, so it
+  only outlives warm invocations of one container. It is a local stand-in.
+
+When CACHE_BACKEND is unset, only the memory layer is used.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import boto3
+from botocore.exceptions import ClientError
+
+
+class MemoryStore:
+    """
+    Thread-safe in-memory store with per-entry expiry. If maxsize is set, the
+    least recently used entries are evicted once it is exceeded.
+    """
+
+    def __init__(self, maxsize: int | None = None):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: Any, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Any | None:
+        """Get the value for key, or None if it is missing or expired."""
+        with self._lock:
+            return self._get(key, time.time())
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store value for ttl seconds."""
+        with self._lock:
+            self._set(key, value, time.time() + ttl)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Store value only if key is missing or expired. Returns True if it was stored.
+        """
+        with self._lock:
+            now = time.time()
+            if self._get(key, now) is not None:
+                return False
+
+            self._set(key, value, now + ttl)
+            return True
+
+    def delete(self, key: str):
+        """Remove key from the store."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def items(self) -> dict:
+        """Get every entry that hasn't expired, as a {key: value} map."""
+        with self._lock:
+            now = time.time()
+            return {
+                key: value
+                for key, (value, expires_at) in self._entries.items()
+                if expires_at > now
+            }
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteStore:
+    """
+    Store backed by a SQLite file. Values must be JSON serializable.
+    Entries are namespaced so several caches can share one file.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key: str) -> Any | None:
+        """Get the value for key, or None if it is missing or expired."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, time.time()),
+            ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store value for ttl seconds."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), time.time() + ttl),
+            )
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Store value only if key is missing or expired. Returns True if it was stored.
+        """
+        now = time.time()
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO cache VALUES (?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE
+                SET value = excluded.value, expires_at = excluded.expires_at
+                WHERE cache.expires_at <= ?
+                """,
+                (self.namespace, key, json.dumps(value), now + ttl, now),
+            )
+
+            return cursor.rowcount == 1
+
+    def delete(self, key: str):
+        """Remove key from the store."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+
+    def items(self) -> dict:
+        """Get every entry in this namespace that hasn't expired."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, value FROM cache WHERE namespace = ? AND expires_at > ?",
+                (self.namespace, time.time()),
+            ).fetchall()
+
+        return {key: json.loads(value) for key, value in rows}
+
+    def clear(self):
+        """Remove all entries in this namespace."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+
+class DynamoDBStore:
+    """
+    Store backed by a DynamoDB table, shared by every container. Values must be
+    JSON serializable. Reads are strongly consistent, and add() is a conditional
+    write, so it is atomic across containers.
+    """
+
+    def __init__(self, table_name: str, namespace: str, client=None):
+        self.table_name = table_name
+        self.namespace = namespace
+        self._client = client
+
+    @property
+    def client(self):
+        """DynamoDB client, created on first use."""
+        if self._client is None:
+            self._client = boto3.client("dynamodb")
+        return self._client
+
+    def _key(self, key: str) -> dict:
+        return {"namespace": {"S": self.namespace}, "key": {"S": key}}
+
+    def _item(self, key: str, value: Any, expires_at: float) -> dict:
+        return {
+            **self._key(key),
+            "value": {"S": json.dumps(value)},
+            "expiresAt": {"N": str(int(expires_at))},
+        }
+
+    def get(self, key: str) -> Any | None:
+        """Get the value for key, or None if it is missing or expired."""
+        item = self.client.get_item(
+            TableName=self.table_name, Key=self._key(key), ConsistentRead=True
+        ).get("Item")
+
+        # DynamoDB deletes expired items lazily, so expiry is checked here
+        if item is None or float(item["expiresAt"]["N"]) <= time.time():
+            return None
+
+        return json.loads(item["value"]["S"])
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store value for ttl seconds."""
+        self.client.put_item(
+            TableName=self.table_name, Item=self._item(key, value, time.time() + ttl)
+        )
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Store value only if key is missing or expired. Returns True if it was stored.
+        """
+        now = time.time()
+
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item=self._item(key, value, now + ttl),
+                ConditionExpression="attribute_not_exists(#key) OR expiresAt <= :now",
+                ExpressionAttributeNames={"#key": "key"},
+                ExpressionAttributeValues={":now": {"N": str(int(now))}},
+            )
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code == "ConditionalCheckFailedException":
+                return False
+            raise
+
+        return True
+
+    def delete(self, key: str):
+        """Remove key from the store."""
+        self.client.delete_item(TableName=self.table_name, Key=self._key(key))
+
+    def _query(self, **kwargs) -> list[dict]:
+        items = []
+        while True:
+            response = self.client.query(
+                TableName=self.table_name,
+                KeyConditionExpression="#namespace = :namespace",
+                ExpressionAttributeValues={":namespace": {"S": self.namespace}},
+                **kwargs,
+            )
+            items.extend(response.get("Items", []))
+
+            if "LastEvaluatedKey" not in response:
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def items(self) -> dict:
+        """Get every entry in this namespace that hasn't expired."""
+        items = self._query(
+            ExpressionAttributeNames={"#namespace": "namespace"}, ConsistentRead=True
+        )
+        now = time.time()
+
+        return {
+            item["key"]["S"]: json.loads(item["value"]["S"])
+            for item in items
+            if float(item["expiresAt"]["N"]) > now
+        }
+
+    def clear(self):
+        """Remove all entries in this namespace."""
+        items = self._query(
+            ExpressionAttributeNames={"#namespace": "namespace", "#key": "key"},
+            ProjectionExpression="#key",
+        )
+        for item in items:
+            self.delete(item["key"]["S"])
+
+
+class TieredStore:
+    """
+    Memory store in front of an optional persistent store. Reads check memory
+    first and fill it from the persistent store. Writes go to both. If memory_ttl
+    is set, memory copies are kept at most that long, so that writes made by other
+    containers to a shared persistent store are seen.
+    """
+
+    def __init__(self, memory: MemoryStore, persistent=None, memory_ttl=None):
+        self.memory = memory
+        self.persistent = persistent
+        self.memory_ttl = memory_ttl
+
+    def _memory_ttl(self, ttl: float) -> float:
+        if self.persistent is None or self.memory_ttl is None:
+            return ttl
+        return min(ttl, self.memory_ttl)
+
+    def get(self, key: str, ttl: float = 60) -> Any | None:
+        """
+        Get the value for key. Values found in the persistent store are kept in
+        memory for ttl seconds.
+        """
+        value = self.memory.get(key)
+        if value is not None or self.persistent is None:
+            return value
+
+        value = self.persistent.get(key)
+        if value is not None:
+            self.memory.set(key, value, self._memory_ttl(ttl))
+
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store value for ttl seconds in every layer."""
+        self.memory.set(key, value, self._memory_ttl(ttl))
+        if self.persistent is not None:
+            self.persistent.set(key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Store value only if key is missing from every layer. Returns True if it was stored.
+        """
+        if self.persistent is None:
+            return self.memory.add(key, value, ttl)
+
+        if self.memory.get(key) is not None:
+            return False
+
+        if not self.persistent.add(key, value, ttl):
+            return False
+
+        self.memory.set(key, value, self._memory_ttl(ttl))
+        return True
+
+    def delete(self, key: str):
+        """Remove key from every layer."""
+        self.memory.delete(key)
+        if self.persistent is not None:
+            self.persistent.delete(key)
+
+    def items(self) -> dict:
+        """
+        Get every entry that hasn't expired. The persistent store is read if
+        there is one, since the memory layer may be missing entries.
+        """
+        if self.persistent is None:
+            return self.memory.items()
+        return self.persistent.items()
+
+    def clear(self):
+        """Remove all entries from every layer."""
+        self.memory.clear()
+        if self.persistent is not None:
+            self.persistent.clear()
+
+
+def shared_backend() -> bool:
+    """Check if the configured persistent store is shared by every container."""
+    return os.environ.get("CACHE_BACKEND") == "dynamodb"
+
+
+def get_persistent_store(namespace: str) -> DynamoDBStore | SQLiteStore | None:
+    """
+    Get the configured persistent store for namespace, or None if CACHE_BACKEND is unset.
+    """
+    backend = os.environ.get("CACHE_BACKEND")
+    if not backend:
+        return None
+
+    if backend == "dynamodb":
+        return DynamoDBStore(os.environ.get("CACHE_TABLE", "odv_cache"), namespace)
+
+    if backend == "sqlite":
+        return SQLiteStore(
+            os.environ.get("CACHE_PATH", "/tmp/odv_cache.sqlite3"), namespace
+        )
+
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+def get_store(
+    namespace: str, maxsize: int | None = None, memory_ttl: float | None = None
+) -> TieredStore:
+    """
+    Get a memory store backed by the configured persistent store for namespace.
+    """
+    return TieredStore(
+        MemoryStore(maxsize), get_persistent_store(namespace), memory_ttl
+    )
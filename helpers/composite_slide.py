@@ -0,0 +1,295 @@
+"""
+Single "Currently on duty" lobby slide, rendered from the volunteers' slides.
+
+With SLIDESHOW_MODE set to "composite", the "ODV - {name}.png" slides of the
+volunteers on duty are laid out on one image, which replaces the content of a
+single file in the slideshow folder. The file is only written when the set of
+volunteers, or one of their slides, changes. Source slides are cached in files
+under SLIDE_CACHE_DIR, by their Drive md5Checksum, so an unchanged slide is
+downloaded once per container. Images are too large for the shared cache, which
+only sees their checksums through the composite's signature.
+
+Every container renders the same file from the shared on-duty state, so the
+composite's file id and signature are always read from the shared cache. The
+scheduled run checks the signature stamped on the file itself, which corrects
+a composite left behind by two containers rendering at once.
+
+Rendering needs Pillow, from requirements.txt. It is imported lazily so the other
+modes run where it isn't installed.
+"""
+
+import hashlib
+import io
+import logging
+import math
+import os
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # Pillow is only needed for the composite slideshow
+    Image = ImageDraw = None
+
+from helpers.cache import get_store
+from helpers.google_services import (
+    DriveOperations,
+    SLIDESHOW_FOLDER_NAME,
+    USER_ID_PROPERTY,
+    VOLUNTEER_SLIDES_FOLDER_NAME,
+    list_volunteer_slides,
+)
+
+COMPOSITE_SLIDE_NAME = "ODV - On Duty Now.png"
+
+# Drive app properties of the composite slide file
+COMPOSITE_PROPERTY = "odvCompositeSlide"
+SIGNATURE_PROPERTY = "odvCompositeSignature"
+
+SLIDE_SIZE = (1920, 1080)
+TITLE_HEIGHT = 120
+TILE_MARGIN = 20
+BACKGROUND_COLOR = (255, 255, 255)
+TEXT_COLOR = (0, 0, 0)
+
+# Slide images are cached by content hash, so they never go stale. The least
+# recently used files are removed past SLIDE_CACHE_LIMIT.
+SLIDE_CACHE_LIMIT = 64
+
+# Composite file id and the signature of its last render. Other containers
+# render it too, so memory copies aren't kept.
+COMPOSITE_TTL = 24 * 60 * 60
+
+composite_state = get_store("composite_slide", memory_ttl=0)
+
+
+def on_duty_slides(drive_service, on_duty: dict) -> list[dict]:
+    """
+    Get the slide of each volunteer in on_duty, a {user id: {"name", ...}} map,
+    with one listing of the Volunteer Slides folder. Slides are sorted by
+    volunteer name, as {"userId", "name", "id", "md5Checksum"} dicts.
+    """
+    folder_id = DriveOperations(drive_service, None).volunteer_slides_folder_id
+    if folder_id is None:
+        logging.error("Folder '%s' not found", VOLUNTEER_SLIDES_FOLDER_NAME)
+        return []
+
+    by_user_id = {}
+    by_name = {}
+    for slide in list_volunteer_slides(
+        drive_service, folder_id, fields="id, name, appProperties, md5Checksum"
+    ):
+        stamped = (slide.get("appProperties") or {}).get(USER_ID_PROPERTY)
+        if stamped is not None:
+            by_user_id[stamped] = slide
+        else:
+            by_name[slide["name"].removeprefix("ODV - ").removesuffix(".png")] = slide
+
+    slides = []
+    for user_id, volunteer in on_duty.items():
+        slide = by_user_id.get(str(user_id)) or by_name.get(volunteer["name"])
+        if slide is None:
+            logging.info("No slide for %s, consider adding them", volunteer["name"])
+            continue
+
+        slides.append(
+            {
+                "userId": str(user_id),
+                "name": volunteer["name"],
+                "id": slide["id"],
+                "md5Checksum": slide.get("md5Checksum"),
+            }
+        )
+
+    return sorted(slides, key=lambda slide: slide["name"])
+
+
+def slides_signature(slides: list[dict]) -> str:
+    """Hash of the volunteers and slide contents a composite is rendered from."""
+    parts = [f"{slide['userId']}:{slide['md5Checksum']}" for slide in slides]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def slide_cache_dir() -> str:
+    """Directory of the cached slide images, SLIDE_CACHE_DIR, by default in /tmp."""
+    return os.environ.get("SLIDE_CACHE_DIR", "/tmp/odv_slides")
+
+
+def prune_slide_cache(cache_dir: str):
+    """Remove the least recently used slide images past SLIDE_CACHE_LIMIT."""
+    paths = sorted(
+        (os.path.join(cache_dir, name) for name in os.listdir(cache_dir)),
+        key=os.path.getmtime,
+    )
+    for path in paths[:-SLIDE_CACHE_LIMIT]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def slide_image(drive_service, slide: dict) -> bytes:
+    """
+    Get the PNG content of a slide, from the cache if its checksum was seen before.
+    """
+    checksum = slide.get("md5Checksum")
+    cache_dir = slide_cache_dir()
+    path = os.path.join(cache_dir, f"{checksum}.png") if checksum else None
+
+    if path is not None and os.path.exists(path):
+        os.utime(path)
+        with open(path, "rb") as file:
+            return file.read()
+
+    content = (
+        drive_service.files()
+        .get_media(fileId=slide["id"], supportsAllDrives=True)
+        .execute()
+    )
+
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Written under a temporary name, so readers never see a partial file
+        partial_path = f"{path}.{os.getpid()}.partial"
+        with open(partial_path, "wb") as file:
+            file.write(content)
+        os.replace(partial_path, path)
+        prune_slide_cache(cache_dir)
+
+    return content
+
+
+def render_composite(images: list[bytes]) -> bytes:
+    """
+    Lay out slide images in a grid under a "Currently on duty" title. Returns PNG
+    content. Raises RuntimeError if Pillow isn't installed.
+    """
+    if Image is None:
+        raise RuntimeError("The composite slideshow needs Pillow installed")
+
+    canvas = Image.new("RGB", SLIDE_SIZE, BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(canvas)
+
+    title = "Currently on duty" if images else "No volunteers on duty right now"
+    draw.text((TILE_MARGIN, TILE_MARGIN), title, fill=TEXT_COLOR)
+
+    if images:
+        columns = math.ceil(math.sqrt(len(images)))
+        rows = math.ceil(len(images) / columns)
+        tile_width = (SLIDE_SIZE[0] - TILE_MARGIN) // columns - TILE_MARGIN
+        tile_height = (SLIDE_SIZE[1] - TITLE_HEIGHT) // rows - TILE_MARGIN
+
+        for index, content in enumerate(images):
+            tile = Image.open(io.BytesIO(content)).convert("RGB")
+            tile.thumbnail((tile_width, tile_height))
+
+            column, row = index % columns, index // columns
+            x = TILE_MARGIN + column * (tile_width + TILE_MARGIN)
+            y = TITLE_HEIGHT + row * (tile_height + TILE_MARGIN)
+            # Each slide is centered in its tile
+            x += (tile_width - tile.width) // 2
+            y += (tile_height - tile.height) // 2
+            canvas.paste(tile, (x, y))
+
+    output = io.BytesIO()
+    canvas.save(output, format="PNG")
+    return output.getvalue()
+
+
+def find_composite_slide(drive_service, folder_id: str) -> dict | None:
+    """
+    Find the composite slide file in the slideshow folder, as {"id", "appProperties"}.
+    """
+    drive_ops = DriveOperations(drive_service, None)
+    files = (
+        drive_service.files()
+        .list(
+            q=(
+                f"appProperties has {{key='{COMPOSITE_PROPERTY}' and value='1'}}"
+                f' and "{folder_id}" in parents and trashed=false'
+            ),
+            fields="files(id, appProperties)",
+            supportsAllDrives=True,
+            driveId=drive_ops.main_drive_id,
+            corpora="drive",
+            includeItemsFromAllDrives=True,
+        )
+        .execute()
+        .get("files", [])
+    )
+
+    return files[0] if files else None
+
+
+def update_composite_slide(drive_service, on_duty: dict, refresh: bool = False) -> bool:
+    """
+    Render the composite slide for the volunteers in on_duty and upload it in
+    place, creating the file the first time. Nothing is rendered or written if
+    the set of volunteers and their slides is unchanged. With refresh, the file's
+    own signature is checked instead of the cached one. Returns True if the
+    slide was written.
+    """
+    folder_id = DriveOperations(drive_service, None).slideshow_folder_id
+    if folder_id is None:
+        logging.error("Folder '%s' not found", SLIDESHOW_FOLDER_NAME)
+        return False
+
+    slides = on_duty_slides(drive_service, on_duty)
+    signature = slides_signature(slides)
+
+    state = None if refresh else composite_state.get(folder_id, ttl=COMPOSITE_TTL)
+    if state is None:
+        composite = find_composite_slide(drive_service, folder_id)
+        state = composite and {
+            "id": composite["id"],
+            "signature": (composite.get("appProperties") or {}).get(
+                SIGNATURE_PROPERTY
+            ),
+        }
+
+    if state is not None and state["signature"] == signature:
+        return False
+
+    content = render_composite([slide_image(drive_service, slide) for slide in slides])
+    media = MediaIoBaseUpload(io.BytesIO(content), mimetype="image/png")
+    app_properties = {COMPOSITE_PROPERTY: "1", SIGNATURE_PROPERTY: signature}
+
+    if state is not None:
+        file_id = state["id"]
+        try:
+            drive_service.files().update(
+                fileId=file_id,
+                body={"appProperties": app_properties},
+                media_body=media,
+                fields="id",
+                supportsAllDrives=True,
+            ).execute()
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            # The file was removed, so a new one is created
+            state = None
+
+    if state is None:
+        file_id = (
+            drive_service.files()
+            .create(
+                body={
+                    "name": COMPOSITE_SLIDE_NAME,
+                    "parents": [folder_id],
+                    "appProperties": app_properties,
+                },
+                media_body=media,
+                fields="id",
+                supportsAllDrives=True,
+            )
+            .execute()
+            .get("id")
+        )
+
+    composite_state.set(
+        folder_id, {"id": file_id, "signature": signature}, COMPOSITE_TTL
+    )
+    logging.info("Updated composite slide with %s volunteers", len(slides))
+    return True
@@ -0,0 +1,59 @@
+"""
+Batcher for independent Google Drive API calls.
+
+Requests are collected under a key and sent as multipart batch requests of up to
+BATCH_SIZE calls each. Each call succeeds or fails on its own, so the results are
+returned per key: the response, or the HttpError of a failed call.
+"""
+
+from googleapiclient.errors import HttpError
+
+# Most calls the Drive API accepts in one batch request
+BATCH_SIZE = 100
+
+
+class DriveBatch:
+    """
+    Collects Drive requests and executes them in as few HTTP requests as possible.
+    """
+
+    def __init__(self, drive_service):
+        self.drive_service = drive_service
+        self._requests = {}
+
+    def __len__(self):
+        return len(self._requests)
+
+    def add(self, key: str, request):
+        """
+        Add an unexecuted request, e.g. drive_service.files().list(...).
+        """
+        self._requests[key] = request
+
+    def execute(self) -> dict:
+        """
+        Execute the collected requests. Returns {key: response or HttpError}.
+        A lone request is sent on its own, without the multipart overhead.
+        """
+        requests, self._requests = self._requests, {}
+        results = {}
+
+        if len(requests) == 1:
+            key, request = next(iter(requests.items()))
+            try:
+                results[key] = request.execute()
+            except HttpError as e:
+                results[key] = e
+            return results
+
+        def collect(request_id, response, exception):
+            results[request_id] = exception if exception is not None else response
+
+        keys = list(requests)
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = self.drive_service.new_batch_http_request(callback=collect)
+            for key in keys[start : start + BATCH_SIZE]:
+                batch.add(requests[key], request_id=key)
+            batch.execute()
+
+        return results
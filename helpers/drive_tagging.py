@@ -0,0 +1,89 @@
+"""
+One-off migration that stamps existing timesheets and volunteer slides with the
+Openpath user id of their volunteer, so they can be found by it instead of by name.
+"""
+
+import logging
+
+from googleapiclient.errors import HttpError
+
+from helpers.drive_batch import DriveBatch
+from helpers.google_services import (
+    DriveOperations,
+    TIMESHEET_NAME_PREFIX,
+    USER_ID_PROPERTY,
+    list_timesheets,
+    list_volunteer_slides,
+)
+
+
+def untagged_files(files: list[dict], user_ids: dict, name_of) -> dict:
+    """
+    Map the id of each file not stamped yet to the user id of its volunteer.
+    name_of gets the volunteer name from a file.
+    """
+    return {
+        file["id"]: user_ids[name_of(file)]
+        for file in files
+        if USER_ID_PROPERTY not in (file.get("appProperties") or {})
+        and name_of(file) in user_ids
+    }
+
+
+def tag_volunteer_files(drive_service, users: dict) -> dict:
+    """
+    Stamp every timesheet and volunteer slide of the volunteers in users, a
+    directory index {user id: {"firstName", "lastName", ...}} map, with their
+    user id. Names shared by several volunteers are skipped, since their files
+    can't be told apart by name. Returns the number of files tagged and failed.
+    """
+    user_ids = {}
+    shared_names = set()
+    for user_id, user in users.items():
+        full_name = f"{user.get('firstName')} {user.get('lastName')}"
+        if full_name in user_ids:
+            shared_names.add(full_name)
+        user_ids[full_name] = user_id
+
+    for full_name in shared_names:
+        logging.warning("Not tagging files of %s, the name is shared", full_name)
+        del user_ids[full_name]
+
+    to_tag = untagged_files(
+        list_timesheets(drive_service),
+        user_ids,
+        lambda file: file["name"].removeprefix(TIMESHEET_NAME_PREFIX),
+    )
+
+    slides_folder_id = DriveOperations(drive_service, None).volunteer_slides_folder_id
+    if slides_folder_id is not None:
+        to_tag.update(
+            untagged_files(
+                list_volunteer_slides(drive_service, slides_folder_id),
+                user_ids,
+                lambda file: file["name"].removeprefix("ODV - ").removesuffix(".png"),
+            )
+        )
+
+    batch = DriveBatch(drive_service)
+    for file_id, user_id in to_tag.items():
+        batch.add(
+            file_id,
+            drive_service.files().update(
+                fileId=file_id,
+                body={"appProperties": {USER_ID_PROPERTY: str(user_id)}},
+                fields="id",
+                supportsAllDrives=True,
+            ),
+        )
+
+    results = {"tagged": 0, "failed": 0}
+    for file_id, response in batch.execute().items():
+        if isinstance(response, HttpError):
+            logging.error("Could not tag file %s: %s", file_id, response)
+            results["failed"] += 1
+        else:
+            results["tagged"] += 1
+
+    logging.info("Tagged %s files, %s failed", results["tagged"], results["failed"])
+    return results
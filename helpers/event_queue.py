@@ -0,0 +1,230 @@
+"""
+Durable queues for Openpath events that are acknowledged now and processed later.
+
+The backend is chosen with the EVENT_QUEUE_BACKEND environment variable:
+"sqs" (EVENT_QUEUE_URL), "sqlite" (EVENT_QUEUE_PATH) or "memory". When it is
+unset, events are processed synchronously by the handler.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import boto3
+
+
+@dataclass
+class QueuedMessage:
+    """
+    A message received from an event queue.
+    """
+
+    message_id: str
+    body: dict
+
+
+class EventQueue(ABC):
+    """
+    Base class for event queue backends.
+    """
+
+    @abstractmethod
+    def put(
+        self,
+        body: dict,
+        group_id: str | None = None,
+        deduplication_id: str | None = None,
+    ):
+        """
+        Add a message to the queue. group_id and deduplication_id are only used
+        by FIFO SQS queues, which keep messages of a group in order.
+        """
+
+    @abstractmethod
+    def receive(self, max_messages: int = 10) -> list[QueuedMessage]:
+        """
+        Receive up to max_messages messages. Received messages stay in the queue
+        until they are acknowledged.
+        """
+
+    @abstractmethod
+    def ack(self, message_id: str):
+        """Remove a processed message from the queue."""
+
+
+class InMemoryQueue(EventQueue):
+    """
+    Queue that lives in the current process. Only useful for local testing.
+    Like the SQLite queue, received messages become visible again after
+    visibility_timeout seconds if they are not acknowledged.
+    """
+
+    def __init__(self, visibility_timeout: int = 300):
+        self.visibility_timeout = visibility_timeout
+        # Message id -> [message, time it is visible at], in the order put
+        self._messages = {}
+        self._lock = threading.Lock()
+
+    def put(self, body: dict, group_id=None, deduplication_id=None):
+        with self._lock:
+            message = QueuedMessage(str(uuid.uuid4()), body)
+            self._messages[message.message_id] = [message, time.time()]
+
+    def receive(self, max_messages: int = 10) -> list[QueuedMessage]:
+        now = time.time()
+
+        with self._lock:
+            received = []
+            for entry in self._messages.values():
+                if len(received) >= max_messages:
+                    break
+                if entry[1] > now:
+                    continue
+
+                entry[1] = now + self.visibility_timeout
+                received.append(entry[0])
+
+            return received
+
+    def ack(self, message_id: str):
+        with self._lock:
+            self._messages.pop(message_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._messages)
+
+
+class SQLiteQueue(EventQueue):
+    """
+    Queue stored in a local SQLite file. Received messages are leased for
+    visibility_timeout seconds and become visible again if they are not acknowledged.
+    """
+
+    def __init__(self, path: str, visibility_timeout: int = 300):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    body TEXT NOT NULL,
+                    visible_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def put(self, body: dict, group_id=None, deduplication_id=None):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO events (body, visible_at) VALUES (?, ?)",
+                (json.dumps(body), time.time()),
+            )
+
+    def receive(self, max_messages: int = 10) -> list[QueuedMessage]:
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, body FROM events WHERE visible_at <= ? ORDER BY id LIMIT ?",
+                (now, max_messages),
+            ).fetchall()
+
+            conn.executemany(
+                "UPDATE events SET visible_at = ? WHERE id = ?",
+                [(now + self.visibility_timeout, row[0]) for row in rows],
+            )
+
+        return [QueuedMessage(str(row[0]), json.loads(row[1])) for row in rows]
+
+    def ack(self, message_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM events WHERE id = ?", (int(message_id),))
+
+
+class SQSQueue(EventQueue):
+    """
+    Queue backed by Amazon SQS. In Lambda, the worker is triggered by the SQS
+    event source mapping, which receives and deletes messages itself.
+    """
+
+    def __init__(self, queue_url: str, client=None):
+        self.queue_url = queue_url
+        self.client = client or boto3.client("sqs")
+
+    def put(self, body: dict, group_id=None, deduplication_id=None):
+        kwargs = {}
+        if self.queue_url.endswith(".fifo"):
+            kwargs["MessageGroupId"] = group_id or "default"
+            if deduplication_id is not None:
+                kwargs["MessageDeduplicationId"] = deduplication_id
+
+        self.client.send_message(
+            QueueUrl=self.queue_url, MessageBody=json.dumps(body), **kwargs
+        )
+
+    def receive(self, max_messages: int = 10) -> list[QueuedMessage]:
+        response = self.client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(max_messages, 10),
+            WaitTimeSeconds=0,
+        )
+
+        return [
+            QueuedMessage(message["ReceiptHandle"], json.loads(message["Body"]))
+            for message in response.get("Messages", [])
+        ]
+
+    def ack(self, message_id: str):
+        self.client.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message_id)
+
+
+def create_queue(backend: str, url: str | None = None, path: str | None = None):
+    """
+    Create a queue for the named backend: "sqs" (url), "sqlite" (path) or "memory".
+    """
+    if backend == "sqs":
+        return SQSQueue(url)
+    if backend == "sqlite":
+        return SQLiteQueue(path)
+    if backend == "memory":
+        return InMemoryQueue()
+
+    raise ValueError(f"Unknown event queue backend: {backend}")
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_event_queue() -> EventQueue | None:
+    """
+    Get the configured event queue for this container, or None if events
+    should be processed synchronously.
+    """
+    global _queue  # pylint: disable=global-statement
+
+    backend = os.environ.get("EVENT_QUEUE_BACKEND")
+    if not backend:
+        return None
+
+    with _queue_lock:
+        if _queue is None:
+            _queue = create_queue(
+                backend,
+                url=os.environ.get("EVENT_QUEUE_URL"),
+                path=os.environ.get("EVENT_QUEUE_PATH", "/tmp/odv_events.sqlite3"),
+            )
+
+    return _queue
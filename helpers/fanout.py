@@ -0,0 +1,73 @@
+"""
+Run independent side effects of a clock event concurrently.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+MAX_WORKERS = 4
+
+THREAD_NAME_PREFIX = "fanout"
+
+# The pool is shared for the life of the container, so its threads (and any
+# per-thread API clients they build) are reused across warm invocations.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor  # pylint: disable=global-statement
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix=THREAD_NAME_PREFIX
+            )
+
+    return _executor
+
+
+def _in_worker_thread() -> bool:
+    return threading.current_thread().name.startswith(THREAD_NAME_PREFIX)
+
+
+def run_steps(steps: dict[str, Callable[[], Any]]) -> dict[str, Exception]:
+    """
+    Run each step on a bounded thread pool and wait for all of them to finish.
+
+    A step that raises does not cancel the others. Returns a dict of step name
+    to the exception it raised, which is empty when every step succeeded.
+    Steps started from inside another step run one after another on the
+    calling thread, so nested calls can't exhaust the pool.
+    """
+    failures = {}
+
+    if not steps:
+        return failures
+
+    if _in_worker_thread():
+        outcomes = {}
+        for name, step in steps.items():
+            try:
+                step()
+                outcomes[name] = None
+            except Exception as e:  # pylint: disable=broad-except
+                outcomes[name] = e
+    else:
+        executor = _get_executor()
+        futures = {name: executor.submit(step) for name, step in steps.items()}
+        outcomes = {name: future.exception() for name, future in futures.items()}
+
+    for name, exception in outcomes.items():
+        if exception is not None:
+            logging.error(
+                "Step '%s' failed: %s",
+                name,
+                exception,
+                exc_info=(type(exception), exception, exception.__traceback__),
+            )
+            failures[name] = exception
+
+    return failures
@@ -5,15 +5,28 @@ Helper functions for interacting with Google Discovery APIs.
 import os
 import logging
 import datetime
+import random
 import re
+import threading
+from zoneinfo import ZoneInfo
 
 from google.auth.impersonated_credentials import Credentials as ImpersonatedCredentials
 from google.oauth2.service_account import Credentials
 import google.auth.transport.requests
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+import httplib2
+
+from helpers.cache import get_store
+from helpers.drive_batch import DriveBatch
+from helpers.fanout import run_steps
 
 if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
+    import credentials as settings
     from credentials import (
-        key_file,
         PRIV_SA,
         ON_DUTY_DRIVE_ID,
         MAIN_DRIVE_ID,
@@ -22,8 +35,8 @@ if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
         PARENT_FOLDER_ID,
     )
 else:
+    import config as settings
     from config import (
-        key_file,
         PRIV_SA,
         ON_DUTY_DRIVE_ID,
         MAIN_DRIVE_ID,
@@ -34,65 +47,468 @@ else:
 
 logging.getLogger("googleapiclient.discovery_cache").setLevel(logging.ERROR)
 
+# httplib2 connections are not thread-safe, so API clients are cached per thread.
+# Each thread builds a given client once per container.
+_service_cache = threading.local()
+
+HTTP_TIMEOUT_SECONDS = 30
+
+# Response body sizes per API method, e.g. "drive.files.list", for this container
+_response_stats = {}
+_response_stats_lock = threading.Lock()
+
+
+def record_response(method_id: str, size: int):
+    """Record the size in bytes of one response to an API method."""
+    with _response_stats_lock:
+        stats = _response_stats.setdefault(
+            method_id, {"calls": 0, "bytes": 0, "maxBytes": 0}
+        )
+        stats["calls"] += 1
+        stats["bytes"] += size
+        stats["maxBytes"] = max(stats["maxBytes"], size)
+
+
+def response_stats() -> dict:
+    """
+    Get the response sizes recorded so far, as {method id: {"calls", "bytes",
+    "maxBytes"}}.
+    """
+    with _response_stats_lock:
+        return {method_id: dict(stats) for method_id, stats in _response_stats.items()}
+
+
+def reset_response_stats():
+    """Forget the recorded response sizes, e.g. at the start of an invocation."""
+    with _response_stats_lock:
+        _response_stats.clear()
+
+
+def instrumented_request(http, postproc, uri, **kwargs) -> HttpRequest:
+    """
+    Request builder for API clients that records the size of each response body,
+    including the parts of batch responses.
+    """
+    method_id = kwargs.get("methodId")
+
+    def record_and_parse(resp, content):
+        record_response(method_id, len(content or b""))
+        return postproc(resp, content)
+
+    return HttpRequest(http, record_and_parse, uri, **kwargs)
+
+
+def get_service(service_name: str, version: str, credentials):
+    """
+    Get a Google API client, building it only once per container.
+
+    Clients are built from the discovery documents bundled with googleapiclient,
+    so no discovery request is made. On warm invocations the cached client is
+    returned with the new credentials swapped into its authorized transport.
+    """
+    services = getattr(_service_cache, "services", None)
+    if services is None:
+        services = _service_cache.services = {}
+
+    cached = services.get((service_name, version))
+
+    if cached is not None:
+        service, authorized_http = cached
+        authorized_http.credentials = credentials
+        return service
+
+    authorized_http = AuthorizedHttp(
+        credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)
+    )
+
+    discovery_document = discovery_cache.get_static_doc(service_name, version)
+    if discovery_document is not None:
+        service = build_from_document(
+            discovery_document,
+            http=authorized_http,
+            requestBuilder=instrumented_request,
+        )
+    else:
+        service = build(
+            service_name,
+            version,
+            http=authorized_http,
+            requestBuilder=instrumented_request,
+        )
+
+    services[(service_name, version)] = (service, authorized_http)
+
+    return service
+
+
+# Impersonated credentials are reused until they are this close to expiring.
+CREDENTIALS_REFRESH_MARGIN = datetime.timedelta(seconds=60)
+
+_credentials_lock = threading.Lock()
+_source_credentials = None
+_impersonated_credentials = {}
+
+
+def _get_source_credentials():
+    """
+    Load the service account credentials used to sign impersonation requests.
+    """
+    global _source_credentials  # pylint: disable=global-statement
+
+    if _source_credentials is None:
+        if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+            _source_credentials = Credentials.from_service_account_info(
+                settings.key_file
+            )
+        else:
+            _source_credentials = Credentials.from_service_account_file(
+                settings.key_file
+            )
+
+    return _source_credentials
+
+
+def _needs_refresh(creds) -> bool:
+    """Check if credentials are missing a token or are close to expiry."""
+    if not creds.token or creds.expiry is None:
+        return True
+
+    # google-auth stores expiry as a naive UTC datetime
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+    return creds.expiry - now <= CREDENTIALS_REFRESH_MARGIN
+
 
 def get_access_token(impersonated_account: str, scopes: list[str]):
     """
     Get access token for impersonated service account.
+
+    Credentials are cached per container and only refreshed when they are
+    within CREDENTIALS_REFRESH_MARGIN of expiring. Safe to call from multiple threads.
     """
-    if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
-        credentials = Credentials.from_service_account_info(key_file)
-    else:
-        credentials = Credentials.from_service_account_file(key_file)
+    cache_key = (impersonated_account, tuple(scopes))
 
-    target_creds = ImpersonatedCredentials(
-        source_credentials=credentials,
-        target_principal=impersonated_account,
-        target_scopes=scopes,
-        lifetime=300,
-    )
+    with _credentials_lock:
+        target_creds = _impersonated_credentials.get(cache_key)
+
+        if target_creds is None:
+            target_creds = ImpersonatedCredentials(
+                source_credentials=_get_source_credentials(),
+                target_principal=impersonated_account,
+                target_scopes=scopes,
+                lifetime=300,
+            )
+            _impersonated_credentials[cache_key] = target_creds
 
-    request = google.auth.transport.requests.Request()
-    target_creds.refresh(request)
+        if _needs_refresh(target_creds):
+            request = google.auth.transport.requests.Request()
+            target_creds.refresh(request)
 
     return target_creds
 
 
+# Last used row of each timesheet, as last seen by this container. Other
+# containers and staff also write the sheets, so it is only a hint: the sheet is
+# read from the hinted row down before any write to an explicit row.
+ROW_POINTER_TTL = 30 * 24 * 60 * 60
+
+row_pointers = get_store("timesheet_rows", maxsize=1024)
+
+
+# Title -> sheetId map of the master log tabs, one tab per volunteer
+MASTER_SHEETS_TTL = 60 * 60
+
+master_sheets = get_store("master_sheets")
+
+# Hidden, pre-formatted Master Log tabs waiting to be claimed by new volunteers
+POOL_TAB_PREFIX = "Pool "
+
+
+def get_row_pointer(spreadsheet_id: str, range_prefix: str) -> int | None:
+    """Get the last used row of a sheet, if known."""
+    return row_pointers.get(f"{spreadsheet_id}:{range_prefix}", ttl=ROW_POINTER_TTL)
+
+
+def set_row_pointer(spreadsheet_id: str, range_prefix: str, row: int):
+    """Record the last used row of a sheet."""
+    row_pointers.set(f"{spreadsheet_id}:{range_prefix}", row, ROW_POINTER_TTL)
+
+
+def last_row_from_values(start: int, values: list) -> int | None:
+    """
+    Get the last used row of a sheet from the values of a range read from row
+    start to the end of the sheet. Returns None if the sheet ends above start,
+    in which case it has to be read again from row 1.
+    """
+    if not values and start > 1:
+        return None
+
+    return start + len(values) - 1
+
+
+def row_from_range(a1_range) -> int | None:
+    """
+    Get the last row number of an A1 range such as "Sheet1!A5:B5".
+    """
+    if not isinstance(a1_range, str):
+        return None
+
+    match = re.search(r"[A-Z]+(\d+)$", a1_range)
+    return int(match.group(1)) if match else None
+
+
+def hours_formula(row: int) -> str:
+    """
+    Formula for the Hours column of a timesheet row. Handles shifts that end after midnight.
+    """
+    return f"=IF(C{row}-B{row}>0, C{row}-B{row}, 1 + (C{row}-B{row}))"
+
+
+# Timesheet dates and times are local to Asmbly
+LOCAL_TIMEZONE = ZoneInfo("America/Chicago")
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+def shift_hours(clock_in, clock_out: str) -> float | None:
+    """
+    Length of a shift as a fraction of a day, the value Sheets stores for a
+    duration. clock_in is the row's (date, time) entry and clock_out its time
+    entry. A clock-out time earlier than the clock-in time is on the next day.
+    Daylight saving time changes are accounted for. Returns None if the entries
+    can't be parsed.
+    """
+    try:
+        start = datetime.datetime.strptime(
+            f"{clock_in[0]} {clock_in[1]}", "%m/%d/%Y %I:%M %p"
+        )
+        end = datetime.datetime.combine(
+            start.date(), datetime.datetime.strptime(clock_out, "%I:%M %p").time()
+        )
+    except (IndexError, TypeError, ValueError):
+        return None
+
+    if end < start:
+        end += datetime.timedelta(days=1)
+
+    seconds = (
+        end.replace(tzinfo=LOCAL_TIMEZONE).timestamp()
+        - start.replace(tzinfo=LOCAL_TIMEZONE).timestamp()
+    )
+
+    return round(seconds / SECONDS_PER_DAY, 8)
+
+
+def same_clock_in(first, second) -> bool:
+    """
+    Check if two clock-in (date, time) entries are the same, whichever way the
+    sheet formats them.
+    """
+    if not first or not second:
+        return False
+
+    try:
+        first_time, second_time = (
+            datetime.datetime.strptime(f"{entry[0]} {entry[1]}", "%m/%d/%Y %I:%M %p")
+            for entry in (first, second)
+        )
+        return first_time == second_time
+    except (IndexError, TypeError, ValueError):
+        return tuple(first[:2]) == tuple(second[:2])
+
+
+def hours_value(row: int, clock_in, clock_out: str):
+    """
+    Value for the Hours column of a timesheet row. The formula is only used if
+    the clock-in entry is unknown.
+    """
+    hours = shift_hours(clock_in, clock_out) if clock_in is not None else None
+    return hours if hours is not None else hours_formula(row)
+
+
+TIMESHEET_NAME_PREFIX = "ODV Timesheet - "
+
+
+def list_timesheets(drive_service) -> list[dict]:
+    """
+    List every volunteer timesheet in the shared Drive, as {"id", "name",
+    "appProperties"} dicts.
+    """
+    search_query = (
+        f'mimeType="application/vnd.google-apps.spreadsheet"'
+        f' and "{PARENT_FOLDER_ID}" in parents'
+        f' and name contains "{TIMESHEET_NAME_PREFIX}"'
+        f" and trashed=false"
+    )
+
+    timesheets = []
+    page_token = None
+    while True:
+        response = (
+            drive_service.files()
+            .list(
+                q=search_query,
+                fields="nextPageToken, files(id, name, appProperties)",
+                pageSize=1000,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                driveId=ON_DUTY_DRIVE_ID,
+                corpora="drive",
+                includeItemsFromAllDrives=True,
+            )
+            .execute()
+        )
+        timesheets.extend(response.get("files", []))
+
+        page_token = response.get("nextPageToken")
+        if page_token is None:
+            return timesheets
+
+
+# Folder ids almost never change. They are cached until Drive reports a 404.
+FOLDER_ID_TTL = 7 * 24 * 60 * 60
+
+folder_ids = get_store("drive_folders")
+
+SLIDESHOW_FOLDER_NAME = "_____LobbyTV"
+VOLUNTEER_SLIDES_FOLDER_NAME = "Volunteer Slides"
+
+# Drive app property holding the Openpath user id of a volunteer's files
+USER_ID_PROPERTY = "opUserId"
+
+
+def user_id_query(user_id: int) -> str:
+    """Drive search clause matching files stamped with the Openpath user id."""
+    return f"appProperties has {{key='{USER_ID_PROPERTY}' and value='{user_id}'}}"
+
+
+def list_volunteer_slides(
+    drive_service, folder_id: str, fields: str = "id, name, appProperties"
+) -> list[dict]:
+    """
+    List every volunteer slide in the Volunteer Slides folder, as dicts of the
+    given file fields. The name is always included.
+    """
+    slides = []
+    page_token = None
+    while True:
+        response = (
+            drive_service.files()
+            .list(
+                q=f'"{folder_id}" in parents and trashed=false',
+                fields=f"nextPageToken, files({fields})",
+                pageSize=1000,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                driveId=ON_DUTY_DRIVE_ID,
+                corpora="drive",
+                includeItemsFromAllDrives=True,
+            )
+            .execute()
+        )
+        slides.extend(
+            file
+            for file in response.get("files", [])
+            if file.get("name", "").startswith("ODV - ")
+            and file.get("name", "").endswith(".png")
+        )
+
+        page_token = response.get("nextPageToken")
+        if page_token is None:
+            return slides
+
+
 class DriveOperations:
     """
     Class for Google Drive operations. Methods for creating, searching,
     and copying files
     """
 
-    def __init__(self, drive_service, volunteer_name):
+    def __init__(self, drive_service, volunteer_name, slide_file_id=None, user_id=None):
         self.drive_service = drive_service
         self.volunteer_name = volunteer_name
+        # Openpath user id. If set, files are stamped with it and looked up by it.
+        self.user_id = user_id
+        # Id of the volunteer's slide, if already known. Set when the slide is found.
+        self.slide_file_id = slide_file_id
         self.on_duty_drive_id = ON_DUTY_DRIVE_ID
         self.main_drive_id = MAIN_DRIVE_ID
         self.template_sheet_id = TEMPLATE_SHEET_ID
         self.parent_folder_id = PARENT_FOLDER_ID
-        self.slideshow_folder_id = self.get_folder_id(
-            MAIN_DRIVE_ID, "_____LobbyTV"
-        ).get("id")
-        self.volunteer_slides_folder_id = self.get_folder_id(
-            ON_DUTY_DRIVE_ID, "Volunteer Slides"
-        ).get("id")
+        # Slideshow folder ids are looked up on first use
+        self._folder_ids = None
+
+    def _folders(self) -> dict:
+        if self._folder_ids is None:
+            self._folder_ids = {
+                SLIDESHOW_FOLDER_NAME: self.get_cached_folder_id(
+                    self.main_drive_id, SLIDESHOW_FOLDER_NAME
+                ),
+                VOLUNTEER_SLIDES_FOLDER_NAME: self.get_cached_folder_id(
+                    self.on_duty_drive_id, VOLUNTEER_SLIDES_FOLDER_NAME
+                ),
+            }
+
+        return self._folder_ids
+
+    @property
+    def slideshow_folder_id(self) -> str | None:
+        """Id of the lobby TV slideshow folder in the main Drive."""
+        return self._folders()[SLIDESHOW_FOLDER_NAME]
+
+    @property
+    def volunteer_slides_folder_id(self) -> str | None:
+        """Id of the folder of volunteer slides in the On-Duty Drive."""
+        return self._folders()[VOLUNTEER_SLIDES_FOLDER_NAME]
+
+    def get_cached_folder_id(self, drive_id, folder_name) -> str | None:
+        """
+        Get a folder id from the folder id cache, or look it up by name. Folders
+        that aren't found are not cached.
+        """
+        key = f"{drive_id}:{folder_name}"
+
+        folder_id = folder_ids.get(key, ttl=FOLDER_ID_TTL)
+        if folder_id is None:
+            folder_id = self.get_folder_id(drive_id, folder_name).get("id")
+            if folder_id is not None:
+                folder_ids.set(key, folder_id, FOLDER_ID_TTL)
+
+        return folder_id
+
+    def invalidate_folder_ids(self):
+        """
+        Forget the cached slideshow folder ids, e.g. after Drive reports a 404.
+        """
+        folder_ids.delete(f"{self.main_drive_id}:{SLIDESHOW_FOLDER_NAME}")
+        folder_ids.delete(f"{self.on_duty_drive_id}:{VOLUNTEER_SLIDES_FOLDER_NAME}")
+        self._folder_ids = None
 
     def add_volunteer_to_slideshow(self):
         """
         Add volunteer to slideshow.
         """
         if self.volunteer_slides_folder_id is None:
-            logging.error("Folder 'Volunteer Slides' not found")
+            logging.error("Folder '%s' not found", VOLUNTEER_SLIDES_FOLDER_NAME)
             return
 
+        if self.slide_file_id is not None:
+            try:
+                self.add_slide(self.slide_file_id)
+                return
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                # The known slide may have been replaced, so search for it again
+                self.slide_file_id = None
+
         volunteer_slide = self.slide_search(
             self.on_duty_drive_id, self.volunteer_name, self.volunteer_slides_folder_id
         )
 
         if len(volunteer_slide.get("files")) > 0:
-            slide_file_id = volunteer_slide.get("files")[0].get("id")
+            self.slide_file_id = volunteer_slide.get("files")[0].get("id")
 
-            self.add_slide(slide_file_id)
+            self.add_slide(self.slide_file_id)
         else:
             logging.info("No slide for %s, consider adding them", self.volunteer_name)
 
@@ -101,7 +517,7 @@ class DriveOperations:
         Remove volunteer from slideshow.
         """
         if self.slideshow_folder_id is None:
-            logging.error("Folder '_____LobbyTV' not found")
+            logging.error("Folder '%s' not found", SLIDESHOW_FOLDER_NAME)
             return
 
         volunteer_slide = self.slide_search(
@@ -117,31 +533,135 @@ class DriveOperations:
         """
         Search for a file.
         """
-        return (
-            self.drive_service.files()
-            .list(
+        return self.own_files(
+            self.slide_search_request(drive_id, volunteer_name, folder_id).execute()
+        )
+
+    def slide_search_request(self, drive_id: str, volunteer_name: str, folder_id: str):
+        """
+        Build the unexecuted slide search request. Slides stamped with the
+        volunteer's user id are matched by it, and slides not stamped yet by name.
+        """
+        name_query = f'name="ODV - {volunteer_name}.png"'
+        if self.user_id is None:
+            return self.drive_service.files().list(
                 q=f"""
-                trashed=false and name="ODV - {volunteer_name}.png"
+                trashed=false and {name_query}
                 and "{folder_id}" in parents
             """,
+                fields="files(id)",
                 includeItemsFromAllDrives=True,
                 supportsAllDrives=True,
                 corpora="drive",
                 driveId=drive_id,
             )
-            .execute()
+
+        return self.drive_service.files().list(
+            q=(
+                f"trashed=false and ({user_id_query(self.user_id)} or {name_query})"
+                f' and "{folder_id}" in parents'
+            ),
+            fields="files(id, appProperties)",
+            includeItemsFromAllDrives=True,
+            supportsAllDrives=True,
+            corpora="drive",
+            driveId=drive_id,
         )
 
+    def own_files(self, response: dict) -> dict:
+        """
+        Keep the files of a search response that belong to the volunteer: those
+        stamped with their user id or, failing that, those not stamped at all.
+        """
+        if self.user_id is None:
+            return response
+
+        files = response.get("files", [])
+        stamped = [
+            file
+            for file in files
+            if (file.get("appProperties") or {}).get(USER_ID_PROPERTY)
+            == str(self.user_id)
+        ]
+        unstamped = [
+            file
+            for file in files
+            if USER_ID_PROPERTY not in (file.get("appProperties") or {})
+        ]
+
+        return {**response, "files": stamped or unstamped}
+
     def add_slide(self, slide_file_id: str):
         """
-        Add slide to slideshow.
+        Add slide to slideshow. If the cached slideshow folder no longer exists,
+        the folder ids are looked up again and the copy is retried once.
         """
-        self.drive_service.files().copy(
+        slideshow_folder_id = self.slideshow_folder_id
+
+        try:
+            self._copy_slide(slide_file_id, slideshow_folder_id)
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+
+            self.invalidate_folder_ids()
+            if self.slideshow_folder_id in (None, slideshow_folder_id):
+                raise
+
+            self._copy_slide(slide_file_id, self.slideshow_folder_id)
+
+    def _copy_slide(self, slide_file_id: str, slideshow_folder_id: str):
+        self.copy_slide_request(slide_file_id, slideshow_folder_id).execute()
+
+    def copy_slide_request(self, slide_file_id: str, slideshow_folder_id: str):
+        """
+        Build the unexecuted request copying a slide into the slideshow.
+        """
+        return self.drive_service.files().copy(
             fileId=slide_file_id,
             body={
                 "name": self.volunteer_name,
-                "parents": [self.slideshow_folder_id],
+                "parents": [slideshow_folder_id],
+                **self._app_properties(),
             },
+            fields="id",
+            supportsAllDrives=True,
+        )
+
+    def _app_properties(self) -> dict:
+        if self.user_id is None:
+            return {}
+        return {"appProperties": {USER_ID_PROPERTY: str(self.user_id)}}
+
+    def user_file_search(self, drive_id: str, folder_id: str) -> list[dict]:
+        """
+        Find the files in a folder stamped with the volunteer's user id.
+        """
+        return (
+            self.drive_service.files()
+            .list(
+                q=(
+                    f'{user_id_query(self.user_id)} and "{folder_id}" in parents'
+                    f" and trashed=false"
+                ),
+                fields="files(id)",
+                supportsAllDrives=True,
+                driveId=drive_id,
+                corpora="drive",
+                includeItemsFromAllDrives=True,
+            )
+            .execute()
+            .get("files", [])
+        )
+
+    def stamp_user_id(self, file_id: str):
+        """
+        Stamp a file with the volunteer's user id.
+        """
+        self.drive_service.files().update(
+            fileId=file_id,
+            body=self._app_properties(),
+            fields="id",
             supportsAllDrives=True,
         ).execute()
 
@@ -149,18 +669,25 @@ class DriveOperations:
         """
         Trash slide.
         """
-        self.drive_service.files().update(
+        self.trash_slide_request(slide_file_id).execute()
+
+    def trash_slide_request(self, slide_file_id: str):
+        """
+        Build the unexecuted request trashing a slide.
+        """
+        return self.drive_service.files().update(
             fileId=slide_file_id,
             body={"trashed": True},
+            fields="id",
             supportsAllDrives=True,
-        ).execute()
+        )
 
     def asmbly_drive_file_search(self, drive_id, search_query):
         """
         Search Asmbly shared drive for files.
         """
 
-        fields = "files(id, name, mimeType)"
+        fields = "files(id, name, mimeType, appProperties)"
         results = (
             self.drive_service.files()
             .list(  # pylint: disable=maybe-no-member
@@ -196,7 +723,16 @@ class DriveOperations:
     def check_timesheet_exists(self):
         """
         Check if volunteer's timesheet already exists in the shared Drive.
+
+        Timesheets stamped with the volunteer's user id are found by it. Otherwise
+        the timesheet is found by name, skipping timesheets stamped for another
+        volunteer of the same name, and is stamped for next time.
         """
+        if self.user_id is not None:
+            stamped = self.user_file_search(self.on_duty_drive_id, self.parent_folder_id)
+            if stamped:
+                return stamped
+
         search_query = (
             f'mimeType="application/vnd.google-apps.spreadsheet"'
             f' and "{self.parent_folder_id}" in parents'
@@ -205,8 +741,20 @@ class DriveOperations:
         )
 
         result = self.asmbly_drive_file_search(self.on_duty_drive_id, search_query)
+        files = result.get("files", [])
+
+        if self.user_id is None:
+            return files
+
+        files = [
+            file
+            for file in files
+            if USER_ID_PROPERTY not in (file.get("appProperties") or {})
+        ]
+        if files:
+            self.stamp_user_id(files[0].get("id"))
 
-        return result.get("files", [])
+        return files
 
     def create_timesheet(self):
         """
@@ -219,7 +767,9 @@ class DriveOperations:
                 body={
                     "name": f"ODV Timesheet - {self.volunteer_name}",
                     "parents": [self.parent_folder_id],
+                    **self._app_properties(),
                 },
+                fields="id",
                 supportsAllDrives=True,
             )
             .execute()
@@ -227,6 +777,90 @@ class DriveOperations:
         )
 
 
+def update_slideshows(changes: list[tuple[DriveOperations, bool]]) -> dict:
+    """
+    Add volunteers to the slideshow (True) or remove them from it (False) with one
+    batch of slide searches and one batch of copies and trashes. A failed copy
+    is retried on its own, which looks up stale ids again.
+
+    Returns the failures, as {volunteer name: exception}.
+    """
+    if not changes:
+        return {}
+
+    searches = DriveBatch(changes[0][0].drive_service)
+    slide_ids = {}
+    for index, (drive_ops, clock_in) in enumerate(changes):
+        if clock_in and drive_ops.volunteer_slides_folder_id is None:
+            logging.error("Folder '%s' not found", VOLUNTEER_SLIDES_FOLDER_NAME)
+        elif not clock_in and drive_ops.slideshow_folder_id is None:
+            logging.error("Folder '%s' not found", SLIDESHOW_FOLDER_NAME)
+        elif clock_in and drive_ops.slide_file_id is not None:
+            slide_ids[index] = drive_ops.slide_file_id
+        elif clock_in:
+            searches.add(
+                str(index),
+                drive_ops.slide_search_request(
+                    drive_ops.on_duty_drive_id,
+                    drive_ops.volunteer_name,
+                    drive_ops.volunteer_slides_folder_id,
+                ),
+            )
+        else:
+            searches.add(
+                str(index),
+                drive_ops.slide_search_request(
+                    drive_ops.main_drive_id,
+                    drive_ops.volunteer_name,
+                    drive_ops.slideshow_folder_id,
+                ),
+            )
+
+    failures = {}
+    for key, response in searches.execute().items():
+        drive_ops, clock_in = changes[int(key)]
+        if isinstance(response, HttpError):
+            failures[drive_ops.volunteer_name] = response
+            continue
+
+        files = drive_ops.own_files(response).get("files", [])
+        if files:
+            slide_ids[int(key)] = files[0].get("id")
+        elif clock_in:
+            logging.info("No slide for %s, consider adding them", drive_ops.volunteer_name)
+
+    updates = DriveBatch(changes[0][0].drive_service)
+    for index, slide_file_id in slide_ids.items():
+        drive_ops, clock_in = changes[index]
+        if clock_in:
+            drive_ops.slide_file_id = slide_file_id
+            updates.add(
+                str(index),
+                drive_ops.copy_slide_request(slide_file_id, drive_ops.slideshow_folder_id),
+            )
+        else:
+            updates.add(str(index), drive_ops.trash_slide_request(slide_file_id))
+
+    for key, response in updates.execute().items():
+        drive_ops, clock_in = changes[int(key)]
+        if not isinstance(response, HttpError):
+            continue
+
+        if clock_in and response.resp.status == 404:
+            try:
+                drive_ops.add_volunteer_to_slideshow()
+                continue
+            except HttpError as e:
+                response = e
+
+        failures[drive_ops.volunteer_name] = response
+
+    for volunteer_name, exception in failures.items():
+        logging.error("Slideshow update failed for %s: %s", volunteer_name, exception)
+
+    return failures
+
+
 class SheetsOperations:
     """
     Class for Google Sheets operations related to a specific volunteer.
@@ -234,20 +868,35 @@ class SheetsOperations:
     individual ODV Log Sheet as well as the Master Log.
     """
 
-    def __init__(self, sheets_service, volunteer_name, volunteer_timesheet_id):
+    def __init__(
+        self,
+        sheets_service,
+        volunteer_name,
+        volunteer_timesheet_id,
+        master_sheet_id=None,
+    ):
         self.sheets_service = sheets_service
         self.volunteer_name = volunteer_name
-        self.master_sheet_id = MASTER_LOG_SPREADSHEET_ID
+        self.master_sheet_id = master_sheet_id or MASTER_LOG_SPREADSHEET_ID
         self.volunteer_timesheet_id = volunteer_timesheet_id
         self.sheet = sheets_service.spreadsheets()
 
+    def range_prefix(self, master=False) -> str:
+        """
+        Sheet name used in A1 ranges for the individual timesheet or master log.
+        """
+        return f"'{self.volunteer_name}'" if master else "Sheet1"
+
     def initialize_copied_template(self):
         """
         Initialize copied template timesheet with formatting,
-        names, range protection, etc.
+        names, range protection, etc. Returns the sheetId of the timesheet tab.
         """
         ind_sheet = (
-            self.sheet.get(spreadsheetId=self.volunteer_timesheet_id)
+            self.sheet.get(
+                spreadsheetId=self.volunteer_timesheet_id,
+                fields="sheets(properties.sheetId,protectedRanges.protectedRangeId)",
+            )
             .execute()
             .get("sheets")[0]
         )
@@ -263,6 +912,7 @@ class SheetsOperations:
             range="Sheet1!F1:F2",
             body={"values": [[name_field], ["Notes/Comments"]]},
             valueInputOption="USER_ENTERED",
+            fields="updates.updatedRange",
         ).execute()
 
         self.batch_update_copied_spreadsheet(
@@ -271,143 +921,219 @@ class SheetsOperations:
             protected_range_id,
         )
 
-    def get_last_entry_datetime(
-        self, clock_in: bool = True
-    ) -> datetime.datetime | None:
-        """Get the datetime of the last clock-in or clock-out entry in the spreadsheet"""
+        return sheet_id
+
+    def record_clock_in(self, log_entry: tuple, credentials=None, master=True):
+        """
+        Write a clock-in entry to the individual timesheet and, unless master is False,
+        the master log. One values.batchGet to find the row and one values.batchUpdate
+        per spreadsheet, run concurrently if credentials are given.
+        """
+        writer = TimesheetBatchWriter(self.sheets_service, credentials)
+        writer.add_clock_in(self.volunteer_timesheet_id, self.range_prefix(), log_entry)
+        if master:
+            writer.add_clock_in(
+                self.master_sheet_id, self.range_prefix(master=True), log_entry
+            )
+        writer.execute()
+
+    def record_clock_out(self, log_entry: str, credentials=None, master=True):
+        """
+        Write a clock-out entry and its Hours cell to the individual timesheet and,
+        unless master is False, the master log. One values.batchUpdate per spreadsheet.
+        """
+        writer = TimesheetBatchWriter(self.sheets_service, credentials)
+        writer.add_clock_out(self.volunteer_timesheet_id, self.range_prefix(), log_entry)
+        if master:
+            writer.add_clock_out(
+                self.master_sheet_id, self.range_prefix(master=True), log_entry
+            )
+        writer.execute()
 
-        date_index = 0
-        time_index = 1 if clock_in else 2
+    def convert_hours_formulas(self, master=False) -> int:
+        """
+        Replace Hours formulas in the individual timesheet or master log with
+        computed values. Rows that can't be parsed keep their formula. Returns the
+        number of rows converted.
+        """
+        spreadsheet_id = self.master_sheet_id if master else self.volunteer_timesheet_id
+        prefix = self.range_prefix(master)
 
-        log_entries = (
+        # Formulas are read as written, with dates and times as displayed
+        rows = (
             self.sheet.values()
             .get(
-                spreadsheetId=self.volunteer_timesheet_id,
-                range="Sheet1!A3:C",  # Columns are A: Date, B: Clock-in time, C: Clock-out time
+                spreadsheetId=spreadsheet_id,
+                range=f"{prefix}!A3:D",
                 majorDimension="ROWS",
+                valueRenderOption="FORMULA",
                 dateTimeRenderOption="FORMATTED_STRING",
+                fields="values",
             )
             .execute()
-            .get("values")
+            .get("values", [])
         )
 
-        if not log_entries or len(log_entries) == 0:
-            return None
+        data = []
+        for row_number, row in enumerate(rows, start=3):
+            if len(row) < 4 or not str(row[3]).startswith("="):
+                continue
 
-        date_part = log_entries[-1][date_index]
-        if not date_part:
-            date_part = datetime.datetime.now().strftime("%m/%d/%Y")
-        elif re.match(r"\d{1,2}/\d{1,2}/\d{4}", date_part) is None:
-            return None
+            hours = shift_hours(row[:2], row[2])
+            if hours is not None:
+                data.append(
+                    {"range": f"{prefix}!D{row_number}", "values": [[hours]]}
+                )
 
-        time_part = log_entries[-1]
-        if len(time_part) < time_index + 1:
-            time_part = (
-                datetime.datetime.now() - datetime.timedelta(hours=1)
-            ).strftime("%I:%M %p")
-        else:
-            time_part = time_part[time_index]
+        if data:
+            self.sheet.values().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={"valueInputOption": "USER_ENTERED", "data": data},
+                fields="totalUpdatedCells",
+            ).execute()
 
-        return datetime.datetime.strptime(
-            f"{date_part} {time_part}", "%m/%d/%Y %I:%M %p"
-        )
+        return len(data)
 
-    def add_clock_in_entry_to_timesheet(self, log_entry: tuple, master=False):
+    def get_all_sheets(self):
         """
-        Add clock-in entry to individual timesheet or master log.
+        Get all sheets in the Master Log. Only the sheet IDs and titles are fetched.
         """
-        self.sheet.values().append(
-            spreadsheetId=(
-                self.master_sheet_id if master else self.volunteer_timesheet_id
-            ),
-            range=f"'{self.volunteer_name}'!A3:B" if master else "Sheet1!A3:B",
-            body={"values": [[log_entry[0], log_entry[1]]]},
-            valueInputOption="USER_ENTERED",
-        ).execute()
+        return (
+            self.sheet.get(
+                spreadsheetId=self.master_sheet_id,
+                fields="sheets.properties(sheetId,title)",
+            )
+            .execute()
+            .get("sheets")
+        )
 
-    def add_clock_out_entry_to_timesheet(self, log_entry: str, master=False):
+    def get_master_sheet_ids(self, refresh=False) -> dict:
         """
-        Add clock-out entry to individual timesheet or master log.
+        Get the cached title -> sheetId map of the Master Log.
         """
+        sheet_ids = None if refresh else master_sheets.get(self.master_sheet_id)
 
-        def get_currents_rows():
-            return (
-                self.sheet.values()
-                .get(
-                    spreadsheetId=(
-                        self.master_sheet_id if master else self.volunteer_timesheet_id
-                    ),
-                    range=f"'{self.volunteer_name}'!A1:B" if master else "Sheet1!A1:B",
-                    majorDimension="ROWS",
+        if sheet_ids is None:
+            sheet_ids = {
+                sheet.get("properties").get("title"): sheet.get("properties").get(
+                    "sheetId"
                 )
-                .execute()
-                .get("values")
-            )
-
-        current_rows = get_currents_rows()
-
-        last_row = len(current_rows)
+                for sheet in self.get_all_sheets() or []
+            }
+            master_sheets.set(self.master_sheet_id, sheet_ids, MASTER_SHEETS_TTL)
 
-        current_row = last_row if last_row > 2 else 3
-
-        if master:
-            self.sheet.values().update(
-                spreadsheetId=self.master_sheet_id,
-                range=(f"'{self.volunteer_name}'!C{current_row}" f":D{current_row}"),
-                body={
-                    "values": [
-                        [
-                            log_entry,
-                            (
-                                f"=IF(C{current_row}-B{current_row}>0, C{current_row}-B{current_row}, 1 + (C{current_row}-B{current_row}))"
-                            ),
-                        ]
-                    ]
-                },
-                valueInputOption="USER_ENTERED",
-            ).execute()
-
-            return
-
-        self.sheet.values().update(
-            spreadsheetId=self.volunteer_timesheet_id,
-            range=f"Sheet1!C{current_row}:D{current_row}",
-            body={
-                "values": [
-                    [
-                        log_entry,
-                        f"=IF(C{current_row}-B{current_row}>0, C{current_row}-B{current_row}, 1 + (C{current_row}-B{current_row}))",
-                    ]
-                ]
-            },
-            valueInputOption="USER_ENTERED",
-        ).execute()
-
-    def get_all_sheets(self):
-        """
-        Get all sheets in the Master Log.
-        """
-        return (
-            self.sheet.get(spreadsheetId=self.master_sheet_id).execute().get("sheets")
-        )
+        return sheet_ids
 
     def check_master_log(self):
         """
         Check if a sheet already exsists in the Master Log for this volunteer.
         """
+        if self.volunteer_name in self.get_master_sheet_ids():
+            return True
+
+        # The tab may have been added since the map was cached
+        return self.volunteer_name in self.get_master_sheet_ids(refresh=True)
 
-        all_sheets = self.get_all_sheets()
+    def claim_pooled_master_tab(self) -> bool:
+        """
+        Claim a pre-formatted Master Log tab for this volunteer, renaming it and
+        setting its title row in one batchUpdate. Returns False if no pooled tab
+        could be claimed.
 
-        for sheet in all_sheets:
-            if sheet.get("properties").get("title") == self.volunteer_name:
-                return True
+        Each claim adds a named range unique to the tab, so if two volunteers
+        claim the same tab, the second batchUpdate fails as a whole.
+        """
+        sheet_ids = master_sheets.get(self.master_sheet_id)
+        if not sheet_ids:
+            return False
+
+        pooled = [title for title in sheet_ids if title.startswith(POOL_TAB_PREFIX)]
+        random.shuffle(pooled)
+
+        for title in pooled[:3]:
+            sheet_id = sheet_ids[title]
+            sheet_ids = {key: value for key, value in sheet_ids.items() if key != title}
+
+            try:
+                self.sheet.batchUpdate(
+                    spreadsheetId=self.master_sheet_id,
+                    body={
+                        "requests": [
+                            {
+                                "addNamedRange": {
+                                    "namedRange": {
+                                        "name": f"Claimed_{sheet_id}",
+                                        "range": {
+                                            "sheetId": sheet_id,
+                                            "startRowIndex": 0,
+                                            "endRowIndex": 1,
+                                            "startColumnIndex": 0,
+                                            "endColumnIndex": 1,
+                                        },
+                                    }
+                                }
+                            },
+                            {
+                                "updateSheetProperties": {
+                                    "properties": {
+                                        "sheetId": sheet_id,
+                                        "title": self.volunteer_name,
+                                        "hidden": False,
+                                    },
+                                    "fields": "title,hidden",
+                                }
+                            },
+                            {
+                                "updateCells": {
+                                    "rows": [
+                                        {
+                                            "values": [
+                                                {
+                                                    "userEnteredValue": {
+                                                        "stringValue": (
+                                                            f"On-Duty Volunteer Timesheet - "
+                                                            f"{self.volunteer_name}"
+                                                        )
+                                                    }
+                                                }
+                                            ]
+                                        }
+                                    ],
+                                    "fields": "userEnteredValue",
+                                    "start": {
+                                        "sheetId": sheet_id,
+                                        "rowIndex": 0,
+                                        "columnIndex": 0,
+                                    },
+                                }
+                            },
+                        ]
+                    },
+                    fields="spreadsheetId",
+                ).execute()
+            except HttpError as e:
+                # Already claimed by another container
+                logging.warning("Could not claim master tab %s: %s", title, e)
+                continue
+
+            master_sheets.set(
+                self.master_sheet_id,
+                {**sheet_ids, self.volunteer_name: sheet_id},
+                MASTER_SHEETS_TTL,
+            )
+            return True
 
+        master_sheets.set(self.master_sheet_id, sheet_ids, MASTER_SHEETS_TTL)
         return False
 
     def create_odv_sheet_in_master_spreadsheet(self):
         """
-        Create a new sheet in the Master Log for this volunteer.
+        Create a new sheet in the Master Log for this volunteer, or claim a
+        pre-formatted one if the pool has any.
         """
+        if self.claim_pooled_master_tab():
+            return
+
         new_sheet_id = (
             self.sheet.batchUpdate(
                 spreadsheetId=self.master_sheet_id,
@@ -416,6 +1142,7 @@ class SheetsOperations:
                         {"addSheet": {"properties": {"title": self.volunteer_name}}}
                     ]
                 },
+                fields="replies.addSheet.properties.sheetId",
             )
             .execute()
             .get("replies")[0]
@@ -424,6 +1151,14 @@ class SheetsOperations:
             .get("sheetId")
         )
 
+        sheet_ids = master_sheets.get(self.master_sheet_id)
+        if sheet_ids is not None:
+            master_sheets.set(
+                self.master_sheet_id,
+                {**sheet_ids, self.volunteer_name: new_sheet_id},
+                MASTER_SHEETS_TTL,
+            )
+
         self.batch_update_new_master_sheet(
             self.master_sheet_id,
             new_sheet_id,
@@ -494,7 +1229,9 @@ class SheetsOperations:
                 },
             )
 
-        self.sheet.batchUpdate(spreadsheetId=file_id, body=body).execute()
+        self.sheet.batchUpdate(
+            spreadsheetId=file_id, body=body, fields="spreadsheetId"
+        ).execute()
 
     def batch_update_new_master_sheet(self, file_id, new_sheet_id, user_full_name):
         """
@@ -685,4 +1422,212 @@ class SheetsOperations:
                     },
                 ]
             },
+            fields="spreadsheetId",
         ).execute()
+
+
+class TimesheetBatchWriter:
+    """
+    Coalesce clock-in and clock-out entries for many volunteers into one
+    values.batchUpdate call per spreadsheet.
+
+    Entries must be added in the order they happened. Row positions are read
+    with a single values.batchGet per spreadsheet when the batch is executed.
+    Each sheet is read from its row pointer down, so rows written by another
+    container or by hand are found before any row is written.
+
+    If credentials are given, spreadsheets are written concurrently, each on a
+    thread with its own API client.
+    """
+
+    def __init__(self, sheets_service, credentials=None):
+        self.sheet = sheets_service.spreadsheets()
+        self.credentials = credentials
+        # {spreadsheet_id: {range_prefix: [(clock_in, log_entry), ...]}}
+        self._entries = {}
+
+    def _add(self, spreadsheet_id: str, range_prefix: str, clock_in: bool, log_entry):
+        self._entries.setdefault(spreadsheet_id, {}).setdefault(
+            range_prefix, []
+        ).append((clock_in, log_entry))
+
+    def add_clock_in(self, spreadsheet_id: str, range_prefix: str, log_entry: tuple):
+        """
+        Queue a clock-in (date, time) entry for the sheet, e.g. range_prefix "Sheet1".
+        """
+        self._add(spreadsheet_id, range_prefix, True, log_entry)
+
+    def add_clock_out(self, spreadsheet_id: str, range_prefix: str, log_entry: str):
+        """
+        Queue a clock-out time entry for the sheet, e.g. range_prefix "'Volunteer Name'".
+        """
+        self._add(spreadsheet_id, range_prefix, False, log_entry)
+
+    def read_rows(self, spreadsheet_id: str, sheet=None) -> tuple[dict, dict]:
+        """
+        Get the number of used rows in each queued sheet of the spreadsheet, and the
+        clock-in entry of its last row. Sheets are read from their row pointer, or
+        row 1, to the end with one values.batchGet. A sheet that ends above its
+        pointer is read again from row 1.
+        """
+        sheet = sheet or self.sheet
+
+        row_counts = {}
+        clock_ins = {}
+        starts = {}
+
+        for prefix in self._entries.get(spreadsheet_id, {}):
+            starts[prefix] = get_row_pointer(spreadsheet_id, prefix) or 1
+
+        while starts:
+            value_ranges = (
+                sheet.values()
+                .batchGet(
+                    spreadsheetId=spreadsheet_id,
+                    ranges=[f"{prefix}!A{start}:C" for prefix, start in starts.items()],
+                    majorDimension="ROWS",
+                    fields="valueRanges.values",
+                )
+                .execute()
+                .get("valueRanges", [])
+            )
+
+            stale = {}
+            for (prefix, start), value_range in zip(starts.items(), value_ranges):
+                values = value_range.get("values", [])
+
+                last_row = last_row_from_values(start, values)
+                if last_row is None:
+                    stale[prefix] = 1
+                    continue
+
+                row_counts[prefix] = last_row
+                if last_row >= 3 and values[-1]:
+                    clock_ins[prefix] = tuple(values[-1][:2])
+
+            starts = stale
+
+        return row_counts, clock_ins
+
+    def plan(
+        self, spreadsheet_id: str, row_counts: dict, clock_ins: dict | None = None
+    ) -> list[dict]:
+        """
+        Build the value ranges for all queued entries of a spreadsheet. Hours are
+        computed from the clock-in entry of the row when it is known.
+
+        Batches are safe to replay: if the sheet's last row already holds the last
+        queued clock-in, the entries up to it were written before, and only the
+        clock-outs after it are written again, to the same row.
+        """
+        data = []
+
+        for prefix, entries in self._entries.get(spreadsheet_id, {}).items():
+            last_row = row_counts.get(prefix, 0)
+            clock_in_entry = (clock_ins or {}).get(prefix)
+
+            last_clock_in = max(
+                (index for index, (clock_in, _) in enumerate(entries) if clock_in),
+                default=None,
+            )
+            if last_clock_in is not None and same_clock_in(
+                entries[last_clock_in][1], clock_in_entry
+            ):
+                entries = entries[last_clock_in + 1 :]
+
+            for clock_in, log_entry in entries:
+                if clock_in:
+                    # Entries start on row 3, below the title and header rows
+                    last_row = max(last_row, 2) + 1
+                    clock_in_entry = log_entry
+                    data.append(
+                        {
+                            "range": f"{prefix}!A{last_row}:B{last_row}",
+                            "values": [[log_entry[0], log_entry[1]]],
+                        }
+                    )
+                else:
+                    current_row = last_row if last_row > 2 else 3
+                    data.append(
+                        {
+                            "range": f"{prefix}!C{current_row}:D{current_row}",
+                            "values": [
+                                [
+                                    log_entry,
+                                    hours_value(current_row, clock_in_entry, log_entry),
+                                ]
+                            ],
+                        }
+                    )
+
+        return data
+
+    def _write(self, spreadsheet_id: str, sheet) -> dict:
+        sheets = self._entries[spreadsheet_id]
+        row_counts, clock_ins = self.read_rows(spreadsheet_id, sheet)
+        data = self.plan(spreadsheet_id, row_counts, clock_ins)
+
+        # Nothing is left to write if everything queued was written before
+        response = {}
+        if data:
+            response = (
+                sheet.values()
+                .batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    body={
+                        "valueInputOption": "USER_ENTERED",
+                        "data": data,
+                    },
+                    fields="totalUpdatedCells",
+                )
+                .execute()
+            )
+
+        for prefix in sheets:
+            last_row = max(
+                [row_counts.get(prefix, 0)]
+                + [
+                    row_from_range(value_range["range"])
+                    for value_range in data
+                    if value_range["range"].startswith(f"{prefix}!")
+                ]
+            )
+            set_row_pointer(spreadsheet_id, prefix, last_row)
+
+        return response
+
+    def execute(self) -> dict:
+        """
+        Write all queued entries. Returns the batchUpdate response for each spreadsheet.
+        Every spreadsheet is attempted. If any write fails, the first failure is raised.
+        """
+        responses = {}
+
+        try:
+            if self.credentials is None or len(self._entries) < 2:
+                for spreadsheet_id in self._entries:
+                    responses[spreadsheet_id] = self._write(spreadsheet_id, self.sheet)
+                return responses
+
+            def write_on_own_client(spreadsheet_id):
+                # API clients can't be shared between threads
+                sheet = get_service("sheets", "v4", self.credentials).spreadsheets()
+                responses[spreadsheet_id] = self._write(spreadsheet_id, sheet)
+
+            failures = run_steps(
+                {
+                    spreadsheet_id: (
+                        lambda spreadsheet_id=spreadsheet_id: write_on_own_client(
+                            spreadsheet_id
+                        )
+                    )
+                    for spreadsheet_id in self._entries
+                }
+            )
+
+            if failures:
+                raise next(iter(failures.values()))
+
+            return responses
+        finally:
+            self._entries = {}
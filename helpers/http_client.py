@@ -0,0 +1,259 @@
+"""
+Shared HTTP client for outbound integrations (Openpath, Slack, etc.).
+
+Keeps one keep-alive connection pool per host for the life of the container,
+bounds each call with a deadline, retries transient failures with jittered
+exponential backoff (respecting Retry-After), and records per-host metrics.
+Handlers log the metrics of each invocation with metrics_summary() and then
+reset them with reset_metrics().
+"""
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Methods that are safe to repeat after the server may have processed them
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+@dataclass
+class HostMetrics:
+    """
+    Request counts and latency for a single host.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        """Average latency of a request attempt in seconds."""
+        return self.total_latency / self.requests if self.requests else 0.0
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header, given either in seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """
+    Pooled, retrying HTTP client. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 5,
+        pool_maxsize: int = 10,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.pool_maxsize = pool_maxsize
+        self.metrics = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, host: str) -> requests.Session:
+        """
+        Get the keep-alive session for a host, creating it on first use.
+        """
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_maxsize
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+
+            return session
+
+    def _record(self, host: str, latency: float, error: bool, retry: bool):
+        with self._lock:
+            metrics = self.metrics.setdefault(host, HostMetrics())
+            metrics.requests += 1
+            metrics.errors += int(error)
+            metrics.retries += int(retry)
+            metrics.total_latency += latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+
+    def metrics_summary(self) -> dict:
+        """
+        Get the metrics recorded so far, as {host: {"requests", "errors",
+        "retries", "averageLatency", "maxLatency"}} with latencies in seconds.
+        """
+        with self._lock:
+            return {
+                host: {
+                    "requests": metrics.requests,
+                    "errors": metrics.errors,
+                    "retries": metrics.retries,
+                    "averageLatency": round(metrics.average_latency, 3),
+                    "maxLatency": round(metrics.max_latency, 3),
+                }
+                for host, metrics in self.metrics.items()
+            }
+
+    def reset_metrics(self):
+        """Forget the recorded metrics, e.g. at the start of an invocation."""
+        with self._lock:
+            self.metrics.clear()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        deadline: float | None = None,
+        max_retries: int | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request, retrying transient failures until the deadline (seconds
+        from now) is reached. kwargs are passed to requests.Session.request, and
+        a timeout given there applies to each attempt.
+
+        Returns the last response. Raises the last exception if no response was received.
+        """
+        method = method.upper()
+        host = urlsplit(url).netloc
+        session = self.session(host)
+        max_retries = self.max_retries if max_retries is None else max_retries
+        attempt_timeout = kwargs.pop("timeout", self.timeout)
+        end = time.monotonic() + (deadline if deadline is not None else attempt_timeout)
+
+        attempt = 0
+        while True:
+            remaining = end - time.monotonic()
+            start = time.monotonic()
+            response = None
+            exception = None
+
+            try:
+                response = session.request(
+                    method, url, timeout=max(min(attempt_timeout, remaining), 0.1), **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                exception = e
+
+            latency = time.monotonic() - start
+
+            retryable = (
+                exception is not None
+                # A connect timeout means the request was never sent
+                and (
+                    method in IDEMPOTENT_METHODS
+                    or isinstance(exception, requests.ConnectTimeout)
+                )
+            ) or (
+                response is not None
+                and response.status_code in RETRY_STATUS_CODES
+                # A 429 means the request was rejected, so it is always safe to repeat
+                and (method in IDEMPOTENT_METHODS or response.status_code == 429)
+            )
+
+            delay = self._backoff(attempt)
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+
+            will_retry = (
+                retryable
+                and attempt < max_retries
+                and time.monotonic() + delay < end
+            )
+
+            self._record(
+                host,
+                latency,
+                error=exception is not None
+                or (response is not None and response.status_code >= 400),
+                retry=will_retry,
+            )
+
+            if not will_retry:
+                if exception is not None:
+                    raise exception
+                return response
+
+            logging.info(
+                "Retrying %s %s in %.2fs (attempt %s)", method, host, delay, attempt + 1
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def with_headers(self, headers: dict) -> "BoundHttpClient":
+        """
+        Get a view of this client that adds headers to every request.
+        """
+        return BoundHttpClient(self, headers)
+
+
+class BoundHttpClient:
+    """
+    HttpClient view that adds fixed headers, e.g. an Authorization header.
+    Has the same get/post interface as requests.Session.
+    """
+
+    def __init__(self, client: HttpClient, headers: dict):
+        self.client = client
+        self.headers = headers
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request with the bound headers."""
+        kwargs["headers"] = {**self.headers, **(kwargs.get("headers") or {})}
+        return self.client.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+
+http_client = HttpClient()
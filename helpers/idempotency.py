@@ -0,0 +1,67 @@
+"""
+Idempotency and debounce checks for Openpath events.
+"""
+
+import os
+import logging
+
+from helpers.cache import get_store, shared_backend
+
+
+class DebounceStore:
+    """
+    Reject repeated presses of the same button by the same volunteer.
+
+    Accepted presses are recorded under (user id, entry, timestamp bucket) for
+    twice the debounce window. A press is a duplicate if a press was accepted
+    within window_seconds of it, which only needs the neighbouring buckets.
+
+    Presses can land on any container, so the store must be shared, i.e.
+    CACHE_BACKEND set to "dynamodb". Otherwise only presses handled by the same
+    container are debounced.
+    """
+
+    def __init__(self, window_seconds: int = 180, store=None):
+        self.window_seconds = window_seconds
+        if store is None:
+            store = get_store("debounce")
+            if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") and not shared_backend():
+                logging.warning(
+                    "CACHE_BACKEND is not shared, so presses are only debounced "
+                    "per container"
+                )
+        self.store = store
+
+    def _key(self, user_id: int, entry: str, bucket: int) -> str:
+        return f"{user_id}:{entry}:{bucket}"
+
+    def is_duplicate(self, user_id: int, entry: str, timestamp: int) -> bool:
+        """
+        Check if the event is a duplicate. If it isn't, record it and return False.
+        """
+        bucket = timestamp // self.window_seconds
+
+        for key in (
+            self._key(user_id, entry, bucket - 1),
+            self._key(user_id, entry, bucket),
+            self._key(user_id, entry, bucket + 1),
+        ):
+            accepted = self.store.get(key)
+            if accepted is not None and abs(timestamp - accepted) < self.window_seconds:
+                return True
+
+        # add() is atomic, so only one of two concurrent presses in a bucket wins
+        return not self.store.add(
+            self._key(user_id, entry, bucket), timestamp, ttl=2 * self.window_seconds
+        )
+
+    def release(self, user_id: int, entry: str, timestamp: int):
+        """
+        Forget an accepted press, e.g. because processing it failed, so a retry
+        of the same event is accepted.
+        """
+        bucket = timestamp // self.window_seconds
+        key = self._key(user_id, entry, bucket)
+
+        if self.store.get(key) == timestamp:
+            self.store.delete(key)
@@ -0,0 +1,168 @@
+"""
+Write-behind journal for Master Log updates.
+
+The Master Log is shared by every volunteer, so in write-behind mode the clock
+event handler only writes the individual timesheet and journals the Master Log
+update. A scheduled flusher applies journaled updates with one values.batchUpdate.
+
+The backend is chosen with the MASTER_LOG_JOURNAL_BACKEND environment variable:
+"sqs" (MASTER_LOG_JOURNAL_URL, preferably a FIFO queue), "sqlite"
+(MASTER_LOG_JOURNAL_PATH) or "memory". When it is unset, the Master Log is
+written synchronously.
+
+Only "sqs" can be drained by a flusher running in another container. "sqlite",
+which defaults to a file in /tmp, and "memory" are local stand-ins for
+development, and are refused in Lambda.
+
+SQS may deliver an entry more than once, to any flusher container. Applied entry
+ids are kept in the cache, which is shared when CACHE_BACKEND is "dynamodb".
+Replays are also safe without it, because the batch writer skips entries that
+the Master Log already holds.
+"""
+
+import os
+import threading
+
+from helpers.cache import get_store
+from helpers.event_queue import EventQueue, QueuedMessage, create_queue
+from helpers.openpath_classes import OpenpathEvent
+from helpers.google_services import SheetsOperations, TimesheetBatchWriter
+
+# Most journal entries read by one flush
+MAX_FLUSH_ENTRIES = 500
+
+# Applied entry ids are remembered this long so redelivered entries are skipped
+APPLIED_TTL = 7 * 24 * 60 * 60
+
+applied_entries = get_store("master_journal_applied")
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_master_journal() -> EventQueue | None:
+    """
+    Get the configured Master Log journal for this container, or None if the
+    Master Log should be written synchronously.
+    """
+    global _journal  # pylint: disable=global-statement
+
+    backend = os.environ.get("MASTER_LOG_JOURNAL_BACKEND")
+    if not backend:
+        return None
+
+    if backend != "sqs" and os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
+        raise ValueError(
+            f"Master log journal backend {backend} is local to one container, use sqs"
+        )
+
+    with _journal_lock:
+        if _journal is None:
+            _journal = create_queue(
+                backend,
+                url=os.environ.get("MASTER_LOG_JOURNAL_URL"),
+                path=os.environ.get(
+                    "MASTER_LOG_JOURNAL_PATH", "/tmp/odv_master_journal.sqlite3"
+                ),
+            )
+
+    return _journal
+
+
+def journal_master_entry(
+    journal: EventQueue,
+    volunteer_name: str,
+    op_event: OpenpathEvent,
+    log_entry,
+    clock_in: bool,
+    master_sheet_id: str | None = None,
+):
+    """
+    Journal a clock-in (date, time) or clock-out time entry for the volunteer's
+    tab in the Master Log spreadsheet (MASTER_LOG_SPREADSHEET_ID by default).
+    """
+    entry_id = f"{op_event.user_id}:{op_event.timestamp}:{'in' if clock_in else 'out'}"
+
+    journal.put(
+        {
+            "id": entry_id,
+            "volunteer": volunteer_name,
+            "userId": op_event.user_id,
+            "timestamp": op_event.timestamp,
+            "clockIn": clock_in,
+            "entry": list(log_entry) if clock_in else log_entry,
+            "spreadsheetId": master_sheet_id,
+        },
+        group_id=str(op_event.user_id),
+        deduplication_id=entry_id,
+    )
+
+
+def read_journal(
+    journal: EventQueue, max_entries: int = MAX_FLUSH_ENTRIES
+) -> list[QueuedMessage]:
+    """
+    Receive up to max_entries journaled entries.
+    """
+    messages = []
+    while len(messages) < max_entries:
+        received = journal.receive(min(10, max_entries - len(messages)))
+        if not received:
+            break
+        messages.extend(received)
+
+    return messages
+
+
+def apply_master_entries(sheets_service, entries: list[dict]) -> int:
+    """
+    Apply journaled entries to the Master Log with one values.batchUpdate.
+
+    Entries are applied in timestamp order, so each volunteer's clock-in lands
+    before its clock-out. Entries that were already applied are skipped, so a
+    redelivered batch is safe to replay. Returns the number of entries written.
+    """
+    pending = {}
+    for entry in sorted(entries, key=lambda entry: entry["timestamp"]):
+        if entry["id"] in pending or applied_entries.get(entry["id"]) is not None:
+            continue
+        pending[entry["id"]] = entry
+
+    if not pending:
+        return 0
+
+    writer = TimesheetBatchWriter(sheets_service)
+    checked_tabs = set()
+
+    for entry in pending.values():
+        sheets_ops = SheetsOperations(
+            sheets_service, entry["volunteer"], None, entry.get("spreadsheetId")
+        )
+
+        # Check if sheet already exists for this volunteer in the master log sheet.
+        # If not, create it.
+        tab = (sheets_ops.master_sheet_id, entry["volunteer"])
+        if tab not in checked_tabs:
+            if not sheets_ops.check_master_log():
+                sheets_ops.create_odv_sheet_in_master_spreadsheet()
+            checked_tabs.add(tab)
+
+        if entry["clockIn"]:
+            writer.add_clock_in(
+                sheets_ops.master_sheet_id,
+                sheets_ops.range_prefix(master=True),
+                tuple(entry["entry"]),
+            )
+        else:
+            writer.add_clock_out(
+                sheets_ops.master_sheet_id,
+                sheets_ops.range_prefix(master=True),
+                entry["entry"],
+            )
+
+    writer.execute()
+
+    for entry_id in pending:
+        applied_entries.set(entry_id, True, APPLIED_TTL)
+
+    return len(pending)
@@ -0,0 +1,329 @@
+"""
+Time-based shards of the Master Log.
+
+With MASTER_LOG_SHARD_PERIOD set to "year" or "quarter", Master Log writes go to
+one spreadsheet per period instead of MASTER_LOG_SPREADSHEET_ID, which keeps the
+history written before sharding was turned on. A shard is created the first time
+its period is written, by copying MASTER_LOG_TEMPLATE_ID (or as a blank
+spreadsheet) into MASTER_LOG_SHARD_FOLDER_ID. The Drive app property
+masterLogShard is the shard registry, so every container finds the same shard.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+
+from googleapiclient.errors import HttpError
+
+from helpers.cache import get_store, shared_backend
+from helpers.fanout import run_steps
+from helpers.google_services import get_service
+
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
+    from credentials import (
+        ON_DUTY_DRIVE_ID,
+        MASTER_LOG_SPREADSHEET_ID,
+        PARENT_FOLDER_ID,
+    )
+else:
+    from config import (
+        ON_DUTY_DRIVE_ID,
+        MASTER_LOG_SPREADSHEET_ID,
+        PARENT_FOLDER_ID,
+    )
+
+SHARD_PERIODS = ("year", "quarter")
+
+SHARD_PROPERTY = "masterLogShard"
+
+SHARD_NAME_PREFIX = "ODV Master Log - "
+
+# Shards are never moved or deleted, so their ids can be cached for a long time
+SHARD_REGISTRY_TTL = 24 * 60 * 60
+
+# A clock-out goes to the shard of the shift's clock-in, even across a period
+# boundary. The open shift's shard is shared by every container when
+# CACHE_BACKEND is "dynamodb". Otherwise, a clock-out early in a period checks
+# the previous shard for an open shift.
+OPEN_SHIFT_TTL = 24 * 60 * 60
+
+shard_registry = get_store("master_log_shards")
+open_shift_shards = get_store("open_shift_shards", maxsize=1024)
+
+
+def shard_period() -> str | None:
+    """
+    Get the configured shard period, or None if the Master Log is not sharded.
+    """
+    period = os.environ.get("MASTER_LOG_SHARD_PERIOD")
+    if not period:
+        return None
+
+    if period not in SHARD_PERIODS:
+        raise ValueError(f"Unknown master log shard period: {period}")
+
+    return period
+
+
+def shard_key(when: datetime, period: str) -> str:
+    """
+    Get the shard key for a point in time, e.g. "2024" or "2024-Q1".
+    """
+    if period == "quarter":
+        return f"{when.year}-Q{(when.month - 1) // 3 + 1}"
+
+    return str(when.year)
+
+
+class MasterLogShards:
+    """
+    Look up, and create when needed, the Master Log spreadsheet for a period.
+    """
+
+    def __init__(self, drive_service, period: str | None = None, sheets_service=None):
+        self.drive_service = drive_service
+        self.sheets_service = sheets_service
+        self.period = period if period is not None else shard_period()
+        self.drive_id = ON_DUTY_DRIVE_ID
+        self.folder_id = os.environ.get("MASTER_LOG_SHARD_FOLDER_ID", PARENT_FOLDER_ID)
+        self.template_id = os.environ.get("MASTER_LOG_TEMPLATE_ID")
+
+    def for_clock_event(
+        self,
+        user_id: int,
+        when: datetime,
+        clock_in: bool,
+        volunteer_name: str | None = None,
+    ) -> str:
+        """
+        Get the Master Log spreadsheet id for a volunteer's clock event.
+        """
+        if self.period is None:
+            return MASTER_LOG_SPREADSHEET_ID
+
+        if clock_in:
+            key = shard_key(when, self.period)
+            open_shift_shards.set(str(user_id), key, OPEN_SHIFT_TTL)
+        else:
+            key = open_shift_shards.get(str(user_id))
+            if key is None:
+                key = self._clock_out_key(when, volunteer_name)
+            open_shift_shards.delete(str(user_id))
+
+        return self.spreadsheet_id(key)
+
+    def _clock_out_key(self, when: datetime, volunteer_name: str | None) -> str:
+        """
+        Get the shard key of a clock-out whose clock-in shard isn't known. A shift
+        that started less than OPEN_SHIFT_TTL before the period began is looked
+        for in the previous shard, if the volunteer and a Sheets service are known.
+        """
+        key = shard_key(when, self.period)
+        previous_key = shard_key(when - timedelta(seconds=OPEN_SHIFT_TTL), self.period)
+        if previous_key == key or volunteer_name is None or self.sheets_service is None:
+            return key
+
+        previous_id = self.spreadsheet_id(previous_key, create=False)
+        if previous_id is not None and has_open_shift(
+            self.sheets_service, previous_id, volunteer_name
+        ):
+            return previous_key
+
+        return key
+
+    def current_spreadsheet_id(self, when: datetime) -> str:
+        """
+        Get the Master Log spreadsheet id for the period containing when.
+        """
+        if self.period is None:
+            return MASTER_LOG_SPREADSHEET_ID
+
+        return self.spreadsheet_id(shard_key(when, self.period))
+
+    def spreadsheet_id(self, key: str, create: bool = True) -> str | None:
+        """
+        Get the spreadsheet id of the shard, creating it if it doesn't exist yet.
+        """
+        spreadsheet_id = shard_registry.get(key, ttl=SHARD_REGISTRY_TTL)
+        if spreadsheet_id is not None:
+            return spreadsheet_id
+
+        spreadsheet_id = self._find(key)
+
+        if spreadsheet_id is None:
+            if not create:
+                return None
+            spreadsheet_id = self._create(key)
+
+        shard_registry.set(key, spreadsheet_id, SHARD_REGISTRY_TTL)
+
+        return spreadsheet_id
+
+    def _list(self, search_query: str) -> list[dict]:
+        return (
+            self.drive_service.files()
+            .list(
+                q=search_query,
+                fields="files(id, appProperties)",
+                orderBy="createdTime",
+                supportsAllDrives=True,
+                driveId=self.drive_id,
+                corpora="drive",
+                includeItemsFromAllDrives=True,
+            )
+            .execute()
+            .get("files", [])
+        )
+
+    def _find(self, key: str) -> str | None:
+        files = self._list(
+            f"appProperties has {{ key='{SHARD_PROPERTY}' and value='{key}' }}"
+            " and trashed=false"
+        )
+
+        return files[0].get("id") if files else None
+
+    def _create(self, key: str) -> str:
+        body = {
+            "name": f"{SHARD_NAME_PREFIX}{key}",
+            "parents": [self.folder_id],
+            "appProperties": {SHARD_PROPERTY: key},
+        }
+
+        if self.template_id:
+            request = self.drive_service.files().copy(
+                fileId=self.template_id, body=body, fields="id", supportsAllDrives=True
+            )
+        else:
+            request = self.drive_service.files().create(
+                body={**body, "mimeType": "application/vnd.google-apps.spreadsheet"},
+                fields="id",
+                supportsAllDrives=True,
+            )
+
+        created_id = request.execute().get("id")
+        logging.info("Created master log shard %s: %s", key, created_id)
+
+        # Another container may have created the same shard at the same time. With
+        # a shared cache, the first copy registered wins. Drive search is only
+        # eventually consistent, so without one the oldest copy found wins. The
+        # other copies are trashed.
+        if shared_backend():
+            if shard_registry.add(key, created_id, SHARD_REGISTRY_TTL):
+                winner_id = created_id
+            else:
+                winner_id = (
+                    shard_registry.get(key, ttl=SHARD_REGISTRY_TTL) or created_id
+                )
+        else:
+            winner_id = self._find(key) or created_id
+
+        if winner_id != created_id:
+            self.drive_service.files().update(
+                fileId=created_id,
+                body={"trashed": True},
+                fields="id",
+                supportsAllDrives=True,
+            ).execute()
+
+        return winner_id
+
+    def all_spreadsheet_ids(self) -> dict[str, str]:
+        """
+        Get every Master Log spreadsheet, oldest period first. The unsharded
+        MASTER_LOG_SPREADSHEET_ID comes first under the key "".
+        """
+        files = self._list(
+            f"name contains '{SHARD_NAME_PREFIX}'"
+            " and mimeType='application/vnd.google-apps.spreadsheet'"
+            " and trashed=false"
+        )
+
+        shards = {}
+        for file in files:
+            key = (file.get("appProperties") or {}).get(SHARD_PROPERTY)
+            if key is None:
+                continue
+
+            # Files are ordered by createdTime, so the first copy of a key wins
+            if key in shards:
+                logging.warning(
+                    "Duplicate master log shard %s: %s, using %s",
+                    key,
+                    file.get("id"),
+                    shards[key],
+                )
+            else:
+                shards[key] = file.get("id")
+
+        return {"": MASTER_LOG_SPREADSHEET_ID, **dict(sorted(shards.items()))}
+
+
+def has_open_shift(sheets_service, spreadsheet_id: str, volunteer_name: str) -> bool:
+    """
+    Check if the last row of the volunteer's tab has a clock-in but no clock-out.
+    """
+    try:
+        rows = (
+            sheets_service.spreadsheets()
+            .values()
+            .get(
+                spreadsheetId=spreadsheet_id,
+                range=f"'{volunteer_name}'!A3:C",
+                fields="values",
+            )
+            .execute()
+            .get("values", [])
+        )
+    except HttpError as e:
+        # Sheets answers 400 for a range on a missing tab
+        if e.resp.status != 400:
+            raise
+        return False
+
+    last_row = rows[-1] if rows else []
+    clocked_out = len(last_row) >= 3 and bool(last_row[2])
+    return len(last_row) >= 2 and all(last_row[:2]) and not clocked_out
+
+
+def read_master_log(credentials, spreadsheet_ids: list[str], volunteer_name: str):
+    """
+    Read a volunteer's Master Log rows from every shard concurrently, in shard order.
+    Shards without a tab for the volunteer are skipped.
+    """
+    rows = {}
+
+    def read_shard(spreadsheet_id):
+        # API clients can't be shared between threads
+        sheet = get_service("sheets", "v4", credentials).spreadsheets()
+
+        try:
+            rows[spreadsheet_id] = (
+                sheet.values()
+                .get(
+                    spreadsheetId=spreadsheet_id,
+                    range=f"'{volunteer_name}'!A3:D",
+                    fields="values",
+                )
+                .execute()
+                .get("values", [])
+            )
+        except HttpError as e:
+            # Sheets answers 400 for a range on a missing tab
+            if e.resp.status != 400:
+                raise
+            rows[spreadsheet_id] = []
+
+    failures = run_steps(
+        {
+            spreadsheet_id: (
+                lambda spreadsheet_id=spreadsheet_id: read_shard(spreadsheet_id)
+            )
+            for spreadsheet_id in spreadsheet_ids
+        }
+    )
+
+    if failures:
+        raise next(iter(failures.values()))
+
+    return [row for spreadsheet_id in spreadsheet_ids for row in rows[spreadsheet_id]]
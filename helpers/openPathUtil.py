@@ -2,25 +2,32 @@
 #      Neon API docs - https://developer.neoncrm.com/api-v2/     #
 #################################################################
 import os
+import functools
 
 from base64 import b64encode
-import requests
+
+from helpers.http_client import http_client
 
 if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
-    from credentials import O_APIkey, O_APIuser
+    import credentials as settings
 else:
-    from config import O_APIkey, O_APIuser
+    import config as settings
 
 ### OpenPath Account Info
-O_auth = f"{O_APIuser}:{O_APIkey}"
 # Asmbly is OpenPath org ID 5231
 O_baseURL = "https://api.openpath.com/orgs/5231"
-O_signature = b64encode(bytearray(O_auth.encode())).decode()
-O_headers = {
-    "Authorization": f"Basic {O_signature}",
-    "Accept": "application/json",
-    "Content-Type": "application/json",
-}
+
+
+# Credentials are resolved on first request, not at import
+@functools.cache
+def getHeaders():
+    O_auth = f"{settings.O_APIuser}:{settings.O_APIkey}"
+    O_signature = b64encode(bytearray(O_auth.encode())).decode()
+    return {
+        "Authorization": f"Basic {O_signature}",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
 
 
 ####################################################################
@@ -28,7 +35,7 @@ O_headers = {
 ####################################################################
 def getUser(opId: int):
     url = O_baseURL + f"/users/{opId}"
-    response = requests.get(url, headers=O_headers)
+    response = http_client.get(url, headers=getHeaders(), deadline=10)
 
     if response.status_code != 200:
         raise ValueError(f"Get {url} returned status code {response.status_code}")
@@ -44,7 +51,28 @@ def getGroupsById(id):
         return []
 
     url = O_baseURL + f"/users/{id}/groups"
-    response = requests.get(url, headers=O_headers)
+    response = http_client.get(url, headers=getHeaders(), deadline=10)
+
+    if response.status_code != 200:
+        raise ValueError(f"Get {url} returned status code {response.status_code}")
+
+    return response.json().get("data")
+
+
+####################################################################
+# Get one page of OpenPath users in the org
+####################################################################
+def listUsers(offset: int = 0, limit: int = 1000, sort: str = None, order: str = None):
+    url = O_baseURL + "/users"
+    params = {"offset": offset, "limit": limit}
+    if sort:
+        params["sort"] = sort
+    if order:
+        params["order"] = order
+
+    response = http_client.get(
+        url, params=params, headers=getHeaders(), timeout=30, deadline=120
+    )
 
     if response.status_code != 200:
         raise ValueError(f"Get {url} returned status code {response.status_code}")
@@ -2,11 +2,40 @@
 Dataclasses to hold Openpath user and event data.
 """
 
+import os
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from dataclasses import dataclass
 
 from helpers.openPathUtil import getUser
+from helpers.cache import get_store
+from helpers.openpath_directory import DirectoryIndex, index_location
+
+# Openpath user records rarely change, so they are cached per container and,
+# if CACHE_BACKEND is set, in the persistent store.
+USER_CACHE_TTL = int(os.environ.get("OPENPATH_USER_CACHE_TTL", 24 * 60 * 60))
+
+user_cache = get_store("openpath_users", maxsize=256)
+
+# Directory index built by the scheduled sync job, loaded on first lookup
+directory = DirectoryIndex(index_location())
+
+
+def get_user_data(user_id: int) -> dict:
+    """
+    Get an Openpath user record, from the directory index or cache if possible.
+    """
+    user_data = directory.lookup(user_id)
+    if user_data is not None:
+        return user_data
+
+    user_data = user_cache.get(str(user_id), ttl=USER_CACHE_TTL)
+
+    if user_data is None:
+        user_data = getUser(user_id)
+        user_cache.set(str(user_id), user_data, USER_CACHE_TTL)
+
+    return user_data
 
 
 @dataclass
@@ -44,7 +73,7 @@ class OpenpathUser:
     email: str = None
 
     def __post_init__(self):
-        self.user_data = getUser(self.user_id)
+        self.user_data = get_user_data(self.user_id)
         self.first_name = self.user_data.get("identity").get("firstName")
         self.last_name = self.user_data.get("identity").get("lastName")
         self.full_name = f"{self.first_name} {self.last_name}"
@@ -0,0 +1,235 @@
+"""
+Local index of the Openpath user directory.
+
+A scheduled job pages through every user in the org and serializes a compact
+index of user id to name, email and group memberships. The handler loads the
+index once per container so events from known users need no Openpath call.
+Between full scans only recently modified users are fetched, so users deleted
+in Openpath are dropped at the next full scan, at least every FULL_SYNC_INTERVAL.
+
+The index location is set with OPENPATH_DIRECTORY_INDEX, either a local path
+or an s3://bucket/key URL.
+"""
+
+import os
+import json
+import logging
+import datetime
+import threading
+
+import boto3
+from botocore.exceptions import ClientError
+
+from helpers.openPathUtil import listUsers, getGroupsById
+
+PAGE_SIZE = 1000
+
+# Incremental syncs can't see deleted users, so the index is rebuilt this often
+FULL_SYNC_INTERVAL = datetime.timedelta(days=1)
+
+
+def index_location() -> str | None:
+    """Configured index location, or None if the directory index is disabled."""
+    return os.environ.get("OPENPATH_DIRECTORY_INDEX")
+
+
+def _split_s3_url(location: str) -> tuple[str, str]:
+    bucket, _, key = location.removeprefix("s3://").partition("/")
+    return bucket, key
+
+
+def load_index(location: str) -> dict | None:
+    """
+    Load a serialized index, or return None if there isn't one yet.
+    """
+    try:
+        if location.startswith("s3://"):
+            bucket, key = _split_s3_url(location)
+            body = boto3.client("s3").get_object(Bucket=bucket, Key=key)["Body"]
+            return json.loads(body.read())
+
+        with open(location, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+            return None
+        raise
+
+
+def save_index(index: dict, location: str):
+    """
+    Serialize the index to location.
+    """
+    body = json.dumps(index, separators=(",", ":"))
+
+    if location.startswith("s3://"):
+        bucket, key = _split_s3_url(location)
+        boto3.client("s3").put_object(
+            Bucket=bucket, Key=key, Body=body, ContentType="application/json"
+        )
+        return
+
+    with open(location, "w", encoding="utf-8") as f:
+        f.write(body)
+
+
+def compact_user(user: dict, groups: list | None = None) -> dict:
+    """
+    Reduce an Openpath user record to the fields the index keeps.
+    """
+    identity = user.get("identity") or {}
+
+    if groups is None:
+        groups = user.get("groups")
+    if groups is None:
+        groups = getGroupsById(user.get("id")) or []
+
+    return {
+        "firstName": identity.get("firstName"),
+        "lastName": identity.get("lastName"),
+        "email": identity.get("email"),
+        "groups": sorted(group.get("id") for group in groups),
+        "modifiedAt": user.get("modifiedAt"),
+    }
+
+
+def full_sync() -> dict:
+    """
+    Build a new index from every user in the org.
+    """
+    users = {}
+    offset = 0
+
+    while True:
+        page = listUsers(offset=offset, limit=PAGE_SIZE)
+        for user in page:
+            users[str(user.get("id"))] = compact_user(user)
+
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+
+    return users
+
+
+def incremental_sync(index: dict) -> dict:
+    """
+    Update the index with users modified since the last sync. Pages through users
+    newest first and stops at the first one that hasn't changed since then.
+
+    Raises ValueError if the users aren't in descending modifiedAt order, since
+    stopping early would then miss changes.
+    """
+    users = dict(index["users"])
+    high_water = index.get("highWater")
+    previous = None
+    offset = 0
+
+    while True:
+        page = listUsers(offset=offset, limit=PAGE_SIZE, sort="modifiedAt", order="desc")
+
+        # Check the whole page, so an unsorted one can't stop the sync early
+        modified = [user.get("modifiedAt") or "" for user in page]
+        if previous is not None:
+            modified.insert(0, previous)
+        if modified != sorted(modified, reverse=True):
+            raise ValueError("Openpath users are not sorted by modifiedAt")
+        if modified:
+            previous = modified[-1]
+
+        for user in page:
+            if high_water and (user.get("modifiedAt") or "") <= high_water:
+                return users
+
+            users[str(user.get("id"))] = compact_user(user)
+
+        if len(page) < PAGE_SIZE:
+            return users
+        offset += PAGE_SIZE
+
+
+def sync_directory(location: str, full: bool = False) -> dict:
+    """
+    Sync the index at location with Openpath. Uses an incremental update when there
+    is an existing index that had a full scan within FULL_SYNC_INTERVAL, and falls
+    back to a full scan if that fails.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    index = None if full else load_index(location)
+    users = None
+    full_synced_at = None
+
+    if index is not None and index.get("highWater") and index.get("fullSyncAt"):
+        full_synced_at = index["fullSyncAt"]
+        if now - datetime.datetime.fromisoformat(full_synced_at) < FULL_SYNC_INTERVAL:
+            try:
+                users = incremental_sync(index)
+            except ValueError as e:
+                logging.error(
+                    "Incremental directory sync failed, running full sync: %s", e
+                )
+
+    if users is None:
+        users = full_sync()
+        full_synced_at = now.isoformat()
+
+    modified = [user["modifiedAt"] for user in users.values() if user.get("modifiedAt")]
+
+    index = {
+        "syncedAt": now.isoformat(),
+        "fullSyncAt": full_synced_at,
+        "highWater": max(modified) if modified else None,
+        "users": users,
+    }
+
+    save_index(index, location)
+
+    logging.info("Synced %s Openpath users to %s", len(users), location)
+
+    return index
+
+
+class DirectoryIndex:
+    """
+    Read-only view of the directory index, loaded once per container.
+    """
+
+    def __init__(self, location: str | None):
+        self.location = location
+        self._users = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        with self._lock:
+            if self._users is None:
+                index = None
+                if self.location:
+                    try:
+                        index = load_index(self.location)
+                    except Exception as e:  # pylint: disable=broad-except
+                        logging.error("Could not load Openpath directory index: %s", e)
+
+                self._users = (index or {}).get("users", {})
+
+        return self._users
+
+    def lookup(self, user_id: int) -> dict | None:
+        """
+        Get the user record in the same shape as the Openpath API, or None if the
+        user isn't in the index.
+        """
+        user = self._load().get(str(user_id))
+        if user is None:
+            return None
+
+        return {
+            "id": user_id,
+            "identity": {
+                "firstName": user.get("firstName"),
+                "lastName": user.get("lastName"),
+                "email": user.get("email"),
+            },
+            "groups": [{"id": group_id} for group_id in user.get("groups", [])],
+        }
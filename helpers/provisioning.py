@@ -0,0 +1,289 @@
+"""
+Pools of pre-provisioned timesheets and Master Log tabs for new volunteers.
+
+A scheduled provisioner keeps PROVISION_POOL_SIZE copies of the timesheet
+template, already formatted and protected, plus the same number of hidden,
+formatted Master Log tabs. A first-time volunteer claims one of each with a
+single Sheets batchUpdate that renames it and fills in their name. This
+replaces the Drive copy and the calls that initialize it. The pools are off
+unless PROVISION_POOL_SIZE is set, so no claim is tried without a provisioner.
+"""
+
+import os
+import logging
+import random
+import threading
+import time
+import uuid
+
+from googleapiclient.errors import HttpError
+
+from helpers.google_services import (
+    SheetsOperations,
+    POOL_TAB_PREFIX,
+    TIMESHEET_NAME_PREFIX,
+)
+
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
+    from credentials import ON_DUTY_DRIVE_ID, TEMPLATE_SHEET_ID, PARENT_FOLDER_ID
+else:
+    from config import ON_DUTY_DRIVE_ID, TEMPLATE_SHEET_ID, PARENT_FOLDER_ID
+
+POOL_TIMESHEET_PREFIX = "ODV Timesheet Pool - "
+
+# Drive app property holding the sheetId of a pooled timesheet's only tab
+POOL_SHEET_ID_PROPERTY = "odvPoolSheetId"
+
+CLAIM_ATTEMPTS = 3
+
+# An empty pool isn't listed again for this long, so first-time volunteers
+# don't pay for a listing while the provisioner catches up
+POOL_EMPTY_TTL = 5 * 60
+
+# Pooled timesheets not yet claimed by this container, listed once per container
+_available_timesheets = None
+_pool_empty_until = 0.0
+_available_lock = threading.Lock()
+
+
+def pool_size() -> int:
+    """
+    Number of timesheets and Master Log tabs the provisioner keeps ready. 0, the
+    default, turns the pools off.
+    """
+    return int(os.environ.get("PROVISION_POOL_SIZE", "0"))
+
+
+class TimesheetPool:
+    """
+    Pre-copied, pre-formatted volunteer timesheets waiting to be claimed.
+
+    The pool is listed once per container and refreshed when it runs out.
+    """
+
+    def __init__(self, drive_service, sheets_service):
+        self.drive_service = drive_service
+        self.sheets_service = sheets_service
+        self.drive_id = ON_DUTY_DRIVE_ID
+        self.template_sheet_id = TEMPLATE_SHEET_ID
+        self.parent_folder_id = PARENT_FOLDER_ID
+
+    def list_pool(self) -> list[dict]:
+        """
+        List the pooled timesheets in the shared Drive.
+        """
+        search_query = (
+            f'mimeType="application/vnd.google-apps.spreadsheet"'
+            f' and "{self.parent_folder_id}" in parents'
+            f' and name contains "{POOL_TIMESHEET_PREFIX}"'
+            f" and trashed=false"
+        )
+
+        return (
+            self.drive_service.files()
+            .list(
+                q=search_query,
+                fields="files(id, appProperties)",
+                supportsAllDrives=True,
+                driveId=self.drive_id,
+                corpora="drive",
+                includeItemsFromAllDrives=True,
+            )
+            .execute()
+            .get("files", [])
+        )
+
+    def _take(self) -> dict | None:
+        # pylint: disable-next=global-statement
+        global _available_timesheets, _pool_empty_until
+
+        with _available_lock:
+            if not _available_timesheets:
+                if time.time() < _pool_empty_until:
+                    return None
+
+                _available_timesheets = self.list_pool()
+                random.shuffle(_available_timesheets)
+
+                if not _available_timesheets:
+                    _pool_empty_until = time.time() + POOL_EMPTY_TTL
+
+            return _available_timesheets.pop() if _available_timesheets else None
+
+    def claim(self, volunteer_name: str) -> str | None:
+        """
+        Claim a pooled timesheet for the volunteer. It is renamed and its name
+        field is filled in with one batchUpdate. Returns the spreadsheet id, or
+        None if the pool is empty or turned off.
+
+        The claim adds a "Claimed" named range, so if two containers claim the
+        same timesheet, the second batchUpdate fails as a whole.
+        """
+        if pool_size() == 0:
+            return None
+
+        for _ in range(CLAIM_ATTEMPTS):
+            pooled = self._take()
+            if pooled is None:
+                return None
+
+            spreadsheet_id = pooled.get("id")
+            sheet_id = int(
+                (pooled.get("appProperties") or {}).get(POOL_SHEET_ID_PROPERTY, 0)
+            )
+
+            try:
+                self.sheets_service.spreadsheets().batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    body={
+                        "requests": [
+                            {
+                                "addNamedRange": {
+                                    "namedRange": {
+                                        "name": "Claimed",
+                                        "range": {
+                                            "sheetId": sheet_id,
+                                            "startRowIndex": 0,
+                                            "endRowIndex": 1,
+                                            "startColumnIndex": 5,
+                                            "endColumnIndex": 6,
+                                        },
+                                    }
+                                }
+                            },
+                            {
+                                "updateSpreadsheetProperties": {
+                                    "properties": {
+                                        "title": f"{TIMESHEET_NAME_PREFIX}{volunteer_name}"
+                                    },
+                                    "fields": "title",
+                                }
+                            },
+                            {
+                                "updateCells": {
+                                    "rows": [
+                                        {
+                                            "values": [
+                                                {
+                                                    "userEnteredValue": {
+                                                        "stringValue": (
+                                                            f"Name: {volunteer_name}"
+                                                        )
+                                                    }
+                                                }
+                                            ]
+                                        }
+                                    ],
+                                    "fields": "userEnteredValue",
+                                    "start": {
+                                        "sheetId": sheet_id,
+                                        "rowIndex": 0,
+                                        "columnIndex": 5,
+                                    },
+                                }
+                            },
+                        ]
+                    },
+                    fields="spreadsheetId",
+                ).execute()
+            except HttpError as e:
+                # Already claimed by another container
+                logging.warning("Could not claim timesheet %s: %s", spreadsheet_id, e)
+                continue
+
+            logging.info("Claimed pooled timesheet %s", spreadsheet_id)
+            return spreadsheet_id
+
+        return None
+
+    def provision(self) -> str:
+        """
+        Copy the timesheet template into the pool and initialize it.
+        """
+        spreadsheet_id = (
+            self.drive_service.files()
+            .copy(
+                fileId=self.template_sheet_id,
+                body={
+                    "name": f"{POOL_TIMESHEET_PREFIX}{uuid.uuid4().hex[:8]}",
+                    "parents": [self.parent_folder_id],
+                },
+                fields="id",
+                supportsAllDrives=True,
+            )
+            .execute()
+            .get("id")
+        )
+
+        # The name field is left blank until the timesheet is claimed
+        sheet_id = SheetsOperations(
+            self.sheets_service, "", spreadsheet_id
+        ).initialize_copied_template()
+
+        self.drive_service.files().update(
+            fileId=spreadsheet_id,
+            body={"appProperties": {POOL_SHEET_ID_PROPERTY: str(sheet_id)}},
+            fields="id",
+            supportsAllDrives=True,
+        ).execute()
+
+        return spreadsheet_id
+
+    def fill(self, size: int) -> int:
+        """
+        Provision timesheets until the pool has size of them. Returns the number added.
+        """
+        missing = max(size - len(self.list_pool()), 0)
+
+        for _ in range(missing):
+            self.provision()
+
+        return missing
+
+
+def fill_master_tab_pool(sheets_service, master_sheet_id: str, size: int) -> int:
+    """
+    Add hidden, formatted tabs to the Master Log until it has size of them.
+    Returns the number added.
+    """
+    master_ops = SheetsOperations(sheets_service, None, None, master_sheet_id)
+    pooled = [
+        title
+        for title in master_ops.get_master_sheet_ids(refresh=True)
+        if title.startswith(POOL_TAB_PREFIX)
+    ]
+
+    missing = max(size - len(pooled), 0)
+
+    for _ in range(missing):
+        new_sheet_id = (
+            master_ops.sheet.batchUpdate(
+                spreadsheetId=master_sheet_id,
+                body={
+                    "requests": [
+                        {
+                            "addSheet": {
+                                "properties": {
+                                    "title": f"{POOL_TAB_PREFIX}{uuid.uuid4().hex[:8]}",
+                                    "hidden": True,
+                                }
+                            }
+                        }
+                    ]
+                },
+                fields="replies.addSheet.properties.sheetId",
+            )
+            .execute()
+            .get("replies")[0]
+            .get("addSheet")
+            .get("properties")
+            .get("sheetId")
+        )
+
+        # The title row is filled in when the tab is claimed
+        master_ops.batch_update_new_master_sheet(master_sheet_id, new_sheet_id, "")
+
+    if missing:
+        master_ops.get_master_sheet_ids(refresh=True)
+
+    return missing
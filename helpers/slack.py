@@ -6,10 +6,37 @@ import os
 import logging
 import requests
 
+from helpers.cache import get_store
+from helpers.http_client import http_client
+
 if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
-    from credentials import SLACK_WEBHOOK_URL, SLACK_TOKEN, SLACK_ON_DUTY_CHANNEL_ID
+    import credentials as settings
+    from credentials import SLACK_WEBHOOK_URL, SLACK_ON_DUTY_CHANNEL_ID
 else:
-    from config import SLACK_WEBHOOK_URL, SLACK_TOKEN, SLACK_ON_DUTY_CHANNEL_ID
+    import config as settings
+    from config import SLACK_WEBHOOK_URL, SLACK_ON_DUTY_CHANNEL_ID
+
+
+# Slack user ids rarely change, so lookups are cached for a long time. Misses are
+# cached briefly, so volunteers who join Slack are picked up soon after.
+SLACK_ID_TTL = 30 * 24 * 60 * 60
+SLACK_ID_MISS_TTL = 60 * 60
+
+slack_ids = get_store("slack_ids", maxsize=1024)
+
+
+class SlackLookupError(Exception):
+    """A Slack user lookup failed, as opposed to finding no user."""
+
+
+def slack_id_keys(op_user_id: int | None, email: str | None) -> list[str]:
+    """Cache keys of a volunteer's Slack user id, by Openpath user id and by email."""
+    keys = []
+    if op_user_id is not None:
+        keys.append(f"user:{op_user_id}")
+    if email:
+        keys.append(f"email:{email.lower()}")
+    return keys
 
 
 def lookup_users_in_channel(session: requests.Session, channel_id: str) -> set | None:
@@ -37,8 +64,13 @@ def lookup_users_in_channel(session: requests.Session, channel_id: str) -> set |
     return set(response.get("members"))
 
 
-def lookup_by_email(session: requests.Session, email: str) -> int | None:
-    """Lookup a Slack user by email address"""
+def lookup_by_email(
+    session: requests.Session, email: str, strict: bool = False
+) -> int | None:
+    """
+    Lookup a Slack user by email address. With strict, API errors other than
+    no user being found raise SlackLookupError instead of returning None.
+    """
     url = "https://slack.com/api/users.lookupByEmail"
     params = {"email": email}
     response = session.get(
@@ -49,23 +81,32 @@ def lookup_by_email(session: requests.Session, email: str) -> int | None:
 
     if response.status_code != 200:
         logging.error("Get %s returned status code %s", url, response.status_code)
+        if strict:
+            raise SlackLookupError(f"{url} returned status code {response.status_code}")
         return None
 
     response = response.json()
 
     if response.get("ok") is False:
+        if strict and response.get("error") != "users_not_found":
+            raise SlackLookupError(f"{url} returned error {response.get('error')}")
         return None
 
     return response.get("user").get("id")
 
 
 def lookup_by_name(
-    session: requests.Session, first_name: str, last_name: str, channel_id: str
+    session: requests.Session,
+    first_name: str,
+    last_name: str,
+    channel_id: str,
+    strict: bool = False,
 ) -> int | None:
     """
     Lookup a Slack user by name. First checks for a full name match. If no match, filters
     by first name only, and checks if there is a single match in the given channel_id. If so
-    return that user ID.
+    return that user ID. With strict, API errors raise SlackLookupError instead of
+    returning None.
     """
     url = "https://slack.com/api/users.list"
     params = {"limit": 300}
@@ -77,12 +118,16 @@ def lookup_by_name(
 
     if response.status_code != 200:
         logging.error("Get %s returned status code %s", url, response.status_code)
+        if strict:
+            raise SlackLookupError(f"{url} returned status code {response.status_code}")
         return None
 
     response = response.json()
 
     if response.get("ok") is False:
         logging.error("Get %s returned error: %s", url, response.get("error"))
+        if strict:
+            raise SlackLookupError(f"{url} returned error {response.get('error')}")
         return None
 
     if any(
@@ -103,6 +148,9 @@ def lookup_by_name(
 
     users_in_on_duty_channel = lookup_users_in_channel(session, channel_id)
 
+    if users_in_on_duty_channel is None and strict:
+        raise SlackLookupError(f"Members of channel {channel_id} couldn't be listed")
+
     if not users_in_on_duty_channel:
         return None
 
@@ -137,29 +185,48 @@ class SlackOps:
     Operations related to Slack. Get Slack user ID from full name. Send Slack messages.
     """
 
-    def __init__(self, user_email, first_name, last_name):
+    def __init__(self, user_email, first_name, last_name, op_user_id=None):
         self.webhook_url = SLACK_WEBHOOK_URL
-        self.token = SLACK_TOKEN
+        self.token = settings.SLACK_TOKEN
         self.on_duty_channel_id = SLACK_ON_DUTY_CHANNEL_ID
         self.user_email = user_email
         self.first_name = first_name
         self.last_name = last_name
+        self.op_user_id = op_user_id
 
     def get_slack_user_id(self):
         """
         Get Slack user ID by full name. If not found, try to lookup by Openpath email.
         If not found, return None. Allows mentioning user in Slack messages.
-        """
-        session = requests.Session()
-        session.headers.update({"Authorization": f"Bearer {self.token}"})
-
-        user_id = lookup_by_email(session, self.user_email)
-        if user_id:
-            return user_id
 
-        user_id = lookup_by_name(
-            session, self.first_name, self.last_name, self.on_duty_channel_id
-        )
+        Results, including misses, are cached by Openpath user ID and by email.
+        Failed lookups aren't cached, so they are tried again on the next event.
+        """
+        keys = slack_id_keys(self.op_user_id, self.user_email)
+        for key in keys:
+            cached = slack_ids.get(key, ttl=SLACK_ID_MISS_TTL)
+            if cached is not None:
+                return cached["id"]
+
+        session = http_client.with_headers({"Authorization": f"Bearer {self.token}"})
+
+        try:
+            user_id = lookup_by_email(session, self.user_email, strict=True)
+            if not user_id:
+                user_id = lookup_by_name(
+                    session,
+                    self.first_name,
+                    self.last_name,
+                    self.on_duty_channel_id,
+                    strict=True,
+                )
+        except SlackLookupError as e:
+            logging.error("Slack user lookup failed: %s", e)
+            return None
+
+        ttl = SLACK_ID_TTL if user_id else SLACK_ID_MISS_TTL
+        for key in keys:
+            slack_ids.set(key, {"id": user_id}, ttl)
 
         return user_id
 
@@ -194,7 +261,7 @@ class SlackOps:
 
         slack_event_payload = build_slack_message(elements)
 
-        requests.post(
+        http_client.post(
             self.webhook_url,
             json=slack_event_payload,
             headers={"Content-Type": "application/json"},
@@ -233,7 +300,7 @@ class SlackOps:
 
         slack_event_payload = build_slack_message(elements)
 
-        requests.post(
+        http_client.post(
             self.webhook_url,
             json=slack_event_payload,
             headers={"Content-Type": "application/json"},
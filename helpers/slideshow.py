@@ -0,0 +1,255 @@
+"""
+Lobby TV slideshow reconciled from the set of volunteers on duty.
+
+With SLIDESHOW_MODE set to "reconcile", clock events only update the on-duty
+state. The slideshow folder is then listed once and the difference to the
+desired slides is applied as one batch of copies and trashes. A scheduled run
+does the same, which also clears the slides of volunteers who never clocked out,
+since on-duty entries expire after ON_DUTY_TTL. Trashed copies are deleted in
+bulk by the scheduled run so the folder listing stays small.
+
+With SLIDESHOW_MODE set to "composite", the same on-duty state is rendered into
+a single slide instead (see helpers.composite_slide). When SLIDESHOW_MODE is
+unset, slides are copied and trashed per event.
+
+The on-duty state is one cache entry per volunteer. Both modes need it in the
+shared cache, CACHE_BACKEND "dynamodb", since any container may handle a
+volunteer's clock-in and the reconcile trashes the slides of everyone else.
+"""
+
+import os
+import logging
+import time
+
+from googleapiclient.errors import HttpError
+
+from helpers.cache import get_store, shared_backend
+from helpers.drive_batch import DriveBatch
+from helpers.google_services import (
+    DriveOperations,
+    SLIDESHOW_FOLDER_NAME,
+    USER_ID_PROPERTY,
+)
+
+SLIDESHOW_MODES = ("reconcile", "composite")
+
+# Longest shift. Volunteers who don't clock out leave the slideshow after it.
+ON_DUTY_TTL = 16 * 60 * 60
+
+on_duty_store = get_store("on_duty")
+
+
+def slideshow_mode() -> str | None:
+    """
+    Configured slideshow mode, or None for per-event copies. Raises ValueError
+    for an unknown mode, or for a mode without a shared cache.
+    """
+    mode = os.environ.get("SLIDESHOW_MODE") or None
+    if mode is not None and mode not in SLIDESHOW_MODES:
+        raise ValueError(f"Unknown SLIDESHOW_MODE: {mode}")
+    if mode is not None and not shared_backend():
+        raise ValueError(
+            f"SLIDESHOW_MODE {mode} needs a shared cache,"
+            " set CACHE_BACKEND to dynamodb"
+        )
+    return mode
+
+
+def on_duty_volunteers(now: float | None = None) -> dict:
+    """
+    Get the volunteers on duty, as {user id: {"name", "since", "slideId"}}.
+    Entries older than ON_DUTY_TTL are left out.
+    """
+    now = time.time() if now is None else now
+
+    return {
+        user_id: volunteer
+        for user_id, volunteer in on_duty_store.items().items()
+        if now - volunteer["since"] < ON_DUTY_TTL
+    }
+
+
+def set_on_duty(
+    user_id: int, volunteer_name: str, since: float, slide_id: str | None = None
+):
+    """Record a volunteer's clock-in."""
+    on_duty_store.set(
+        str(user_id),
+        {"name": volunteer_name, "since": since, "slideId": slide_id},
+        ON_DUTY_TTL,
+    )
+
+
+def set_off_duty(user_id: int):
+    """Record a volunteer's clock-out."""
+    on_duty_store.delete(str(user_id))
+
+
+def list_slideshow(drive_service, folder_id: str, trashed: bool = False) -> list[dict]:
+    """
+    List the files in the slideshow folder, as {"id", "name", "appProperties"} dicts.
+    """
+    drive_ops = DriveOperations(drive_service, None)
+
+    files = []
+    page_token = None
+    while True:
+        response = (
+            drive_service.files()
+            .list(
+                q=f'"{folder_id}" in parents and trashed={str(trashed).lower()}',
+                fields="nextPageToken, files(id, name, appProperties)",
+                pageSize=1000,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                driveId=drive_ops.main_drive_id,
+                corpora="drive",
+                includeItemsFromAllDrives=True,
+            )
+            .execute()
+        )
+        files.extend(response.get("files", []))
+
+        page_token = response.get("nextPageToken")
+        if page_token is None:
+            return files
+
+
+def slide_owner(file: dict, names: dict) -> str | None:
+    """
+    User id of the volunteer whose slide copy this is. Copies made before they
+    were stamped are matched by name against names, a {name: user id} map.
+    Returns None for files that aren't volunteer slides.
+    """
+    stamped = (file.get("appProperties") or {}).get(USER_ID_PROPERTY)
+    if stamped is not None:
+        return stamped
+
+    return names.get(file.get("name"))
+
+
+def reconcile_slideshow(drive_service, on_duty: dict) -> dict:
+    """
+    Make the slideshow folder hold one slide per volunteer in on_duty, a
+    {user id: {"name", "slideId"}} map, and none for anyone else. Other files in
+    the folder are left alone. Returns the number of slides copied, trashed and
+    failed.
+    """
+    results = {"copied": 0, "trashed": 0, "failed": 0}
+
+    lobby_ops = DriveOperations(drive_service, None)
+    folder_id = lobby_ops.slideshow_folder_id
+    if folder_id is None:
+        logging.error("Folder '%s' not found", SLIDESHOW_FOLDER_NAME)
+        return results
+
+    names = {volunteer["name"]: user_id for user_id, volunteer in on_duty.items()}
+
+    present = set()
+    changes = DriveBatch(drive_service)
+    for file in list_slideshow(drive_service, folder_id):
+        owner = slide_owner(file, names)
+        if owner is None:
+            continue
+
+        if owner in on_duty and owner not in present:
+            present.add(owner)
+        else:
+            changes.add(
+                f"trash:{file['id']}", lobby_ops.trash_slide_request(file["id"])
+            )
+
+    arriving = {
+        user_id: DriveOperations(
+            drive_service,
+            volunteer["name"],
+            volunteer.get("slideId"),
+            user_id=int(user_id),
+        )
+        for user_id, volunteer in on_duty.items()
+        if user_id not in present
+    }
+
+    # Slides not known yet are found with one batch of searches
+    searches = DriveBatch(drive_service)
+    for user_id, drive_ops in arriving.items():
+        if drive_ops.slide_file_id is None and lobby_ops.volunteer_slides_folder_id:
+            searches.add(
+                user_id,
+                drive_ops.slide_search_request(
+                    drive_ops.on_duty_drive_id,
+                    drive_ops.volunteer_name,
+                    drive_ops.volunteer_slides_folder_id,
+                ),
+            )
+
+    for user_id, response in searches.execute().items():
+        drive_ops = arriving[user_id]
+        if isinstance(response, HttpError):
+            logging.error(
+                "Slide search failed for %s: %s", drive_ops.volunteer_name, response
+            )
+            results["failed"] += 1
+            continue
+
+        files = drive_ops.own_files(response).get("files", [])
+        if files:
+            drive_ops.slide_file_id = files[0].get("id")
+        else:
+            logging.info(
+                "No slide for %s, consider adding them", drive_ops.volunteer_name
+            )
+
+    for user_id, drive_ops in arriving.items():
+        if drive_ops.slide_file_id is not None:
+            changes.add(
+                f"copy:{user_id}",
+                drive_ops.copy_slide_request(drive_ops.slide_file_id, folder_id),
+            )
+
+    for key, response in changes.execute().items():
+        if isinstance(response, HttpError):
+            logging.error("Slideshow change %s failed: %s", key, response)
+            results["failed"] += 1
+        elif key.startswith("copy:"):
+            results["copied"] += 1
+        else:
+            results["trashed"] += 1
+
+    logging.info(
+        "Reconciled slideshow: %s copied, %s trashed, %s failed",
+        results["copied"],
+        results["trashed"],
+        results["failed"],
+    )
+    return results
+
+
+def purge_trashed_slides(drive_service) -> int:
+    """
+    Permanently delete the trashed volunteer slide copies in the slideshow
+    folder, in one batch. Returns the number deleted.
+    """
+    folder_id = DriveOperations(drive_service, None).slideshow_folder_id
+    if folder_id is None:
+        logging.error("Folder '%s' not found", SLIDESHOW_FOLDER_NAME)
+        return 0
+
+    purge = DriveBatch(drive_service)
+    for file in list_slideshow(drive_service, folder_id, trashed=True):
+        # Only stamped copies are known to be volunteer slides
+        if USER_ID_PROPERTY in (file.get("appProperties") or {}):
+            purge.add(
+                file["id"],
+                drive_service.files().delete(fileId=file["id"], supportsAllDrives=True),
+            )
+
+    deleted = 0
+    for file_id, response in purge.execute().items():
+        if isinstance(response, HttpError):
+            logging.error("Could not delete trashed slide %s: %s", file_id, response)
+        else:
+            deleted += 1
+
+    logging.info("Purged %s trashed slides", deleted)
+    return deleted
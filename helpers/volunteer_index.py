@@ -0,0 +1,143 @@
+"""
+Index of each volunteer's Google resources, keyed by Openpath user id.
+
+Each record can hold the timesheet spreadsheet id, the slide file id, and the
+volunteer's Master Log tab title and sheetId in each Master Log spreadsheet.
+Slack user ids are cached by helpers.slack. Records are filled in lazily from
+the usual searches, and refreshed in bulk by a scheduled job. A returning
+volunteer's event then needs no lookups before its writes.
+
+The scheduled refresh only reaches the event handlers through a shared cache,
+CACHE_BACKEND "dynamodb". Containers keep their memory copies of records for
+VOLUNTEER_INDEX_MEMORY_TTL, so refreshed records are seen soon after.
+"""
+
+import logging
+
+from helpers.cache import get_store
+from helpers.google_services import (
+    DriveOperations,
+    SheetsOperations,
+    USER_ID_PROPERTY,
+    list_timesheets,
+    list_volunteer_slides,
+)
+
+VOLUNTEER_INDEX_TTL = 30 * 24 * 60 * 60
+VOLUNTEER_INDEX_MEMORY_TTL = 5 * 60
+
+volunteer_index = get_store(
+    "volunteer_resources", maxsize=1024, memory_ttl=VOLUNTEER_INDEX_MEMORY_TTL
+)
+
+
+def get_volunteer_resources(user_id: int) -> dict:
+    """
+    Get the indexed resources of a volunteer. Empty if nothing is known yet.
+    """
+    return volunteer_index.get(str(user_id), ttl=VOLUNTEER_INDEX_TTL) or {}
+
+
+def update_volunteer_resources(user_id: int, **fields):
+    """
+    Update some fields of a volunteer's record. Fields set to None are removed.
+    """
+    resources = get_volunteer_resources(user_id)
+    updated = {
+        key: value
+        for key, value in {**resources, **fields}.items()
+        if value is not None
+    }
+
+    if updated != resources:
+        volunteer_index.set(str(user_id), updated, VOLUNTEER_INDEX_TTL)
+
+
+def forget_volunteer_resources(user_id: int):
+    """Drop a volunteer's record, e.g. after one of its ids turned out to be stale."""
+    volunteer_index.delete(str(user_id))
+
+
+def stamped_file_ids(files: list[dict]) -> dict[str, str]:
+    """
+    Map the user id stamped on each file to the file id. Unstamped files are
+    skipped. If a user id is on several files, the first one wins.
+    """
+    file_ids = {}
+    for file in files:
+        user_id = (file.get("appProperties") or {}).get(USER_ID_PROPERTY)
+        if user_id is not None:
+            file_ids.setdefault(user_id, file["id"])
+
+    return file_ids
+
+
+def stale_resource_error(error) -> bool:
+    """
+    Check if a Google API error means an indexed resource is stale: a file that
+    is gone (404), or a range on a Master Log tab that was renamed or removed (400).
+    """
+    if error.resp.status == 404:
+        return True
+
+    content = error.content or b""
+    if isinstance(content, str):
+        content = content.encode()
+    return error.resp.status == 400 and b"Unable to parse range" in content
+
+
+def refresh_volunteer_index(
+    drive_service, sheets_service, users: dict, master_sheet_id: str | None = None
+) -> int:
+    """
+    Refresh the timesheet, slide and Master Log tab ids of every volunteer in
+    users, a directory index {user id: {"firstName", "lastName", ...}} map. Uses
+    one listing of each kind. Timesheets and slides are matched by their user id
+    stamp, files that aren't stamped yet are left out. Returns the number of
+    volunteers indexed.
+    """
+    timesheets = stamped_file_ids(list_timesheets(drive_service))
+    slides_folder_id = DriveOperations(drive_service, None).volunteer_slides_folder_id
+    slides = stamped_file_ids(
+        list_volunteer_slides(drive_service, slides_folder_id)
+        if slides_folder_id is not None
+        else []
+    )
+
+    master_ops = SheetsOperations(sheets_service, None, None, master_sheet_id)
+    master_tabs = master_ops.get_master_sheet_ids(refresh=True)
+
+    indexed = 0
+    for user_id, user in users.items():
+        if str(user_id) not in timesheets:
+            continue
+
+        # Master Log tabs are titled with the volunteer's name. Tabs indexed under
+        # another name are dropped, so they are checked again.
+        full_name = f"{user.get('firstName')} {user.get('lastName')}"
+        indexed_tabs = {
+            spreadsheet_id: tab
+            for spreadsheet_id, tab in get_volunteer_resources(user_id)
+            .get("masterTabs", {})
+            .items()
+            if isinstance(tab, dict) and tab.get("title") == full_name
+        }
+        if full_name in master_tabs:
+            indexed_tabs[master_ops.master_sheet_id] = {
+                "title": full_name,
+                "sheetId": master_tabs[full_name],
+            }
+        else:
+            indexed_tabs.pop(master_ops.master_sheet_id, None)
+
+        update_volunteer_resources(
+            user_id,
+            timesheetId=timesheets[str(user_id)],
+            slideId=slides.get(str(user_id)),
+            masterTabs=indexed_tabs or None,
+        )
+
+        indexed += 1
+
+    logging.info("Indexed resources of %s volunteers", indexed)
+    return indexed
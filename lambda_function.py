@@ -6,29 +6,70 @@ attached to the Openpath cabinet at Asmbly.
 import logging
 import os
 import json
-import datetime
-
-from googleapiclient.discovery import build
+from datetime import datetime
 
 from helpers.openpath_classes import OpenpathUser, OpenpathEvent
 from helpers.slack import SlackOps
+from helpers.fanout import run_steps
+from helpers.http_client import http_client
+from helpers.event_queue import get_event_queue
+from helpers.master_journal import (
+    get_master_journal,
+    journal_master_entry,
+    read_journal,
+    apply_master_entries,
+)
+from helpers.idempotency import DebounceStore
+from helpers.cache import shared_backend
+from helpers.openpath_directory import index_location, load_index, sync_directory
+from helpers.master_shards import MasterLogShards, read_master_log
+from helpers.drive_tagging import tag_volunteer_files
+from helpers.composite_slide import update_composite_slide
+from helpers.slideshow import (
+    slideshow_mode,
+    on_duty_volunteers,
+    set_on_duty,
+    set_off_duty,
+    reconcile_slideshow,
+    purge_trashed_slides,
+)
+from helpers.provisioning import TimesheetPool, fill_master_tab_pool, pool_size
+from helpers.volunteer_index import (
+    get_volunteer_resources,
+    update_volunteer_resources,
+    forget_volunteer_resources,
+    refresh_volunteer_index,
+    stale_resource_error,
+)
 from helpers.google_services import (
     get_access_token,
+    get_service,
     SheetsOperations,
     DriveOperations,
+    TimesheetBatchWriter,
+    update_slideshows,
+    shift_hours,
+    TIMESHEET_NAME_PREFIX,
+    LOCAL_TIMEZONE,
+    list_timesheets,
+    reset_response_stats,
+    response_stats,
 )
+from googleapiclient.errors import HttpError
 
+# Secrets are read from the settings module at the point of use so that
+# they are only resolved when needed
 if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
+    import credentials as settings
     from credentials import (
         PRIV_SA,
-        INTERNAL_API_KEY,
         CLOCK_OUT_ENTRY_NAME,
         CLOCK_IN_ENTRY_NAME,
     )
 else:
+    import config as settings
     from config import (
         PRIV_SA,
-        INTERNAL_API_KEY,
         CLOCK_OUT_ENTRY_NAME,
         CLOCK_IN_ENTRY_NAME,
     )
@@ -47,6 +88,11 @@ SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
 ]
 
+# Presses of the same button by the same volunteer within this window are ignored
+DEBOUNCE_SECONDS = 3 * 60
+
+debounce_store = DebounceStore(DEBOUNCE_SECONDS)
+
 
 def handler(event, _):
     """
@@ -63,106 +109,748 @@ def handler(event, _):
         logging.error("Error parsing event: %s", e)
         raise
 
-    if op_event.get("apiKey") != INTERNAL_API_KEY:
+    if op_event.get("apiKey") != settings.INTERNAL_API_KEY:
         logging.error("Invalid API key")
         return {
             "statusCode": 400,
         }
 
-    op_event = OpenpathEvent(
-        op_event.get("entryId"),
-        int(op_event.get("userId")),
-        int(op_event.get("timestamp")),
-    )
+    op_event = parse_openpath_event(parsed_event)
 
     if op_event.entry not in [CLOCK_IN_ENTRY_NAME, CLOCK_OUT_ENTRY_NAME]:
         return {"statusCode": 400, "message": "incorrect entry"}
 
-    creds = get_access_token(PRIV_SA, SCOPES)
+    # Ignore double presses and Openpath retries of an event we already accepted
+    if debounce_store.is_duplicate(op_event.user_id, op_event.entry, op_event.timestamp):
+        logging.info("Ignoring duplicate event")
+        return {"statusCode": 200}
 
-    # Create the API services using built credential tokens
-    drive_service = build("drive", "v3", credentials=creds)
-    sheets_service = build("sheets", "v4", credentials=creds)
+    try:
+        # In queued mode, acknowledge Openpath right away and let the worker do the rest.
+        event_queue = get_event_queue()
+        if event_queue is not None:
+            event_queue.put(parsed_event)
+            return {"statusCode": 200}
+
+        return process_event(op_event)
+    except Exception:
+        # The press wasn't recorded, so Openpath's retry must not be ignored
+        debounce_store.release(op_event.user_id, op_event.entry, op_event.timestamp)
+        raise
+
+
+def worker_handler(event, _):
+    """
+    Worker Lambda Function handler. Processes events queued by the handler.
+    Triggered by SQS, or invoked directly to drain a local queue.
+    """
+    if "Records" in event:
+        # Report failed messages so SQS only retries those.
+        failures = []
+        for record in event["Records"]:
+            try:
+                process_event(parse_openpath_event(json.loads(record["body"])))
+            except Exception as e:  # pylint: disable=broad-except
+                logging.error("Error processing message %s: %s", record["messageId"], e)
+                failures.append({"itemIdentifier": record["messageId"]})
+
+        return {"batchItemFailures": failures}
+
+    event_queue = get_event_queue()
+    if event_queue is None:
+        raise ValueError("EVENT_QUEUE_BACKEND is not configured")
+
+    processed = 0
+    while messages := event_queue.receive():
+        for message in messages:
+            try:
+                process_event(parse_openpath_event(message.body))
+            except Exception as e:  # pylint: disable=broad-except
+                # Unacknowledged messages become visible again and are retried.
+                logging.error("Error processing message %s: %s", message.message_id, e)
+                continue
+
+            event_queue.ack(message.message_id)
+            processed += 1
+
+    return {"processed": processed}
+
+
+def parse_openpath_event(body: dict) -> OpenpathEvent:
+    """
+    Convert an Openpath event body (without the API key) into an OpenpathEvent.
+    """
+    return OpenpathEvent(
+        body.get("entryId"),
+        int(body.get("userId")),
+        int(body.get("timestamp")),
+    )
 
-    op_user = OpenpathUser(op_event.user_id)
 
-    drive_ops = DriveOperations(drive_service, op_user.full_name)
+def prefetch_secrets():
+    """
+    Resolve the Google, Openpath and Slack secrets in parallel before they are needed.
+    """
+    if hasattr(settings, "prefetch"):
+        settings.prefetch("key_file", "O_APIkey", "O_APIuser", "SLACK_TOKEN")
 
-    slack_user = SlackOps(op_user.email, op_user.first_name, op_user.last_name)
 
-    logging.info("Volunteer: %s", op_user.full_name)
+def get_sheets_operations(
+    drive_ops: DriveOperations,
+    sheets_service,
+    op_user: OpenpathUser,
+    master_sheet_id: str | None = None,
+) -> SheetsOperations:
+    """
+    Get SheetsOperations for the volunteer's timesheet, creating the timesheet
+    from the template if it doesn't exist yet.
+    """
+    resources = get_volunteer_resources(op_user.user_id)
+
+    # A timesheet known to the volunteer index needs no Drive search
+    if "timesheetId" in resources:
+        return SheetsOperations(
+            sheets_service, op_user.full_name, resources["timesheetId"], master_sheet_id
+        )
 
     # Check if On-Duty hours Google Sheet already exsists for this user.
-    # If not, copy the template sheet.
+    # If not, claim a pre-provisioned one or copy the template sheet.
     existing_sheet_check = drive_ops.check_timesheet_exists()
 
     # Spreadsheet columns are: Date, Time In, Time Out, Hours (calculated)
     if len(existing_sheet_check) > 0:
         timesheet_id = existing_sheet_check[0].get("id")
-        sheets_ops = SheetsOperations(sheets_service, op_user.full_name, timesheet_id)
-    else:
-        timesheet_id = drive_ops.create_timesheet()
-        sheets_ops = SheetsOperations(sheets_service, op_user.full_name, timesheet_id)
+        update_volunteer_resources(op_user.user_id, timesheetId=timesheet_id)
+        return SheetsOperations(
+            sheets_service, op_user.full_name, timesheet_id, master_sheet_id
+        )
 
-        # Initialize the copied template with volunteer name,
-        # range protection, duration format, etc.
-        sheets_ops.initialize_copied_template()
+    timesheet_id = TimesheetPool(drive_ops.drive_service, sheets_service).claim(
+        op_user.full_name
+    )
+    if timesheet_id is not None:
+        if drive_ops.user_id is not None:
+            drive_ops.stamp_user_id(timesheet_id)
+        update_volunteer_resources(op_user.user_id, timesheetId=timesheet_id)
+        return SheetsOperations(
+            sheets_service, op_user.full_name, timesheet_id, master_sheet_id
+        )
 
-    if op_event.entry == CLOCK_IN_ENTRY_NAME:
-        # Check if most recent entry is wthin the last 2 minutes. If so, return.
-        most_recent_entry = sheets_ops.get_last_entry_datetime(clock_in=True)
+    timesheet_id = drive_ops.create_timesheet()
+    sheets_ops = SheetsOperations(
+        sheets_service, op_user.full_name, timesheet_id, master_sheet_id
+    )
 
-        if most_recent_entry is not None and (
-            most_recent_entry > datetime.datetime.now() - datetime.timedelta(minutes=3)
-        ):
-            return {"statusCode": 200}
+    # Initialize the copied template with volunteer name,
+    # range protection, duration format, etc.
+    sheets_ops.initialize_copied_template()
 
-        # Append clock-in time to user's log sheet
-        sheets_ops.add_clock_in_entry_to_timesheet((op_event.date, op_event.time))
+    update_volunteer_resources(op_user.user_id, timesheetId=timesheet_id)
 
-        # Check if sheet already exists for this volunteer in the master log sheet.
-        exists = sheets_ops.check_master_log()
+    return sheets_ops
 
-        # If not, create it.
-        if not exists:
-            sheets_ops.create_odv_sheet_in_master_spreadsheet()
 
-        # Update the master sheet with the clock-in time
-        sheets_ops.add_clock_in_entry_to_timesheet(
-            (op_event.date, op_event.time), master=True
+def ensure_master_tab(sheets_ops: SheetsOperations, user_id: int):
+    """
+    Create the volunteer's tab in the Master Log if it doesn't exist yet. Tabs
+    known to the volunteer index under the volunteer's current name aren't
+    checked again.
+    """
+    master_tabs = get_volunteer_resources(user_id).get("masterTabs", {})
+    indexed_tab = master_tabs.get(sheets_ops.master_sheet_id)
+    if (
+        isinstance(indexed_tab, dict)
+        and indexed_tab.get("title") == sheets_ops.volunteer_name
+    ):
+        return
+
+    if not sheets_ops.check_master_log():
+        sheets_ops.create_odv_sheet_in_master_spreadsheet()
+
+    sheet_id = sheets_ops.get_master_sheet_ids().get(sheets_ops.volunteer_name)
+    if isinstance(sheet_id, int):
+        update_volunteer_resources(
+            user_id,
+            masterTabs={
+                **master_tabs,
+                sheets_ops.master_sheet_id: {
+                    "title": sheets_ops.volunteer_name,
+                    "sheetId": sheet_id,
+                },
+            },
         )
 
-        # Add volunteer to the TV slideshow if they have a corresponding slide
-        drive_ops.add_volunteer_to_slideshow()
 
-        # Lookup Slack user ID
-        user_id = slack_user.get_slack_user_id()
-        if user_id is None:
-            logging.error("Slack user not found for: %s", op_user.full_name)
+def index_volunteer_writes(drive_ops: DriveOperations, user_id: int):
+    """
+    Record the volunteer's slide in the volunteer index.
+    """
+    update_volunteer_resources(user_id, slideId=drive_ops.slide_file_id)
 
-        # Send Slack message notifying the On-duty channel that the volunteer has clocked in.
-        # If user_id is not None, the message will @mention the volunteer.
-        # If user_id is None, the message will just contain the volunteer's bolded name.
-        slack_user.clock_in_slack_message(user_id)
 
-    elif op_event.entry == CLOCK_OUT_ENTRY_NAME:
-        # Check if most recent entry is wthin the last 2 minutes. If so, return.
-        most_recent_entry = sheets_ops.get_last_entry_datetime(clock_in=False)
+def refresh_slideshow(drive_service, mode: str):
+    """
+    Bring the lobby slideshow in line with the volunteers on duty, as one slide
+    per volunteer or as a single composite slide.
+    """
+    if mode == "composite":
+        return update_composite_slide(drive_service, on_duty_volunteers())
 
-        if most_recent_entry is not None and (
-            most_recent_entry > datetime.datetime.now() - datetime.timedelta(minutes=3)
-        ):
-            return {"statusCode": 200}
+    return reconcile_slideshow(drive_service, on_duty_volunteers())
+
+
+def process_event(op_event: OpenpathEvent):
+    """
+    Record a clock-in or clock-out event in the timesheets, update the slideshow
+    and notify Slack.
+    """
+    prefetch_secrets()
+    reset_response_stats()
+    http_client.reset_metrics()
+
+    creds = get_access_token(PRIV_SA, SCOPES)
+
+    # Create the API services using built credential tokens
+    drive_service = get_service("drive", "v3", creds)
+    sheets_service = get_service("sheets", "v4", creds)
+
+    op_user = OpenpathUser(op_event.user_id)
+
+    resources = get_volunteer_resources(op_user.user_id)
+
+    drive_ops = DriveOperations(
+        drive_service,
+        op_user.full_name,
+        resources.get("slideId"),
+        user_id=op_user.user_id,
+    )
+
+    slack_user = SlackOps(
+        op_user.email, op_user.first_name, op_user.last_name, op_user.user_id
+    )
+
+    logging.info("Volunteer: %s", op_user.full_name)
+
+    # The Master Log spreadsheet for the current period, if it is sharded
+    master_sheet_id = MasterLogShards(
+        drive_service, sheets_service=sheets_service
+    ).for_clock_event(
+        op_event.user_id,
+        op_event.timestamp_datetime,
+        clock_in=op_event.entry == CLOCK_IN_ENTRY_NAME,
+        volunteer_name=op_user.full_name,
+    )
+
+    sheets_ops = get_sheets_operations(
+        drive_ops, sheets_service, op_user, master_sheet_id
+    )
+
+    # In write-behind mode the master sheet is updated later by the journal flusher
+    master_journal = get_master_journal()
+
+    mode = slideshow_mode()
 
-        # Update the user's log sheet with the clock-out time
-        sheets_ops.add_clock_out_entry_to_timesheet(op_event.time)
+    if op_event.entry == CLOCK_IN_ENTRY_NAME:
+        log_entry = (op_event.date, op_event.time)
+
+        if master_journal is None:
+            # Check if sheet already exists for this volunteer in the master log sheet.
+            # If not, create it.
+            ensure_master_tab(sheets_ops, op_user.user_id)
+
+        # Append clock-in time to the user's log sheet and the master sheet
+        try:
+            sheets_ops.record_clock_in(log_entry, creds, master=master_journal is None)
+        except HttpError as e:
+            # An indexed id may be stale. Search again when the event is retried.
+            if stale_resource_error(e):
+                forget_volunteer_resources(op_user.user_id)
+            raise
+
+        if master_journal is not None:
+            journal_master_entry(
+                master_journal,
+                op_user.full_name,
+                op_event,
+                log_entry,
+                clock_in=True,
+                master_sheet_id=sheets_ops.master_sheet_id,
+            )
+
+        def notify_slack():
+            # Lookup Slack user ID
+            user_id = slack_user.get_slack_user_id()
+            if user_id is None:
+                logging.error("Slack user not found for: %s", op_user.full_name)
+
+            # Send Slack message notifying the On-duty channel that the volunteer has
+            # clocked in. If user_id is not None, the message will @mention the volunteer.
+            # If user_id is None, the message will just contain the volunteer's bolded name.
+            slack_user.clock_in_slack_message(user_id)
+
+        # Add volunteer to the TV slideshow if they have a corresponding slide
+        update_slideshow = drive_ops.add_volunteer_to_slideshow
+        if mode is not None:
+            set_on_duty(
+                op_user.user_id,
+                op_user.full_name,
+                op_event.timestamp,
+                resources.get("slideId"),
+            )
+            update_slideshow = lambda: refresh_slideshow(drive_service, mode)
+
+        # The remaining steps are independent of each other, so run them concurrently.
+        # Failures are logged per step. The timesheet entries are already recorded.
+        run_steps({"slideshow": update_slideshow, "slack": notify_slack})
 
-        # Update the master sheet with the clock-out time
-        sheets_ops.add_clock_out_entry_to_timesheet(op_event.time, master=True)
+    elif op_event.entry == CLOCK_OUT_ENTRY_NAME:
+        if master_journal is None:
+            # The clock-out may be the first write to this Master Log shard
+            ensure_master_tab(sheets_ops, op_user.user_id)
+
+        # Update the user's log sheet and the master sheet with the clock-out time
+        try:
+            sheets_ops.record_clock_out(
+                op_event.time, creds, master=master_journal is None
+            )
+        except HttpError as e:
+            if stale_resource_error(e):
+                forget_volunteer_resources(op_user.user_id)
+            raise
+
+        if master_journal is not None:
+            journal_master_entry(
+                master_journal,
+                op_user.full_name,
+                op_event,
+                op_event.time,
+                clock_in=False,
+                master_sheet_id=sheets_ops.master_sheet_id,
+            )
 
         # Remove volunteer from the TV slideshow if they have a corresponding slide
-        drive_ops.remove_volunteer_from_slideshow()
+        update_slideshow = drive_ops.remove_volunteer_from_slideshow
+        if mode is not None:
+            set_off_duty(op_user.user_id)
+            update_slideshow = lambda: refresh_slideshow(drive_service, mode)
+
+        run_steps(
+            {
+                "slideshow": update_slideshow,
+                "slack": lambda: slack_user.clock_out_slack_message(
+                    slack_user.get_slack_user_id()
+                ),
+            }
+        )
+
+    index_volunteer_writes(drive_ops, op_user.user_id)
 
-        slack_user.clock_out_slack_message(slack_user.get_slack_user_id())
+    logging.info("Google API response sizes: %s", response_stats())
+    logging.info("HTTP client metrics: %s", http_client.metrics_summary())
 
     return {"statusCode": 200}
+
+
+def batch_handler(event, _):
+    """
+    Batch Lambda Function handler. Takes many Openpath events at once, either an
+    SQS batch or a replay file ({"events": [...]}), and writes each spreadsheet
+    with a single batchUpdate call.
+    """
+    if "Records" in event:
+        bodies = [json.loads(record["body"]) for record in event["Records"]]
+    else:
+        bodies = event.get("events", [])
+
+    op_events = sorted(
+        (parse_openpath_event(body) for body in bodies),
+        key=lambda op_event: op_event.timestamp,
+    )
+
+    # Group events by volunteer, dropping double presses within the batch
+    events_by_user = {}
+    for op_event in op_events:
+        if op_event.entry not in [CLOCK_IN_ENTRY_NAME, CLOCK_OUT_ENTRY_NAME]:
+            logging.error("Skipping event with incorrect entry: %s", op_event.entry)
+            continue
+
+        user_events = events_by_user.setdefault(op_event.user_id, [])
+        if any(
+            previous.entry == op_event.entry
+            and op_event.timestamp - previous.timestamp < DEBOUNCE_SECONDS
+            for previous in user_events
+        ):
+            continue
+
+        user_events.append(op_event)
+
+    if not events_by_user:
+        return {"statusCode": 200, "processed": 0}
+
+    prefetch_secrets()
+
+    creds = get_access_token(PRIV_SA, SCOPES)
+
+    drive_service = get_service("drive", "v3", creds)
+    sheets_service = get_service("sheets", "v4", creds)
+
+    writer = TimesheetBatchWriter(sheets_service, creds)
+    shards = MasterLogShards(drive_service, sheets_service=sheets_service)
+    volunteers = []
+
+    for user_id, user_events in events_by_user.items():
+        op_user = OpenpathUser(user_id)
+        drive_ops = DriveOperations(
+            drive_service,
+            op_user.full_name,
+            get_volunteer_resources(user_id).get("slideId"),
+            user_id=user_id,
+        )
+        sheets_ops = get_sheets_operations(drive_ops, sheets_service, op_user)
+        checked_master_ids = set()
+
+        for op_event in user_events:
+            # Events in the batch may span Master Log shards
+            master_ops = SheetsOperations(
+                sheets_service,
+                op_user.full_name,
+                sheets_ops.volunteer_timesheet_id,
+                shards.for_clock_event(
+                    user_id,
+                    op_event.timestamp_datetime,
+                    clock_in=op_event.entry == CLOCK_IN_ENTRY_NAME,
+                    volunteer_name=op_user.full_name,
+                ),
+            )
+
+            if master_ops.master_sheet_id not in checked_master_ids:
+                ensure_master_tab(master_ops, user_id)
+                checked_master_ids.add(master_ops.master_sheet_id)
+
+            for spreadsheet_id, range_prefix in [
+                (sheets_ops.volunteer_timesheet_id, sheets_ops.range_prefix()),
+                (master_ops.master_sheet_id, master_ops.range_prefix(master=True)),
+            ]:
+                if op_event.entry == CLOCK_IN_ENTRY_NAME:
+                    writer.add_clock_in(
+                        spreadsheet_id, range_prefix, (op_event.date, op_event.time)
+                    )
+                else:
+                    writer.add_clock_out(spreadsheet_id, range_prefix, op_event.time)
+
+        volunteers.append((op_user, drive_ops, user_events))
+
+    # If a spreadsheet fails, the whole batch is retried. Spreadsheets that were
+    # written already skip the entries they hold, so no row is written twice.
+    try:
+        writer.execute()
+    except HttpError as e:
+        # An indexed id may be stale. Search again when the batch is retried.
+        if stale_resource_error(e):
+            for user_id in events_by_user:
+                forget_volunteer_resources(user_id)
+        raise
+
+    def update_slideshow():
+        # The Drive client is shared, so slideshow changes run in one step, as
+        # batched Drive requests. Only the volunteer's final state in the batch matters.
+        mode = slideshow_mode()
+        if mode is not None:
+            for op_user, drive_ops, user_events in volunteers:
+                if user_events[-1].entry == CLOCK_IN_ENTRY_NAME:
+                    set_on_duty(
+                        op_user.user_id,
+                        op_user.full_name,
+                        user_events[-1].timestamp,
+                        drive_ops.slide_file_id,
+                    )
+                else:
+                    set_off_duty(op_user.user_id)
+
+            refresh_slideshow(drive_service, mode)
+            return
+
+        update_slideshows(
+            [
+                (drive_ops, user_events[-1].entry == CLOCK_IN_ENTRY_NAME)
+                for _, drive_ops, user_events in volunteers
+            ]
+        )
+
+    def notify_slack(op_user, user_events):
+        slack_user = SlackOps(
+            op_user.email, op_user.first_name, op_user.last_name, op_user.user_id
+        )
+        slack_id = slack_user.get_slack_user_id()
+
+        for op_event in user_events:
+            if op_event.entry == CLOCK_IN_ENTRY_NAME:
+                slack_user.clock_in_slack_message(slack_id)
+            else:
+                slack_user.clock_out_slack_message(slack_id)
+
+    steps = {"slideshow": update_slideshow}
+    for op_user, _, user_events in volunteers:
+        steps[f"slack {op_user.user_id}"] = (
+            lambda op_user=op_user, user_events=user_events: notify_slack(
+                op_user, user_events
+            )
+        )
+
+    run_steps(steps)
+
+    for op_user, drive_ops, _ in volunteers:
+        index_volunteer_writes(drive_ops, op_user.user_id)
+
+    return {
+        "statusCode": 200,
+        "processed": sum(len(user_events) for _, _, user_events in volunteers),
+    }
+
+
+def master_log_flush_handler(event, _):
+    """
+    Master Log flusher Lambda Function handler. Applies journaled Master Log updates
+    in one batchUpdate. Triggered by SQS, or on a schedule to drain a local journal.
+    """
+    if "Records" in event:
+        entries = [json.loads(record["body"]) for record in event["Records"]]
+
+        try:
+            flushed = apply_master_entries(get_master_sheets_service(), entries)
+        except Exception as e:  # pylint: disable=broad-except
+            # Report the whole batch so SQS retries it. Applied entries are skipped.
+            logging.error("Error flushing master log journal: %s", e)
+            return {
+                "batchItemFailures": [
+                    {"itemIdentifier": record["messageId"]} for record in event["Records"]
+                ]
+            }
+
+        logging.info("Flushed %s master log entries", flushed)
+        return {"batchItemFailures": []}
+
+    master_journal = get_master_journal()
+    if master_journal is None:
+        raise ValueError("MASTER_LOG_JOURNAL_BACKEND is not configured")
+
+    messages = read_journal(master_journal)
+    if not messages:
+        return {"flushed": 0}
+
+    # Unacknowledged entries become visible again and are retried.
+    flushed = apply_master_entries(
+        get_master_sheets_service(), [message.body for message in messages]
+    )
+
+    for message in messages:
+        master_journal.ack(message.message_id)
+
+    logging.info("Flushed %s master log entries", flushed)
+    return {"flushed": flushed}
+
+
+def get_master_sheets_service():
+    """
+    Get a Sheets API service for the Master Log flusher.
+    """
+    creds = get_access_token(PRIV_SA, SCOPES)
+
+    return get_service("sheets", "v4", creds)
+
+
+def convert_hours_handler(event, _):
+    """
+    One-off Lambda Function handler. Replaces the Hours formulas of existing rows
+    with computed values, in every Master Log tab and every volunteer timesheet.
+    Set "master" or "individual" to false in the event to skip either.
+    """
+    creds = get_access_token(PRIV_SA, SCOPES)
+
+    drive_service = get_service("drive", "v3", creds)
+    sheets_service = get_service("sheets", "v4", creds)
+
+    converted = 0
+
+    if event.get("master", True):
+        master_sheet_ids = MasterLogShards(drive_service).all_spreadsheet_ids()
+
+        for master_sheet_id in master_sheet_ids.values():
+            master_ops = SheetsOperations(sheets_service, None, None, master_sheet_id)
+
+            for title in master_ops.get_master_sheet_ids(refresh=True):
+                converted += SheetsOperations(
+                    sheets_service, title, None, master_sheet_id
+                ).convert_hours_formulas(master=True)
+
+    if event.get("individual", True):
+        for timesheet in list_timesheets(drive_service):
+            converted += SheetsOperations(
+                sheets_service,
+                timesheet["name"].removeprefix(TIMESHEET_NAME_PREFIX),
+                timesheet["id"],
+            ).convert_hours_formulas()
+
+    logging.info("Converted %s Hours formulas to values", converted)
+    return {"converted": converted}
+
+
+def volunteer_hours_handler(event, _):
+    """
+    Reporting Lambda Function handler. Totals a volunteer's shifts across every
+    Master Log shard. The event names the volunteer as {"volunteer": "First Last"}.
+    """
+    volunteer_name = event.get("volunteer")
+    if not volunteer_name:
+        raise ValueError("volunteer is required")
+
+    creds = get_access_token(PRIV_SA, SCOPES)
+
+    drive_service = get_service("drive", "v3", creds)
+    master_sheet_ids = MasterLogShards(drive_service).all_spreadsheet_ids()
+
+    rows = read_master_log(creds, list(master_sheet_ids.values()), volunteer_name)
+
+    # Open shifts and rows that can't be parsed are left out
+    hours = [
+        shift_hours(row[:2], row[2])
+        for row in rows
+        if len(row) >= 3 and all(row[:3])
+    ]
+    hours = [value for value in hours if value is not None]
+
+    return {
+        "statusCode": 200,
+        "volunteer": volunteer_name,
+        "shifts": len(hours),
+        "hours": round(sum(hours) * 24, 2),
+    }
+
+
+def provision_pool_handler(_event, _):
+    """
+    Provisioner Lambda Function handler. Run on a schedule to keep the pools of
+    blank timesheets and Master Log tabs for new volunteers topped up.
+    """
+    creds = get_access_token(PRIV_SA, SCOPES)
+
+    drive_service = get_service("drive", "v3", creds)
+    sheets_service = get_service("sheets", "v4", creds)
+
+    size = pool_size()
+
+    timesheets = TimesheetPool(drive_service, sheets_service).fill(size)
+    master_tabs = fill_master_tab_pool(
+        sheets_service,
+        MasterLogShards(drive_service).current_spreadsheet_id(
+            datetime.now(LOCAL_TIMEZONE)
+        ),
+        size,
+    )
+
+    logging.info(
+        "Provisioned %s timesheets and %s master log tabs", timesheets, master_tabs
+    )
+    return {"timesheets": timesheets, "masterTabs": master_tabs}
+
+
+def directory_sync_handler(event, _):
+    """
+    Scheduled Lambda Function handler. Syncs the Openpath user directory index.
+    Pass {"full": true} to force a full scan.
+    """
+    location = index_location()
+    if not location:
+        raise ValueError("OPENPATH_DIRECTORY_INDEX is not configured")
+
+    if hasattr(settings, "prefetch"):
+        settings.prefetch("O_APIkey", "O_APIuser")
+
+    index = sync_directory(location, full=bool((event or {}).get("full")))
+
+    return {"users": len(index["users"]), "highWater": index["highWater"]}
+
+
+def volunteer_index_refresh_handler(_event, _):
+    """
+    Scheduled Lambda Function handler. Refreshes the volunteer resource index for
+    every volunteer in the Openpath directory index, with one listing of the
+    timesheets, the volunteer slides and the current Master Log's tabs. The
+    index must be in the shared cache for event handlers to see it.
+    """
+    if not shared_backend():
+        raise ValueError(
+            "The volunteer index refresh needs a shared cache, set CACHE_BACKEND"
+            " to dynamodb"
+        )
+
+    location = index_location()
+    if not location:
+        raise ValueError("OPENPATH_DIRECTORY_INDEX is not configured")
+
+    index = load_index(location)
+    if index is None:
+        raise ValueError(f"No Openpath directory index at {location}")
+
+    creds = get_access_token(PRIV_SA, SCOPES)
+
+    drive_service = get_service("drive", "v3", creds)
+    sheets_service = get_service("sheets", "v4", creds)
+
+    master_sheet_id = MasterLogShards(drive_service).current_spreadsheet_id(
+        datetime.now(LOCAL_TIMEZONE)
+    )
+
+    indexed = refresh_volunteer_index(
+        drive_service, sheets_service, index["users"], master_sheet_id
+    )
+
+    return {"indexed": indexed}
+
+
+def tag_drive_files_handler(_event, _):
+    """
+    Lambda Function handler for the one-off migration that stamps existing
+    timesheets and slides with the Openpath user id of their volunteer.
+    """
+    location = index_location()
+    if not location:
+        raise ValueError("OPENPATH_DIRECTORY_INDEX is not configured")
+
+    index = load_index(location)
+    if index is None:
+        raise ValueError(f"No Openpath directory index at {location}")
+
+    creds = get_access_token(PRIV_SA, SCOPES)
+    drive_service = get_service("drive", "v3", creds)
+
+    return tag_volunteer_files(drive_service, index["users"])
+
+
+def slideshow_reconcile_handler(event, _):
+    """
+    Scheduled Lambda Function handler. Reconciles the lobby slideshow with the
+    volunteers on duty, then deletes trashed slide copies unless {"purge": false}.
+    In composite mode, the composite slide is rendered again if it changed.
+    """
+    # Without a mode the on-duty state isn't kept, so every slide would be trashed
+    mode = slideshow_mode()
+    if mode is None:
+        raise ValueError("SLIDESHOW_MODE is not configured")
+
+    creds = get_access_token(PRIV_SA, SCOPES)
+    drive_service = get_service("drive", "v3", creds)
+
+    if mode == "composite":
+        return {
+            "updated": update_composite_slide(
+                drive_service, on_duty_volunteers(), refresh=True
+            )
+        }
+
+    results = reconcile_slideshow(drive_service, on_duty_volunteers())
+
+    if (event or {}).get("purge", True):
+        results["purged"] = purge_trashed_slides(drive_service)
+
+    return results
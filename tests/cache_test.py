@@ -0,0 +1,175 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import pytest
+from botocore.exceptions import ClientError
+from pytest_mock import MockerFixture
+
+from helpers.cache import (
+    DynamoDBStore,
+    MemoryStore,
+    SQLiteStore,
+    TieredStore,
+    get_persistent_store,
+    shared_backend,
+)
+
+
+class FakeDynamoDB:
+    """In-memory stand-in for the DynamoDB calls DynamoDBStore makes."""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, TableName, Key, ConsistentRead):
+        # pylint: disable=invalid-name, unused-argument
+        item = self.items.get((Key["namespace"]["S"], Key["key"]["S"]))
+        return {"Item": item} if item is not None else {}
+
+    def put_item(self, TableName, Item, ConditionExpression=None, **kwargs):
+        # pylint: disable=invalid-name, unused-argument
+        key = (Item["namespace"]["S"], Item["key"]["S"])
+        existing = self.items.get(key)
+        if ConditionExpression is not None and existing is not None:
+            now = float(kwargs["ExpressionAttributeValues"][":now"]["N"])
+            if float(existing["expiresAt"]["N"]) > now:
+                raise ClientError(
+                    {"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem"
+                )
+        self.items[key] = Item
+
+    def delete_item(self, TableName, Key):
+        # pylint: disable=invalid-name, unused-argument
+        self.items.pop((Key["namespace"]["S"], Key["key"]["S"]), None)
+
+    def query(self, TableName, ExpressionAttributeValues, **_kwargs):
+        # pylint: disable=invalid-name, unused-argument
+        namespace = ExpressionAttributeValues[":namespace"]["S"]
+        return {
+            "Items": [
+                item
+                for (item_namespace, _), item in self.items.items()
+                if item_namespace == namespace
+            ]
+        }
+
+
+@pytest.fixture(params=["memory", "sqlite", "dynamodb"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore()
+
+    if request.param == "dynamodb":
+        return DynamoDBStore("cache", "test", client=FakeDynamoDB())
+
+    return SQLiteStore(str(tmp_path / "cache.sqlite3"), "test")
+
+
+def test_set_and_get(store):
+    store.set("key", {"a": 1}, ttl=60)
+
+    assert store.get("key") == {"a": 1}
+    assert store.get("missing") is None
+
+
+def test_expired_entries_are_missing(store, mocker: MockerFixture):
+    time_mock = mocker.patch("helpers.cache.time.time")
+    time_mock.return_value = 1000
+
+    store.set("key", "value", ttl=60)
+
+    time_mock.return_value = 1061
+
+    assert store.get("key") is None
+
+
+def test_add_only_when_missing(store, mocker: MockerFixture):
+    time_mock = mocker.patch("helpers.cache.time.time")
+    time_mock.return_value = 1000
+
+    assert store.add("key", "first", ttl=60) is True
+    assert store.add("key", "second", ttl=60) is False
+    assert store.get("key") == "first"
+
+    time_mock.return_value = 1061
+
+    assert store.add("key", "third", ttl=60) is True
+    assert store.get("key") == "third"
+
+
+def test_delete_and_clear(store):
+    store.set("a", 1, ttl=60)
+    store.set("b", 2, ttl=60)
+
+    store.delete("a")
+    assert store.get("a") is None
+
+    store.clear()
+    assert store.get("b") is None
+
+
+def test_tiered_store_fills_memory_from_persistent(tmp_path):
+    persistent = SQLiteStore(str(tmp_path / "cache.sqlite3"), "test")
+    persistent.set("key", "value", ttl=60)
+    tiered = TieredStore(MemoryStore(), persistent)
+
+    assert tiered.get("key") == "value"
+    assert tiered.memory.get("key") == "value"
+
+
+def test_tiered_store_memory_ttl_sees_other_writers(tmp_path, mocker: MockerFixture):
+    time_mock = mocker.patch("helpers.cache.time.time")
+    time_mock.return_value = 1000
+    path = str(tmp_path / "cache.sqlite3")
+    tiered = TieredStore(MemoryStore(), SQLiteStore(path, "test"), memory_ttl=60)
+    other = SQLiteStore(path, "test")
+
+    tiered.set("key", "old", ttl=3600)
+    other.set("key", "new", ttl=3600)
+    assert tiered.get("key", ttl=3600) == "old"
+
+    time_mock.return_value = 1061
+
+    assert tiered.get("key", ttl=3600) == "new"
+
+
+def test_get_persistent_store(monkeypatch, tmp_path):
+    monkeypatch.delenv("CACHE_BACKEND", raising=False)
+    assert get_persistent_store("test") is None
+
+    monkeypatch.setenv("CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    assert isinstance(get_persistent_store("test"), SQLiteStore)
+    assert not shared_backend()
+
+    monkeypatch.setenv("CACHE_BACKEND", "dynamodb")
+    monkeypatch.setenv("CACHE_TABLE", "odv_cache")
+    persistent = get_persistent_store("test")
+    assert isinstance(persistent, DynamoDBStore)
+    assert persistent.table_name == "odv_cache"
+    assert shared_backend()
+
+
+def test_dynamodb_namespaces_are_separate():
+    client = FakeDynamoDB()
+    first = DynamoDBStore("cache", "first", client=client)
+    second = DynamoDBStore("cache", "second", client=client)
+
+    first.set("key", 1, ttl=60)
+    second.set("key", 2, ttl=60)
+    first.clear()
+
+    assert first.get("key") is None
+    assert second.get("key") == 2
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStore(maxsize=2)
+    store.set("a", 1, ttl=60)
+    store.set("b", 2, ttl=60)
+
+    store.get("a")
+    store.set("c", 3, ttl=60)
+
+    assert store.get("a") == 1
+    assert store.get("b") is None
+    assert store.get("c") == 3
@@ -0,0 +1,214 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import io
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from pytest_mock import MockerFixture
+
+from helpers.composite_slide import (
+    COMPOSITE_PROPERTY,
+    COMPOSITE_TTL,
+    SIGNATURE_PROPERTY,
+    SLIDE_CACHE_LIMIT,
+    SLIDE_SIZE,
+    composite_state,
+    on_duty_slides,
+    render_composite,
+    slide_image,
+    slides_signature,
+    update_composite_slide,
+)
+from helpers.google_services import DriveOperations
+
+ON_DUTY = {
+    "1": {"name": "Joe Shmoe", "since": 900, "slideId": None},
+    "2": {"name": "Jane Doe", "since": 950, "slideId": None},
+}
+
+SLIDES = [
+    {
+        "id": "slide-1",
+        "name": "ODV - Joe Shmoe.png",
+        "appProperties": {"opUserId": "1"},
+        "md5Checksum": "aaa",
+    },
+    {"id": "slide-2", "name": "ODV - Jane Doe.png", "md5Checksum": "bbb"},
+    {"id": "slide-3", "name": "ODV - Someone Else.png", "md5Checksum": "ccc"},
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_stores():
+    composite_state.clear()
+    yield
+    composite_state.clear()
+
+
+@pytest.fixture(autouse=True)
+def slide_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("SLIDE_CACHE_DIR", str(tmp_path / "slides"))
+    return tmp_path / "slides"
+
+
+@pytest.fixture(autouse=True)
+def folders(mocker: MockerFixture):
+    mocker.patch.object(DriveOperations, "slideshow_folder_id", new="lobby")
+    mocker.patch.object(DriveOperations, "volunteer_slides_folder_id", new="slides")
+
+
+@pytest.fixture
+def drive_service(mocker: MockerFixture):
+    drive_service = mocker.Mock()
+    drive_service.files().get_media().execute.side_effect = lambda: b"png"
+    drive_service.files().list().execute.return_value = {"files": []}
+    drive_service.files().create().execute.return_value = {"id": "composite"}
+    drive_service.files.reset_mock()
+    return drive_service
+
+
+@pytest.fixture
+def render(mocker: MockerFixture):
+    return mocker.patch(
+        "helpers.composite_slide.render_composite", return_value=b"composite"
+    )
+
+
+@pytest.fixture(autouse=True)
+def slides(mocker: MockerFixture):
+    return mocker.patch(
+        "helpers.composite_slide.list_volunteer_slides", return_value=SLIDES
+    )
+
+
+def test_on_duty_slides_match_stamp_then_name(drive_service):
+    assert on_duty_slides(drive_service, ON_DUTY) == [
+        {"userId": "2", "name": "Jane Doe", "id": "slide-2", "md5Checksum": "bbb"},
+        {"userId": "1", "name": "Joe Shmoe", "id": "slide-1", "md5Checksum": "aaa"},
+    ]
+
+
+def test_slides_signature_changes_with_content():
+    slides = [{"userId": "1", "md5Checksum": "aaa"}]
+
+    assert slides_signature(slides) == slides_signature(list(slides))
+    assert slides_signature(slides) != slides_signature(
+        [{"userId": "1", "md5Checksum": "abc"}]
+    )
+    assert slides_signature(slides) != slides_signature([])
+
+
+def test_slide_image_cached_by_checksum(drive_service):
+    slide = {"id": "slide-1", "md5Checksum": "aaa"}
+
+    assert slide_image(drive_service, slide) == b"png"
+    assert slide_image(drive_service, {**slide, "id": "renamed"}) == b"png"
+
+    drive_service.files().get_media.assert_called_once_with(
+        fileId="slide-1", supportsAllDrives=True
+    )
+
+
+def test_slide_cache_keeps_most_recent_images(drive_service, slide_cache):
+    for index in range(SLIDE_CACHE_LIMIT + 2):
+        slide_image(drive_service, {"id": f"slide-{index}", "md5Checksum": f"{index}"})
+
+    assert len(list(slide_cache.iterdir())) == SLIDE_CACHE_LIMIT
+
+
+def test_render_composite():
+    image = pytest.importorskip("PIL.Image")
+    slide = io.BytesIO()
+    image.new("RGB", SLIDE_SIZE, (255, 0, 0)).save(slide, format="PNG")
+
+    content = render_composite([slide.getvalue(), slide.getvalue()])
+
+    composite = image.open(io.BytesIO(content))
+    assert composite.format == "PNG"
+    assert composite.size == SLIDE_SIZE
+    # The first tile is centered in the left half, under the title
+    assert composite.getpixel((SLIDE_SIZE[0] // 4, SLIDE_SIZE[1] // 2)) == (255, 0, 0)
+    assert composite.getpixel((5, 5)) == (255, 255, 255)
+
+
+def test_render_composite_without_volunteers():
+    image = pytest.importorskip("PIL.Image")
+
+    composite = image.open(io.BytesIO(render_composite([])))
+
+    assert composite.size == SLIDE_SIZE
+
+
+def test_update_creates_composite_the_first_time(drive_service, render):
+    assert update_composite_slide(drive_service, ON_DUTY)
+
+    render.assert_called_once_with([b"png", b"png"])
+    body = drive_service.files().create.call_args.kwargs["body"]
+    assert body["parents"] == ["lobby"]
+    assert body["appProperties"][COMPOSITE_PROPERTY] == "1"
+    assert composite_state.get("lobby")["id"] == "composite"
+    drive_service.files().update.assert_not_called()
+
+
+def test_update_skipped_when_unchanged(drive_service, render):
+    update_composite_slide(drive_service, ON_DUTY)
+    render.reset_mock()
+    drive_service.files.reset_mock()
+
+    assert not update_composite_slide(drive_service, ON_DUTY)
+
+    render.assert_not_called()
+    drive_service.files().get_media.assert_not_called()
+    drive_service.files().update.assert_not_called()
+
+
+def test_update_existing_composite_in_place(drive_service, render):
+    drive_service.files().list().execute.return_value = {
+        "files": [
+            {
+                "id": "existing",
+                "appProperties": {COMPOSITE_PROPERTY: "1", SIGNATURE_PROPERTY: "old"},
+            }
+        ]
+    }
+
+    assert update_composite_slide(drive_service, {"1": ON_DUTY["1"]})
+
+    render.assert_called_once_with([b"png"])
+    kwargs = drive_service.files().update.call_args.kwargs
+    assert kwargs["fileId"] == "existing"
+    assert kwargs["fields"] == "id"
+    drive_service.files().create.assert_not_called()
+
+
+def test_update_recreates_deleted_composite(drive_service, render):
+    composite_state.set("lobby", {"id": "gone", "signature": "old"}, COMPOSITE_TTL)
+    drive_service.files().update().execute.side_effect = HttpError(
+        httplib2.Response({"status": "404"}), b"Not found"
+    )
+
+    assert update_composite_slide(drive_service, ON_DUTY)
+
+    drive_service.files().create.assert_called()
+    assert composite_state.get("lobby")["id"] == "composite"
+
+
+def test_refresh_checks_signature_of_file(drive_service, render):
+    update_composite_slide(drive_service, ON_DUTY)
+    drive_service.files().list().execute.return_value = {
+        "files": [
+            {
+                "id": "composite",
+                "appProperties": {COMPOSITE_PROPERTY: "1", SIGNATURE_PROPERTY: "other"},
+            }
+        ]
+    }
+    render.reset_mock()
+
+    # The cached signature matches, but another container rendered the file since
+    assert not update_composite_slide(drive_service, ON_DUTY)
+    assert update_composite_slide(drive_service, ON_DUTY, refresh=True)
+
+    render.assert_called_once()
+    assert drive_service.files().update.call_args.kwargs["fileId"] == "composite"
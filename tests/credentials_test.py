@@ -0,0 +1,75 @@
+# pylint: disable=missing-docstring, redefined-outer-name, import-outside-toplevel
+
+import importlib
+import json
+import sys
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def credentials(monkeypatch, tmp_path):
+    secrets_file = tmp_path / "secrets.json"
+    secrets_file.write_text(
+        json.dumps(
+            {
+                "O_APIkey": "op-key",
+                "O_APIuser": "op-user",
+                "INTERNAL_API_KEY": "internal",
+                "SLACK_TOKEN": "slack",
+                "key_file": {"type": "service_account"},
+            }
+        )
+    )
+
+    for name in [
+        "MASTER_LOG_SPREADSHEET_ID",
+        "TEMPLATE_SHEET_ID",
+        "PARENT_FOLDER_ID",
+        "ON_DUTY_DRIVE_ID",
+        "MAIN_DRIVE_ID",
+        "SLACK_WEBHOOK_URL",
+        "SLACK_ON_DUTY_CHANNEL_ID",
+        "PRIV_SA",
+        "CLOCK_IN_ENTRY_NAME",
+        "CLOCK_OUT_ENTRY_NAME",
+    ]:
+        monkeypatch.setenv(name, name.lower())
+
+    monkeypatch.setenv("SECRETS_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_SECRETS_FILE", str(secrets_file))
+
+    sys.modules.pop("credentials", None)
+    module = importlib.import_module("credentials")
+    yield module
+    sys.modules.pop("credentials", None)
+
+
+def test_secrets_are_resolved_lazily(credentials, mocker: MockerFixture):
+    decrypt = mocker.spy(credentials.provider.backend, "decrypt")
+
+    assert credentials.PRIV_SA == "priv_sa"
+    decrypt.assert_not_called()
+
+    assert credentials.INTERNAL_API_KEY == "internal"
+    assert credentials.INTERNAL_API_KEY == "internal"
+    decrypt.assert_called_once_with("INTERNAL_API_KEY")
+
+
+def test_prefetch_resolves_in_parallel(credentials, mocker: MockerFixture):
+    get_secret = mocker.spy(credentials.provider.backend, "get_secret")
+    decrypt = mocker.spy(credentials.provider.backend, "decrypt")
+
+    credentials.prefetch("SLACK_TOKEN", "key_file")
+
+    decrypt.assert_called_once_with("SLACK_TOKEN")
+    get_secret.assert_called_once_with("key_file")
+    assert credentials.key_file == {"type": "service_account"}
+    assert credentials.SLACK_TOKEN == "slack"
+    assert decrypt.call_count == 1
+
+
+def test_unknown_attribute(credentials):
+    with pytest.raises(AttributeError):
+        _ = credentials.NOT_A_SECRET
@@ -0,0 +1,64 @@
+# pylint: disable=missing-docstring
+
+from pytest_mock import MockerFixture
+from googleapiclient.errors import HttpError
+
+from helpers.drive_batch import DriveBatch
+
+
+def run_batch(batch_mock, responses):
+    callback = batch_mock.callback
+    for call in batch_mock.add.call_args_list:
+        request_id = call.kwargs["request_id"]
+        response = responses[request_id]
+        if isinstance(response, Exception):
+            callback(request_id, None, response)
+        else:
+            callback(request_id, response, None)
+
+
+def test_execute_returns_results_per_request(mocker: MockerFixture):
+    drive_service = mocker.Mock()
+    batch_mock = mocker.Mock()
+    error = HttpError(mocker.Mock(status=404), b"File not found")
+
+    def new_batch(callback):
+        batch_mock.callback = callback
+        batch_mock.execute.side_effect = lambda: run_batch(
+            batch_mock, {"found": {"files": []}, "missing": error}
+        )
+        return batch_mock
+
+    drive_service.new_batch_http_request.side_effect = new_batch
+
+    batch = DriveBatch(drive_service)
+    batch.add("found", mocker.sentinel.found)
+    batch.add("missing", mocker.sentinel.missing)
+
+    assert batch.execute() == {"found": {"files": []}, "missing": error}
+    batch_mock.execute.assert_called_once()
+    assert len(batch) == 0
+
+
+def test_lone_request_is_sent_on_its_own(mocker: MockerFixture):
+    drive_service = mocker.Mock()
+    request = mocker.Mock()
+    request.execute.return_value = {"id": "1"}
+
+    batch = DriveBatch(drive_service)
+    batch.add("only", request)
+
+    assert batch.execute() == {"only": {"id": "1"}}
+    drive_service.new_batch_http_request.assert_not_called()
+
+
+def test_execute_splits_large_batches(mocker: MockerFixture):
+    drive_service = mocker.Mock()
+
+    batch = DriveBatch(drive_service)
+    for index in range(150):
+        batch.add(str(index), mocker.Mock())
+
+    batch.execute()
+
+    assert drive_service.new_batch_http_request.call_count == 2
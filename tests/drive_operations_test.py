@@ -2,12 +2,20 @@
 
 import pytest
 from pytest_mock import MockerFixture
+from googleapiclient.errors import HttpError
 
-from helpers.google_services import DriveOperations
+from helpers.google_services import DriveOperations, folder_ids
 
 from config import ON_DUTY_DRIVE_ID, MAIN_DRIVE_ID, PARENT_FOLDER_ID, TEMPLATE_SHEET_ID
 
 
+@pytest.fixture(autouse=True)
+def clear_folder_ids():
+    folder_ids.clear()
+    yield
+    folder_ids.clear()
+
+
 class TestDriveOperations:
     @pytest.fixture
     def mock_folders(self, mocker: MockerFixture):
@@ -170,5 +178,101 @@ class TestDriveOperations:
                 "name": f"ODV Timesheet - {mock_instance.volunteer_name}",
                 "parents": [mock_instance.parent_folder_id],
             },
+            fields="id",
+            supportsAllDrives=True,
+        )
+
+    def test_folder_ids_are_looked_up_lazily_and_cached(self, mocker: MockerFixture):
+        get_folder_id = mocker.patch(
+            "helpers.google_services.DriveOperations.get_folder_id"
+        )
+        get_folder_id.side_effect = lambda drive_id, folder_name: {
+            "id": f"{folder_name}-id"
+        }
+
+        mock_instance = DriveOperations(mocker.Mock(), "Test Volunteer Name")
+        get_folder_id.assert_not_called()
+
+        assert mock_instance.slideshow_folder_id == "_____LobbyTV-id"
+        assert mock_instance.volunteer_slides_folder_id == "Volunteer Slides-id"
+        assert get_folder_id.call_count == 2
+
+        other_instance = DriveOperations(mocker.Mock(), "Other Volunteer")
+        assert other_instance.slideshow_folder_id == "_____LobbyTV-id"
+        assert get_folder_id.call_count == 2
+
+    def test_missing_folders_are_not_cached(self, mocker: MockerFixture):
+        get_folder_id = mocker.patch(
+            "helpers.google_services.DriveOperations.get_folder_id"
+        )
+        get_folder_id.return_value = {}
+
+        assert DriveOperations(mocker.Mock(), "A").slideshow_folder_id is None
+        assert DriveOperations(mocker.Mock(), "B").slideshow_folder_id is None
+        assert get_folder_id.call_count == 4
+
+    def test_add_slide_refreshes_folder_ids_on_404(self, mocker: MockerFixture):
+        get_folder_id = mocker.patch(
+            "helpers.google_services.DriveOperations.get_folder_id"
+        )
+        get_folder_id.side_effect = [
+            {"id": "old-lobby"},
+            {"id": "slides"},
+            {"id": "new-lobby"},
+            {"id": "slides"},
+        ]
+        m = mocker.MagicMock()
+        m.files().copy().execute.side_effect = [
+            HttpError(mocker.Mock(status=404), b"File not found"),
+            {},
+        ]
+        mock_instance = DriveOperations(m, "Test Volunteer Name")
+
+        mock_instance.add_slide("789")
+
+        m.files().copy.assert_called_with(
+            fileId="789",
+            body={"name": "Test Volunteer Name", "parents": ["new-lobby"]},
+            fields="id",
+            supportsAllDrives=True,
+        )
+        assert mock_instance.slideshow_folder_id == "new-lobby"
+
+    def test_check_timesheet_exists_by_user_id(self, mocker: MockerFixture):
+        drive_service = mocker.MagicMock()
+        drive_service.files().list().execute.return_value = {"files": [{"id": "1"}]}
+        name_search = mocker.patch(
+            "helpers.google_services.DriveOperations.asmbly_drive_file_search"
+        )
+
+        drive_ops = DriveOperations(drive_service, "Test Volunteer Name", user_id=42)
+
+        assert drive_ops.check_timesheet_exists() == [{"id": "1"}]
+        assert "appProperties has {key='opUserId' and value='42'}" in (
+            drive_service.files().list.call_args.kwargs["q"]
+        )
+        name_search.assert_not_called()
+
+    def test_check_timesheet_exists_stamps_timesheet_found_by_name(
+        self, mocker: MockerFixture
+    ):
+        drive_service = mocker.MagicMock()
+        drive_service.files().list().execute.return_value = {"files": []}
+        mocker.patch(
+            "helpers.google_services.DriveOperations.asmbly_drive_file_search"
+        ).return_value = {
+            "files": [
+                {"id": "other", "appProperties": {"opUserId": "7"}},
+                {"id": "mine"},
+            ]
+        }
+
+        drive_ops = DriveOperations(drive_service, "Test Volunteer Name", user_id=42)
+
+        assert drive_ops.check_timesheet_exists() == [{"id": "mine"}]
+        drive_service.files().update.assert_called_with(
+            fileId="mine",
+            body={"appProperties": {"opUserId": "42"}},
+            fields="id",
             supportsAllDrives=True,
         )
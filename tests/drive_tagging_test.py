@@ -0,0 +1,58 @@
+# pylint: disable=missing-docstring
+
+from pytest_mock import MockerFixture
+
+from helpers.drive_tagging import tag_volunteer_files
+from helpers.google_services import DriveOperations
+
+
+def test_tags_untagged_files_in_batches(mocker: MockerFixture):
+    drive_service = mocker.MagicMock()
+    mocker.patch(
+        "helpers.drive_tagging.list_timesheets",
+        return_value=[
+            {"id": "sheet-1", "name": "ODV Timesheet - Joe Shmoe"},
+            {
+                "id": "sheet-2",
+                "name": "ODV Timesheet - Jane Doe",
+                "appProperties": {"opUserId": "2"},
+            },
+            {"id": "sheet-3", "name": "ODV Timesheet - Sam Smith"},
+        ],
+    )
+    mocker.patch.object(DriveOperations, "volunteer_slides_folder_id", new="slides")
+    mocker.patch(
+        "helpers.drive_tagging.list_volunteer_slides",
+        return_value=[{"id": "slide-1", "name": "ODV - Joe Shmoe.png"}],
+    )
+
+    batch = drive_service.new_batch_http_request.return_value
+    batch.execute.side_effect = lambda: [
+        drive_service.new_batch_http_request.call_args.kwargs["callback"](
+            call.kwargs["request_id"], {}, None
+        )
+        for call in batch.add.call_args_list
+    ]
+
+    results = tag_volunteer_files(
+        drive_service,
+        {
+            1: {"firstName": "Joe", "lastName": "Shmoe"},
+            2: {"firstName": "Jane", "lastName": "Doe"},
+            3: {"firstName": "Sam", "lastName": "Smith"},
+            4: {"firstName": "Sam", "lastName": "Smith"},
+        },
+    )
+
+    assert results == {"tagged": 2, "failed": 0}
+    assert [call.kwargs["request_id"] for call in batch.add.call_args_list] == [
+        "sheet-1",
+        "slide-1",
+    ]
+    drive_service.files().update.assert_any_call(
+        fileId="slide-1",
+        body={"appProperties": {"opUserId": "1"}},
+        fields="id",
+        supportsAllDrives=True,
+    )
+    batch.execute.assert_called_once()
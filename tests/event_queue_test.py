@@ -0,0 +1,109 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import pytest
+from pytest_mock import MockerFixture
+
+from helpers.event_queue import EventQueue, InMemoryQueue, SQLiteQueue, SQSQueue
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryQueue()
+
+    return SQLiteQueue(str(tmp_path / "events.sqlite3"))
+
+
+def test_put_and_receive(queue):
+    queue.put({"entryId": "Clock In", "userId": "1", "timestamp": "100"})
+    queue.put({"entryId": "Clock Out", "userId": "1", "timestamp": "200"})
+
+    messages = queue.receive()
+
+    assert [message.body["timestamp"] for message in messages] == ["100", "200"]
+
+
+def test_received_messages_are_not_received_again(queue):
+    queue.put({"userId": "1"})
+
+    assert len(queue.receive()) == 1
+    assert queue.receive() == []
+
+
+def test_receive_respects_max_messages(queue):
+    for i in range(3):
+        queue.put({"userId": str(i)})
+
+    assert len(queue.receive(max_messages=2)) == 2
+    assert len(queue.receive(max_messages=2)) == 1
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_unacked_messages_are_redelivered(backend, tmp_path):
+    if backend == "memory":
+        queue = InMemoryQueue(visibility_timeout=0)
+    else:
+        queue = SQLiteQueue(str(tmp_path / "events.sqlite3"), visibility_timeout=0)
+    queue.put({"userId": "1"})
+
+    first = queue.receive()
+    second = queue.receive()
+
+    assert first[0].message_id == second[0].message_id
+
+    queue.ack(second[0].message_id)
+
+    assert queue.receive() == []
+
+
+def test_memory_queue_keeps_failed_message_for_worker(mocker: MockerFixture):
+    time_mock = mocker.patch("helpers.event_queue.time.time", return_value=1000)
+    queue = InMemoryQueue(visibility_timeout=300)
+    queue.put({"userId": "1"})
+    queue.put({"userId": "2"})
+
+    failed, processed = queue.receive()
+    queue.ack(processed.message_id)
+
+    assert queue.receive() == []
+    assert len(queue) == 1
+
+    time_mock.return_value = 1300
+    assert queue.receive() == [failed]
+
+
+def test_event_queue_is_abstract():
+    with pytest.raises(TypeError):
+        EventQueue()  # pylint: disable=abstract-class-instantiated
+
+
+def test_sqlite_queue_is_durable(tmp_path):
+    path = str(tmp_path / "events.sqlite3")
+    SQLiteQueue(path).put({"userId": "1"})
+
+    assert SQLiteQueue(path).receive()[0].body == {"userId": "1"}
+
+
+def test_sqs_fifo_queue_sends_group_and_deduplication_ids(mocker: MockerFixture):
+    client = mocker.Mock()
+    queue = SQSQueue("https://sqs.example/journal.fifo", client=client)
+
+    queue.put({"userId": "1"}, group_id="1", deduplication_id="1:100:in")
+
+    client.send_message.assert_called_once_with(
+        QueueUrl="https://sqs.example/journal.fifo",
+        MessageBody='{"userId": "1"}',
+        MessageGroupId="1",
+        MessageDeduplicationId="1:100:in",
+    )
+
+
+def test_sqs_standard_queue_ignores_group_id(mocker: MockerFixture):
+    client = mocker.Mock()
+    queue = SQSQueue("https://sqs.example/events", client=client)
+
+    queue.put({"userId": "1"}, group_id="1")
+
+    client.send_message.assert_called_once_with(
+        QueueUrl="https://sqs.example/events", MessageBody='{"userId": "1"}'
+    )
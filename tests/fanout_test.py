@@ -0,0 +1,61 @@
+# pylint: disable=missing-docstring
+
+import threading
+
+from helpers.fanout import run_steps
+
+
+def test_run_steps_all_succeed():
+    results = []
+
+    failures = run_steps(
+        {
+            "one": lambda: results.append(1),
+            "two": lambda: results.append(2),
+        }
+    )
+
+    assert failures == {}
+    assert sorted(results) == [1, 2]
+
+
+def test_run_steps_failure_does_not_cancel_others(caplog):
+    results = []
+
+    def fail():
+        raise ValueError("boom")
+
+    failures = run_steps(
+        {
+            "fails": fail,
+            "succeeds": lambda: results.append("done"),
+        }
+    )
+
+    assert list(failures) == ["fails"]
+    assert isinstance(failures["fails"], ValueError)
+    assert results == ["done"]
+    assert "Step 'fails' failed: boom" in caplog.text
+
+
+def test_run_steps_runs_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    failures = run_steps({str(i): barrier.wait for i in range(3)})
+
+    assert failures == {}
+
+
+def test_run_steps_no_steps():
+    assert run_steps({}) == {}
+
+
+def test_run_steps_nested_runs_inline():
+    results = []
+
+    def outer():
+        failures = run_steps({f"inner {i}": lambda i=i: results.append(i) for i in range(8)})
+        assert failures == {}
+
+    assert run_steps({f"outer {i}": outer for i in range(4)}) == {}
+    assert len(results) == 32
@@ -0,0 +1,92 @@
+# pylint: disable=missing-docstring, redefined-outer-name, protected-access
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pytest_mock import MockerFixture
+
+from helpers import google_services
+from helpers.google_services import get_service
+
+
+@pytest.fixture(autouse=True)
+def clear_service_cache():
+    google_services._service_cache.__dict__.clear()
+    yield
+    google_services._service_cache.__dict__.clear()
+
+
+def test_get_service_builds_from_bundled_document(mocker: MockerFixture):
+    build_mock = mocker.patch("helpers.google_services.build")
+
+    service = get_service("drive", "v3", mocker.Mock())
+
+    build_mock.assert_not_called()
+    assert hasattr(service, "files")
+
+
+def test_get_service_reuses_client_and_swaps_credentials(mocker: MockerFixture):
+    build_from_document = mocker.spy(google_services, "build_from_document")
+    first_creds = mocker.Mock()
+    second_creds = mocker.Mock()
+
+    first = get_service("sheets", "v4", first_creds)
+    second = get_service("sheets", "v4", second_creds)
+
+    assert first is second
+    build_from_document.assert_called_once()
+    assert first._http.credentials is second_creds
+
+
+def test_get_service_caches_each_api_separately(mocker: MockerFixture):
+    creds = mocker.Mock()
+
+    drive = get_service("drive", "v3", creds)
+    sheets = get_service("sheets", "v4", creds)
+
+    assert drive is not sheets
+    assert get_service("drive", "v3", creds) is drive
+
+
+class TestGetAccessToken:
+    @pytest.fixture(autouse=True)
+    def clear_credentials_cache(self, mocker: MockerFixture):
+        google_services._impersonated_credentials.clear()
+        mocker.patch("helpers.google_services._get_source_credentials")
+        yield
+        google_services._impersonated_credentials.clear()
+
+    @pytest.fixture
+    def mock_impersonated(self, mocker: MockerFixture):
+        def refresh(_request):
+            creds.token = "token"
+            creds.expiry = datetime.now(timezone.utc).replace(
+                tzinfo=None
+            ) + timedelta(seconds=300)
+
+        creds = mocker.Mock(token=None, expiry=None)
+        creds.refresh.side_effect = refresh
+
+        mocker.patch("helpers.google_services.ImpersonatedCredentials").return_value = (
+            creds
+        )
+
+        return creds
+
+    def test_reuses_valid_token(self, mock_impersonated):
+        first = google_services.get_access_token("sa@test.com", ["scope"])
+        second = google_services.get_access_token("sa@test.com", ["scope"])
+
+        assert first is second
+        mock_impersonated.refresh.assert_called_once()
+
+    def test_refreshes_near_expiry(self, mock_impersonated):
+        google_services.get_access_token("sa@test.com", ["scope"])
+
+        mock_impersonated.expiry = datetime.now(timezone.utc).replace(
+            tzinfo=None
+        ) + timedelta(seconds=30)
+
+        google_services.get_access_token("sa@test.com", ["scope"])
+
+        assert mock_impersonated.refresh.call_count == 2
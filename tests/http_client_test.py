@@ -0,0 +1,116 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import pytest
+import requests
+import requests_mock
+from pytest_mock import MockerFixture
+
+from helpers.http_client import HttpClient, parse_retry_after
+
+URL = "https://api.openpath.com/orgs/5231/users/1"
+
+
+@pytest.fixture
+def sleep_mock(mocker: MockerFixture):
+    return mocker.patch("helpers.http_client.time.sleep")
+
+
+@pytest.fixture
+def client(sleep_mock):  # pylint: disable=unused-argument
+    return HttpClient(timeout=5, max_retries=3)
+
+
+def test_reuses_session_per_host(client):
+    assert client.session("slack.com") is client.session("slack.com")
+    assert client.session("slack.com") is not client.session("api.openpath.com")
+
+
+def test_retries_transient_errors(client):
+    with requests_mock.Mocker() as m:
+        m.get(URL, [{"status_code": 503}, {"status_code": 200, "json": {"data": 1}}])
+
+        response = client.get(URL, deadline=30)
+
+    assert response.status_code == 200
+    assert m.call_count == 2
+
+    metrics = client.metrics["api.openpath.com"]
+    assert metrics.requests == 2
+    assert metrics.errors == 1
+    assert metrics.retries == 1
+
+
+def test_metrics_summary_and_reset(client):
+    with requests_mock.Mocker() as m:
+        m.get(URL, [{"status_code": 503}, {"status_code": 200}])
+        client.get(URL, deadline=30)
+
+    summary = client.metrics_summary()["api.openpath.com"]
+    assert summary["requests"] == 2
+    assert summary["errors"] == 1
+    assert summary["retries"] == 1
+    assert summary["maxLatency"] >= summary["averageLatency"] >= 0
+
+    client.reset_metrics()
+
+    assert client.metrics_summary() == {}
+
+
+def test_respects_retry_after(client, sleep_mock):
+    with requests_mock.Mocker() as m:
+        m.get(
+            URL,
+            [
+                {"status_code": 429, "headers": {"Retry-After": "3"}},
+                {"status_code": 200},
+            ],
+        )
+
+        client.get(URL, deadline=30)
+
+    sleep_mock.assert_called_once_with(3.0)
+
+
+def test_gives_up_after_max_retries(client):
+    with requests_mock.Mocker() as m:
+        m.get(URL, status_code=500)
+
+        response = client.get(URL, deadline=30)
+
+    assert response.status_code == 500
+    assert m.call_count == 4
+
+
+def test_does_not_retry_post_on_server_error(client):
+    with requests_mock.Mocker() as m:
+        m.post(URL, status_code=500)
+
+        client.post(URL, deadline=30)
+
+    assert m.call_count == 1
+
+
+def test_raises_connection_errors_after_retries(client):
+    with requests_mock.Mocker() as m:
+        m.get(URL, exc=requests.ConnectionError)
+
+        with pytest.raises(requests.ConnectionError):
+            client.get(URL, deadline=30)
+
+    assert m.call_count == 4
+
+
+def test_with_headers(client):
+    with requests_mock.Mocker() as m:
+        m.get(URL, status_code=200)
+
+        client.with_headers({"Authorization": "Bearer token"}).get(URL)
+
+    assert m.last_request.headers["Authorization"] == "Bearer token"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("garbage") is None
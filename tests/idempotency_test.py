@@ -0,0 +1,67 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import pytest
+
+from helpers.cache import MemoryStore, SQLiteStore, TieredStore
+from helpers.idempotency import DebounceStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def debounce(request, tmp_path):
+    if request.param == "memory":
+        return DebounceStore(180, store=TieredStore(MemoryStore()))
+
+    persistent = SQLiteStore(str(tmp_path / "cache.sqlite3"), "debounce")
+    return DebounceStore(180, store=TieredStore(MemoryStore(), persistent))
+
+
+def test_first_press_is_not_duplicate(debounce):
+    assert debounce.is_duplicate(1, "Clock In", 1706630094) is False
+
+
+def test_repeat_press_within_window_is_duplicate(debounce):
+    debounce.is_duplicate(1, "Clock In", 1706630094)
+
+    assert debounce.is_duplicate(1, "Clock In", 1706630094) is True
+    assert debounce.is_duplicate(1, "Clock In", 1706630094 + 179) is True
+    assert debounce.is_duplicate(1, "Clock In", 1706630094 - 60) is True
+
+
+def test_press_after_window_is_not_duplicate(debounce):
+    debounce.is_duplicate(1, "Clock In", 1706630094)
+
+    assert debounce.is_duplicate(1, "Clock In", 1706630094 + 180) is False
+
+
+def test_other_entry_or_user_is_not_duplicate(debounce):
+    debounce.is_duplicate(1, "Clock In", 1706630094)
+
+    assert debounce.is_duplicate(1, "Clock Out", 1706630094) is False
+    assert debounce.is_duplicate(2, "Clock In", 1706630094) is False
+
+
+def test_shared_backend_is_seen_by_other_containers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = DebounceStore(
+        180, store=TieredStore(MemoryStore(), SQLiteStore(path, "debounce"))
+    )
+    second = DebounceStore(
+        180, store=TieredStore(MemoryStore(), SQLiteStore(path, "debounce"))
+    )
+
+    assert first.is_duplicate(1, "Clock In", 1706630094) is False
+    assert second.is_duplicate(1, "Clock In", 1706630094) is True
+
+
+def test_released_press_is_accepted_again(debounce):
+    debounce.is_duplicate(1, "Clock In", 1706630094)
+    debounce.release(1, "Clock In", 1706630094)
+
+    assert debounce.is_duplicate(1, "Clock In", 1706630094) is False
+
+
+def test_release_keeps_other_presses(debounce):
+    debounce.is_duplicate(1, "Clock In", 1706630094)
+    debounce.release(1, "Clock In", 1706630094 + 1)
+
+    assert debounce.is_duplicate(1, "Clock In", 1706630094) is True
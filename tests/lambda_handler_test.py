@@ -1,11 +1,32 @@
 # pylint: disable=missing-docstring, redefined-outer-name
-from datetime import datetime, timedelta
+from datetime import datetime
 from zoneinfo import ZoneInfo
 import json
 import pytest
 
 from pytest_mock import MockerFixture
-from lambda_function import handler
+from googleapiclient.errors import HttpError
+from lambda_function import (
+    handler,
+    worker_handler,
+    batch_handler,
+    master_log_flush_handler,
+    convert_hours_handler,
+    volunteer_hours_handler,
+    volunteer_index_refresh_handler,
+    slideshow_reconcile_handler,
+    ensure_master_tab,
+)
+from helpers.event_queue import InMemoryQueue
+from helpers.idempotency import DebounceStore
+from helpers.cache import MemoryStore, TieredStore
+from helpers.openpath_classes import user_cache
+from helpers.volunteer_index import (
+    get_volunteer_resources,
+    update_volunteer_resources,
+    volunteer_index,
+)
+from helpers.slideshow import on_duty_store
 
 from config import INTERNAL_API_KEY, CLOCK_IN_ENTRY_NAME, CLOCK_OUT_ENTRY_NAME
 
@@ -13,7 +34,14 @@ from config import INTERNAL_API_KEY, CLOCK_IN_ENTRY_NAME, CLOCK_OUT_ENTRY_NAME
 @pytest.fixture(autouse=True)
 def mock_base_function_calls(mocker: MockerFixture):
     mocker.patch("lambda_function.get_access_token").return_value = mocker.Mock()
-    mocker.patch("lambda_function.build").return_value = mocker.Mock()
+    mocker.patch("lambda_function.get_service").return_value = mocker.Mock()
+    mocker.patch("lambda_function.TimesheetPool").return_value.claim.return_value = None
+    mocker.patch(
+        "lambda_function.debounce_store", DebounceStore(store=TieredStore(MemoryStore()))
+    )
+    user_cache.clear()
+    volunteer_index.clear()
+    on_duty_store.clear()
 
 
 @pytest.fixture
@@ -153,9 +181,6 @@ def test_handler_clock_in_valid_key_existing_volunteer_master_sheet_exsists_slac
 
     sheets_mock = mocker.Mock()
     sheets_mock.check_master_log.return_value = True
-    sheets_mock.get_last_entry_datetime.return_value = datetime.now() - timedelta(
-        days=1
-    )
 
     mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
 
@@ -176,22 +201,13 @@ def test_handler_clock_in_valid_key_existing_volunteer_master_sheet_exsists_slac
     drive_mock.check_timesheet_exists.assert_called_once()
     drive_mock.create_timesheet.assert_not_called()
     sheets_mock.initialize_copied_template.assert_not_called()
-    sheets_mock.add_clock_in_entry_to_timesheet.assert_has_calls(
-        [
-            mocker.call(
-                (
-                    mock_clock_in_event_valid_key_datetimes["date"],
-                    mock_clock_in_event_valid_key_datetimes["time"],
-                )
-            ),
-            mocker.call(
-                (
-                    mock_clock_in_event_valid_key_datetimes["date"],
-                    mock_clock_in_event_valid_key_datetimes["time"],
-                ),
-                master=True,
-            ),
-        ]
+    sheets_mock.record_clock_in.assert_called_once_with(
+        (
+            mock_clock_in_event_valid_key_datetimes["date"],
+            mock_clock_in_event_valid_key_datetimes["time"],
+        ),
+        mocker.ANY,
+        master=True,
     )
     sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_not_called()
     drive_mock.add_volunteer_to_slideshow.assert_called_once()
@@ -199,7 +215,7 @@ def test_handler_clock_in_valid_key_existing_volunteer_master_sheet_exsists_slac
     slack_mock.clock_in_slack_message.assert_called_once_with(
         "ASLDKFJ123KLAJSD",
     )
-    sheets_mock.add_clock_out_entry_to_timesheet.assert_not_called()
+    sheets_mock.record_clock_out.assert_not_called()
     drive_mock.remove_volunteer_from_slideshow.assert_not_called()
     slack_mock.clock_out_slack_message.assert_not_called()
 
@@ -232,9 +248,6 @@ def test_handler_clock_in_valid_key_existing_volunteer_master_sheet_exsists_slac
 
     sheets_mock = mocker.Mock()
     sheets_mock.check_master_log.return_value = True
-    sheets_mock.get_last_entry_datetime.return_value = datetime.now() - timedelta(
-        days=1
-    )
 
     mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
 
@@ -255,29 +268,20 @@ def test_handler_clock_in_valid_key_existing_volunteer_master_sheet_exsists_slac
     drive_mock.check_timesheet_exists.assert_called_once()
     drive_mock.create_timesheet.assert_not_called()
     sheets_mock.initialize_copied_template.assert_not_called()
-    sheets_mock.add_clock_in_entry_to_timesheet.assert_has_calls(
-        [
-            mocker.call(
-                (
-                    mock_clock_in_event_valid_key_datetimes["date"],
-                    mock_clock_in_event_valid_key_datetimes["time"],
-                )
-            ),
-            mocker.call(
-                (
-                    mock_clock_in_event_valid_key_datetimes["date"],
-                    mock_clock_in_event_valid_key_datetimes["time"],
-                ),
-                master=True,
-            ),
-        ]
+    sheets_mock.record_clock_in.assert_called_once_with(
+        (
+            mock_clock_in_event_valid_key_datetimes["date"],
+            mock_clock_in_event_valid_key_datetimes["time"],
+        ),
+        mocker.ANY,
+        master=True,
     )
     sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_not_called()
     drive_mock.add_volunteer_to_slideshow.assert_called_once()
     slack_mock.get_slack_user_id.assert_called_once()
     slack_mock.clock_in_slack_message.assert_called_once_with(None)
     assert "Slack user not found for: Joe Shmoe" in caplog.text
-    sheets_mock.add_clock_out_entry_to_timesheet.assert_not_called()
+    sheets_mock.record_clock_out.assert_not_called()
     drive_mock.remove_volunteer_from_slideshow.assert_not_called()
     slack_mock.clock_out_slack_message.assert_not_called()
 
@@ -310,9 +314,6 @@ def test_handler_clock_in_valid_key_existing_volunteer_master_sheet_not_exsists_
 
     sheets_mock = mocker.Mock()
     sheets_mock.check_master_log.return_value = False
-    sheets_mock.get_last_entry_datetime.return_value = datetime.now() - timedelta(
-        days=1
-    )
 
     mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
 
@@ -333,28 +334,19 @@ def test_handler_clock_in_valid_key_existing_volunteer_master_sheet_not_exsists_
     drive_mock.check_timesheet_exists.assert_called_once()
     drive_mock.create_timesheet.assert_not_called()
     sheets_mock.initialize_copied_template.assert_not_called()
-    sheets_mock.add_clock_in_entry_to_timesheet.assert_has_calls(
-        [
-            mocker.call(
-                (
-                    mock_clock_in_event_valid_key_datetimes["date"],
-                    mock_clock_in_event_valid_key_datetimes["time"],
-                )
-            ),
-            mocker.call(
-                (
-                    mock_clock_in_event_valid_key_datetimes["date"],
-                    mock_clock_in_event_valid_key_datetimes["time"],
-                ),
-                master=True,
-            ),
-        ]
+    sheets_mock.record_clock_in.assert_called_once_with(
+        (
+            mock_clock_in_event_valid_key_datetimes["date"],
+            mock_clock_in_event_valid_key_datetimes["time"],
+        ),
+        mocker.ANY,
+        master=True,
     )
     sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_called_once()
     drive_mock.add_volunteer_to_slideshow.assert_called_once()
     slack_mock.get_slack_user_id.assert_called_once()
     slack_mock.clock_in_slack_message.assert_called_once_with("123456")
-    sheets_mock.add_clock_out_entry_to_timesheet.assert_not_called()
+    sheets_mock.record_clock_out.assert_not_called()
     drive_mock.remove_volunteer_from_slideshow.assert_not_called()
     slack_mock.clock_out_slack_message.assert_not_called()
 
@@ -381,9 +373,6 @@ def test_handler_clock_in_valid_key_new_volunteer_master_sheet_not_exsists_slack
 
     sheets_mock = mocker.Mock()
     sheets_mock.check_master_log.return_value = False
-    sheets_mock.get_last_entry_datetime.return_value = datetime.now() - timedelta(
-        days=1
-    )
 
     mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
 
@@ -404,28 +393,19 @@ def test_handler_clock_in_valid_key_new_volunteer_master_sheet_not_exsists_slack
     drive_mock.check_timesheet_exists.assert_called_once()
     drive_mock.create_timesheet.assert_called_once()
     sheets_mock.initialize_copied_template.assert_called_once()
-    sheets_mock.add_clock_in_entry_to_timesheet.assert_has_calls(
-        [
-            mocker.call(
-                (
-                    mock_clock_in_event_valid_key_datetimes["date"],
-                    mock_clock_in_event_valid_key_datetimes["time"],
-                )
-            ),
-            mocker.call(
-                (
-                    mock_clock_in_event_valid_key_datetimes["date"],
-                    mock_clock_in_event_valid_key_datetimes["time"],
-                ),
-                master=True,
-            ),
-        ]
+    sheets_mock.record_clock_in.assert_called_once_with(
+        (
+            mock_clock_in_event_valid_key_datetimes["date"],
+            mock_clock_in_event_valid_key_datetimes["time"],
+        ),
+        mocker.ANY,
+        master=True,
     )
     sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_called_once()
     drive_mock.add_volunteer_to_slideshow.assert_called_once()
     slack_mock.get_slack_user_id.assert_called_once()
     slack_mock.clock_in_slack_message.assert_called_once_with("123456")
-    sheets_mock.add_clock_out_entry_to_timesheet.assert_not_called()
+    sheets_mock.record_clock_out.assert_not_called()
     drive_mock.remove_volunteer_from_slideshow.assert_not_called()
     slack_mock.clock_out_slack_message.assert_not_called()
 
@@ -458,9 +438,6 @@ def test_handler_clock_out_valid_key_existing_volunteer_master_sheet_exsists_sla
 
     sheets_mock = mocker.Mock()
     sheets_mock.check_master_log.return_value = True
-    sheets_mock.get_last_entry_datetime.return_value = datetime.now() - timedelta(
-        days=1
-    )
 
     mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
 
@@ -481,26 +458,56 @@ def test_handler_clock_out_valid_key_existing_volunteer_master_sheet_exsists_sla
     drive_mock.check_timesheet_exists.assert_called_once()
     drive_mock.create_timesheet.assert_not_called()
     sheets_mock.initialize_copied_template.assert_not_called()
-    sheets_mock.add_clock_out_entry_to_timesheet.assert_has_calls(
-        [
-            mocker.call(
-                mock_clock_out_event_valid_key_datetimes["time"],
-            ),
-            mocker.call(
-                mock_clock_out_event_valid_key_datetimes["time"],
-                master=True,
-            ),
-        ]
+    sheets_mock.record_clock_out.assert_called_once_with(
+        mock_clock_out_event_valid_key_datetimes["time"], mocker.ANY, master=True
     )
     sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_not_called()
     drive_mock.add_volunteer_to_slideshow.assert_not_called()
     slack_mock.get_slack_user_id.assert_called_once()
     slack_mock.clock_in_slack_message.assert_not_called()
-    sheets_mock.add_clock_in_entry_to_timesheet.assert_not_called()
+    sheets_mock.record_clock_in.assert_not_called()
     drive_mock.remove_volunteer_from_slideshow.assert_called_once()
     slack_mock.clock_out_slack_message.assert_called_once()
+    assert "HTTP client metrics" in caplog.text
+
+    assert result == {"statusCode": 200}
+
+
+def test_handler_clock_out_creates_missing_master_tab(
+    mock_clock_out_event_with_valid_key, mocker: MockerFixture
+):
+    mocker.patch("helpers.openpath_classes.getUser").return_value = {
+        "identity": {
+            "firstName": "Joe",
+            "lastName": "Shmoe",
+            "email": "test@testemail.com",
+        }
+    }
+    mocker.patch("lambda_function.DriveOperations")
+    mocker.patch("lambda_function.SlackOps")
+
+    sheets_mock = mocker.Mock()
+    sheets_mock.check_master_log.return_value = False
+    mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
+
+    result = handler(mock_clock_out_event_with_valid_key, None)
 
     assert result == {"statusCode": 200}
+    sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_called_once()
+    sheets_mock.record_clock_out.assert_called_once()
+
+
+def test_handler_retry_after_failure_is_processed(
+    mock_clock_in_event_with_valid_key, mocker: MockerFixture
+):
+    process_mock = mocker.patch("lambda_function.process_event")
+    process_mock.side_effect = [RuntimeError("Sheets unavailable"), {"statusCode": 200}]
+
+    with pytest.raises(RuntimeError):
+        handler(mock_clock_in_event_with_valid_key, None)
+
+    assert handler(mock_clock_in_event_with_valid_key, None) == {"statusCode": 200}
+    assert process_mock.call_count == 2
 
 
 def test_handler_clock_out_entry_within_2_minutes(
@@ -529,9 +536,6 @@ def test_handler_clock_out_entry_within_2_minutes(
 
     sheets_mock = mocker.Mock()
     sheets_mock.check_master_log.return_value = True
-    sheets_mock.get_last_entry_datetime.return_value = datetime.now() - timedelta(
-        minutes=1
-    )
 
     mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
 
@@ -541,24 +545,428 @@ def test_handler_clock_out_entry_within_2_minutes(
 
     mocker.patch("lambda_function.SlackOps").return_value = slack_mock
 
-    result = handler(mock_clock_out_event_with_valid_key, None)
+    handler(mock_clock_out_event_with_valid_key, None)
+
+    # Second press a minute later
+    body = json.loads(mock_clock_out_event_with_valid_key["body"])
+    body["timestamp"] += 60
+    result = handler({"body": json.dumps(body)}, None)
 
     assert (
-        f"Parsed event: {{'entryId': '{CLOCK_OUT_ENTRY_NAME}', 'timestamp': 1706630094, 'userId': 13804489}}"
+        f"Parsed event: {{'entryId': '{CLOCK_OUT_ENTRY_NAME}', 'timestamp': 1706630154, 'userId': 13804489}}"
         in caplog.text
     )
     assert "apiKey" not in caplog.text
-    assert "Volunteer: Joe Shmoe" in caplog.text
+    assert "Ignoring duplicate event" in caplog.text
     drive_mock.check_timesheet_exists.assert_called_once()
     drive_mock.create_timesheet.assert_not_called()
     sheets_mock.initialize_copied_template.assert_not_called()
-    sheets_mock.add_clock_out_entry_to_timesheet.assert_not_called()
+    sheets_mock.record_clock_out.assert_called_once()
     sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_not_called()
     drive_mock.add_volunteer_to_slideshow.assert_not_called()
-    slack_mock.get_slack_user_id.assert_not_called()
+    slack_mock.get_slack_user_id.assert_called_once()
     slack_mock.clock_in_slack_message.assert_not_called()
-    sheets_mock.add_clock_in_entry_to_timesheet.assert_not_called()
-    drive_mock.remove_volunteer_from_slideshow.assert_not_called()
-    slack_mock.clock_out_slack_message.assert_not_called()
+    sheets_mock.record_clock_in.assert_not_called()
+    drive_mock.remove_volunteer_from_slideshow.assert_called_once()
+    slack_mock.clock_out_slack_message.assert_called_once()
+
+    assert result == {"statusCode": 200}
+
+
+def test_handler_clock_in_failed_step_does_not_stop_others(
+    mock_clock_in_event_with_valid_key,
+    mocker: MockerFixture,
+    caplog,
+):
+    mocker.patch("helpers.openpath_classes.getUser").return_value = {
+        "identity": {
+            "firstName": "Joe",
+            "lastName": "Shmoe",
+            "email": "test@testemail.com",
+        }
+    }
+    drive_mock = mocker.Mock()
+    drive_mock.check_timesheet_exists.return_value = [{"id": "123"}]
+    drive_mock.add_volunteer_to_slideshow.side_effect = RuntimeError("Drive is down")
+
+    mocker.patch("lambda_function.DriveOperations").return_value = drive_mock
+
+    sheets_mock = mocker.Mock()
+    sheets_mock.check_master_log.return_value = True
+
+    mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
+
+    slack_mock = mocker.Mock()
+    slack_mock.get_slack_user_id.return_value = "123456"
+
+    mocker.patch("lambda_function.SlackOps").return_value = slack_mock
+
+    result = handler(mock_clock_in_event_with_valid_key, None)
+
+    assert "Step 'slideshow' failed: Drive is down" in caplog.text
+    sheets_mock.record_clock_in.assert_called_once()
+    slack_mock.clock_in_slack_message.assert_called_once_with("123456")
+
+    assert result == {"statusCode": 200}
+
+
+def test_handler_clock_in_reconciles_slideshow(
+    mock_clock_in_event_with_valid_key,
+    mocker: MockerFixture,
+    monkeypatch,
+):
+    monkeypatch.setenv("SLIDESHOW_MODE", "reconcile")
+    monkeypatch.setenv("CACHE_BACKEND", "dynamodb")
+    mocker.patch("helpers.slideshow.time.time", return_value=1706630094 + 60)
+    mocker.patch("helpers.openpath_classes.getUser").return_value = {
+        "identity": {
+            "firstName": "Joe",
+            "lastName": "Shmoe",
+            "email": "test@testemail.com",
+        }
+    }
+    drive_mock = mocker.Mock()
+    drive_mock.check_timesheet_exists.return_value = [{"id": "123"}]
+    mocker.patch("lambda_function.DriveOperations").return_value = drive_mock
+    mocker.patch("lambda_function.SheetsOperations").return_value = mocker.Mock()
+    mocker.patch("lambda_function.SlackOps").return_value = mocker.Mock()
+    reconcile_mock = mocker.patch("lambda_function.reconcile_slideshow")
+
+    result = handler(mock_clock_in_event_with_valid_key, None)
+
+    assert result == {"statusCode": 200}
+    reconcile_mock.assert_called_once_with(
+        mocker.ANY,
+        {"13804489": {"name": "Joe Shmoe", "since": 1706630094, "slideId": None}},
+    )
+    drive_mock.add_volunteer_to_slideshow.assert_not_called()
+
+
+def test_handler_clock_in_write_behind_journals_master_log(
+    mock_clock_in_event_with_valid_key,
+    mocker: MockerFixture,
+):
+    mocker.patch("helpers.openpath_classes.getUser").return_value = {
+        "identity": {
+            "firstName": "Joe",
+            "lastName": "Shmoe",
+            "email": "test@testemail.com",
+        }
+    }
+    journal = InMemoryQueue()
+    mocker.patch("lambda_function.get_master_journal").return_value = journal
+
+    drive_mock = mocker.Mock()
+    drive_mock.check_timesheet_exists.return_value = [{"id": "123"}]
+    mocker.patch("lambda_function.DriveOperations").return_value = drive_mock
+
+    sheets_mock = mocker.Mock()
+    mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
+    mocker.patch("lambda_function.SlackOps").return_value = mocker.Mock()
+
+    result = handler(mock_clock_in_event_with_valid_key, None)
+
+    sheets_mock.record_clock_in.assert_called_once_with(
+        mocker.ANY, mocker.ANY, master=False
+    )
+    sheets_mock.check_master_log.assert_not_called()
+    sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_not_called()
+
+    body = journal.receive()[0].body
+    assert body["id"] == "13804489:1706630094:in"
+    assert body["volunteer"] == "Joe Shmoe"
+    assert body["clockIn"] is True
+
+    assert result == {"statusCode": 200}
+
+
+def test_master_log_flush_handler_drains_journal(mocker: MockerFixture):
+    journal = InMemoryQueue()
+    journal.put({"id": "1:100:in"})
+    journal.put({"id": "1:200:out"})
+    mocker.patch("lambda_function.get_master_journal").return_value = journal
+    apply_mock = mocker.patch("lambda_function.apply_master_entries", return_value=2)
+
+    result = master_log_flush_handler({}, None)
+
+    assert result == {"flushed": 2}
+    assert [entry["id"] for entry in apply_mock.call_args.args[1]] == [
+        "1:100:in",
+        "1:200:out",
+    ]
+    assert len(journal) == 0
+
+
+def test_master_log_flush_handler_failure_leaves_journal(mocker: MockerFixture):
+    journal = InMemoryQueue()
+    journal.put({"id": "1:100:in"})
+    mocker.patch("lambda_function.get_master_journal").return_value = journal
+    mocker.patch(
+        "lambda_function.apply_master_entries",
+        side_effect=RuntimeError("Sheets is down"),
+    )
+
+    with pytest.raises(RuntimeError):
+        master_log_flush_handler({}, None)
+
+    assert len(journal) == 1
+
+
+def test_master_log_flush_handler_sqs_failure_reports_batch(mocker: MockerFixture):
+    mocker.patch(
+        "lambda_function.apply_master_entries",
+        side_effect=RuntimeError("Sheets is down"),
+    )
+    event = {
+        "Records": [
+            {"messageId": "a", "body": json.dumps({"id": "1:100:in"})},
+            {"messageId": "b", "body": json.dumps({"id": "1:200:out"})},
+        ]
+    }
+
+    result = master_log_flush_handler(event, None)
+
+    assert result == {
+        "batchItemFailures": [{"itemIdentifier": "a"}, {"itemIdentifier": "b"}]
+    }
+
+
+def test_handler_queued_mode_acknowledges_without_processing(
+    mock_clock_in_event_with_valid_key, mocker: MockerFixture
+):
+    queue = InMemoryQueue()
+    mocker.patch("lambda_function.get_event_queue").return_value = queue
+    process_mock = mocker.patch("lambda_function.process_event")
+
+    result = handler(mock_clock_in_event_with_valid_key, None)
 
     assert result == {"statusCode": 200}
+    process_mock.assert_not_called()
+    assert queue.receive()[0].body == {
+        "entryId": CLOCK_IN_ENTRY_NAME,
+        "timestamp": 1706630094,
+        "userId": 13804489,
+    }
+
+
+def test_handler_queued_mode_invalid_key_not_queued(
+    mock_clock_in_event_with_invalid_key, mocker: MockerFixture
+):
+    queue = InMemoryQueue()
+    mocker.patch("lambda_function.get_event_queue").return_value = queue
+
+    result = handler(mock_clock_in_event_with_invalid_key, None)
+
+    assert result == {"statusCode": 400}
+    assert len(queue) == 0
+
+
+def test_worker_handler_sqs_records(mocker: MockerFixture):
+    process_mock = mocker.patch("lambda_function.process_event")
+    process_mock.side_effect = [None, RuntimeError("Sheets is down")]
+
+    body = {"entryId": CLOCK_IN_ENTRY_NAME, "timestamp": 1706630094, "userId": 1}
+    event = {
+        "Records": [
+            {"messageId": "a", "body": json.dumps(body)},
+            {"messageId": "b", "body": json.dumps(body)},
+        ]
+    }
+
+    result = worker_handler(event, None)
+
+    assert result == {"batchItemFailures": [{"itemIdentifier": "b"}]}
+    assert process_mock.call_count == 2
+    assert process_mock.call_args.args[0].entry == CLOCK_IN_ENTRY_NAME
+
+
+def test_worker_handler_drains_queue(mocker: MockerFixture):
+    queue = InMemoryQueue()
+    mocker.patch("lambda_function.get_event_queue").return_value = queue
+    process_mock = mocker.patch("lambda_function.process_event")
+
+    for user_id in (1, 2):
+        queue.put(
+            {"entryId": CLOCK_IN_ENTRY_NAME, "timestamp": 1706630094, "userId": user_id}
+        )
+
+    result = worker_handler({}, None)
+
+    assert result == {"processed": 2}
+    assert [call.args[0].user_id for call in process_mock.call_args_list] == [1, 2]
+    assert len(queue) == 0
+
+
+def test_batch_handler_coalesces_writes(mocker: MockerFixture):
+    mocker.patch("helpers.openpath_classes.getUser").side_effect = lambda user_id: {
+        "identity": {
+            "firstName": "Volunteer",
+            "lastName": str(user_id),
+            "email": f"{user_id}@testemail.com",
+        }
+    }
+    drive_mock = mocker.Mock()
+    drive_mock.check_timesheet_exists.return_value = [{"id": "123"}]
+    mocker.patch("lambda_function.DriveOperations").return_value = drive_mock
+
+    sheets_mock = mocker.Mock()
+    sheets_mock.check_master_log.return_value = True
+    sheets_mock.volunteer_timesheet_id = "123"
+    sheets_mock.master_sheet_id = "master"
+    sheets_mock.range_prefix.side_effect = lambda master=False: (
+        "'Volunteer'" if master else "Sheet1"
+    )
+    mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
+
+    writer_mock = mocker.Mock()
+    mocker.patch("lambda_function.TimesheetBatchWriter").return_value = writer_mock
+
+    slack_mock = mocker.Mock()
+    slack_mock.get_slack_user_id.return_value = "123456"
+    mocker.patch("lambda_function.SlackOps").return_value = slack_mock
+
+    update_slideshows_mock = mocker.patch("lambda_function.update_slideshows")
+
+    events = [
+        {"entryId": CLOCK_IN_ENTRY_NAME, "timestamp": 1706630094, "userId": 1},
+        # Double press, ignored
+        {"entryId": CLOCK_IN_ENTRY_NAME, "timestamp": 1706630100, "userId": 1},
+        {"entryId": CLOCK_OUT_ENTRY_NAME, "timestamp": 1706630094, "userId": 2},
+        {"entryId": "Some other door", "timestamp": 1706630094, "userId": 3},
+    ]
+
+    result = batch_handler({"events": events}, None)
+
+    assert result == {"statusCode": 200, "processed": 2}
+    assert writer_mock.add_clock_in.call_count == 2
+    assert writer_mock.add_clock_out.call_count == 2
+    writer_mock.execute.assert_called_once()
+    update_slideshows_mock.assert_called_once_with(
+        [(drive_mock, True), (drive_mock, False)]
+    )
+    slack_mock.clock_in_slack_message.assert_called_once_with("123456")
+    slack_mock.clock_out_slack_message.assert_called_once_with("123456")
+    sheets_mock.record_clock_in.assert_not_called()
+
+
+def test_convert_hours_handler(mocker: MockerFixture):
+    shards_mock = mocker.patch("lambda_function.MasterLogShards")
+    shards_mock().all_spreadsheet_ids.return_value = {"": "master-log"}
+    mocker.patch("lambda_function.list_timesheets").return_value = [
+        {"id": "individual", "name": "ODV Timesheet - Joe Shmoe"}
+    ]
+    sheets_mock = mocker.patch("lambda_function.SheetsOperations")
+    sheets_mock().get_master_sheet_ids.return_value = {"Joe Shmoe": 1, "Jane Doe": 2}
+    sheets_mock().convert_hours_formulas.return_value = 3
+    sheets_mock.reset_mock()
+
+    result = convert_hours_handler({}, None)
+
+    assert result == {"converted": 9}
+    sheets_mock.assert_any_call(mocker.ANY, "Jane Doe", None, "master-log")
+    sheets_mock.assert_any_call(mocker.ANY, "Joe Shmoe", "individual")
+
+
+def test_volunteer_hours_handler(mocker: MockerFixture):
+    shards_mock = mocker.patch("lambda_function.MasterLogShards")
+    shards_mock().all_spreadsheet_ids.return_value = {
+        "": "master-log",
+        "2024": "shard-2024",
+    }
+    read_mock = mocker.patch("lambda_function.read_master_log")
+    read_mock.return_value = [
+        ["12/31/2024", "10:00 PM", "01:30 AM", ""],
+        ["01/02/2025", "09:00 AM", "11:00 AM"],
+        ["01/03/2025", "09:00 AM"],
+    ]
+
+    result = volunteer_hours_handler({"volunteer": "Joe Shmoe"}, None)
+
+    read_mock.assert_called_once_with(
+        mocker.ANY, ["master-log", "shard-2024"], "Joe Shmoe"
+    )
+    assert result == {
+        "statusCode": 200,
+        "volunteer": "Joe Shmoe",
+        "shifts": 2,
+        "hours": 5.5,
+    }
+
+
+def test_volunteer_hours_handler_requires_volunteer():
+    with pytest.raises(ValueError):
+        volunteer_hours_handler({}, None)
+
+
+def test_volunteer_index_refresh_handler_requires_shared_cache(monkeypatch):
+    monkeypatch.setenv("CACHE_BACKEND", "sqlite")
+
+    with pytest.raises(ValueError):
+        volunteer_index_refresh_handler({}, None)
+
+
+def test_slideshow_reconcile_handler_requires_mode(monkeypatch):
+    monkeypatch.delenv("SLIDESHOW_MODE", raising=False)
+
+    with pytest.raises(ValueError):
+        slideshow_reconcile_handler({}, None)
+
+
+def test_slideshow_reconcile_handler_requires_shared_cache(monkeypatch):
+    monkeypatch.setenv("SLIDESHOW_MODE", "reconcile")
+    monkeypatch.setenv("CACHE_BACKEND", "sqlite")
+
+    with pytest.raises(ValueError):
+        slideshow_reconcile_handler({}, None)
+
+
+def test_ensure_master_tab_skips_indexed_tab(mocker: MockerFixture):
+    sheets_mock = mocker.Mock(master_sheet_id="master", volunteer_name="Joe Shmoe")
+    update_volunteer_resources(
+        1, masterTabs={"master": {"title": "Joe Shmoe", "sheetId": 7}}
+    )
+
+    ensure_master_tab(sheets_mock, 1)
+
+    sheets_mock.check_master_log.assert_not_called()
+
+
+def test_ensure_master_tab_rechecks_renamed_volunteer(mocker: MockerFixture):
+    sheets_mock = mocker.Mock(master_sheet_id="master", volunteer_name="Joe Smith")
+    sheets_mock.check_master_log.return_value = False
+    sheets_mock.get_master_sheet_ids.return_value = {"Joe Shmoe": 7, "Joe Smith": 8}
+    update_volunteer_resources(
+        1, masterTabs={"master": {"title": "Joe Shmoe", "sheetId": 7}}
+    )
+
+    ensure_master_tab(sheets_mock, 1)
+
+    sheets_mock.create_odv_sheet_in_master_spreadsheet.assert_called_once()
+    assert get_volunteer_resources(1)["masterTabs"] == {
+        "master": {"title": "Joe Smith", "sheetId": 8}
+    }
+
+
+def test_handler_range_error_forgets_indexed_resources(
+    mock_clock_out_event_with_valid_key, mocker: MockerFixture
+):
+    mocker.patch("helpers.openpath_classes.getUser").return_value = {
+        "identity": {
+            "firstName": "Joe",
+            "lastName": "Shmoe",
+            "email": "test@testemail.com",
+        }
+    }
+    mocker.patch("lambda_function.DriveOperations")
+    mocker.patch("lambda_function.SlackOps")
+    sheets_mock = mocker.Mock()
+    sheets_mock.record_clock_out.side_effect = HttpError(
+        mocker.Mock(status=400), b"Unable to parse range: 'Joe Shmoe'!A3:C"
+    )
+    mocker.patch("lambda_function.SheetsOperations").return_value = sheets_mock
+    update_volunteer_resources(13804489, timesheetId="sheet")
+
+    with pytest.raises(HttpError):
+        handler(mock_clock_out_event_with_valid_key, None)
+
+    assert get_volunteer_resources(13804489) == {}
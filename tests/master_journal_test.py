@@ -0,0 +1,179 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import pytest
+from pytest_mock import MockerFixture
+
+from helpers.event_queue import InMemoryQueue
+from helpers.google_services import (
+    master_sheets,
+    row_pointers,
+    set_row_pointer,
+)
+from helpers.master_journal import (
+    applied_entries,
+    apply_master_entries,
+    get_master_journal,
+    journal_master_entry,
+    read_journal,
+)
+from helpers.openpath_classes import OpenpathEvent
+
+from config import MASTER_LOG_SPREADSHEET_ID
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    applied_entries.clear()
+    row_pointers.clear()
+    master_sheets.clear()
+    yield
+    applied_entries.clear()
+    row_pointers.clear()
+    master_sheets.clear()
+
+
+@pytest.fixture
+def sheets_service(mocker: MockerFixture):
+    service = mocker.MagicMock()
+    service.spreadsheets().get().execute.return_value = {
+        "sheets": [{"properties": {"sheetId": 1, "title": "Joe Shmoe"}}]
+    }
+    return service
+
+
+def entry(entry_id, timestamp, clock_in, log_entry, volunteer="Joe Shmoe"):
+    return {
+        "id": entry_id,
+        "volunteer": volunteer,
+        "userId": 1,
+        "timestamp": timestamp,
+        "clockIn": clock_in,
+        "entry": log_entry,
+    }
+
+
+def test_get_master_journal_local_backend_refused_in_lambda(monkeypatch):
+    monkeypatch.setenv("MASTER_LOG_JOURNAL_BACKEND", "sqlite")
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "odv-hours")
+
+    with pytest.raises(ValueError, match="local to one container"):
+        get_master_journal()
+
+
+def test_apply_master_entries_replay_on_other_container(sheets_service):
+    entries = [entry("1:100:in", 100, True, ["02/01/2024", "3:00 PM"])]
+    sheets_service.spreadsheets().values().batchGet().execute.return_value = {
+        "valueRanges": [{"values": [["title"], ["header"], ["02/01/2024", "3:00 PM"]]}]
+    }
+
+    # The entry was applied by another flusher, whose applied ids aren't seen here
+    assert apply_master_entries(sheets_service, entries) == 1
+
+    sheets_service.spreadsheets().values().batchUpdate.assert_not_called()
+
+
+def test_get_master_journal_unset(monkeypatch):
+    monkeypatch.delenv("MASTER_LOG_JOURNAL_BACKEND", raising=False)
+
+    assert get_master_journal() is None
+
+
+def test_journal_master_entry():
+    journal = InMemoryQueue()
+    op_event = OpenpathEvent("Clock In", 13804489, 1706630094)
+
+    journal_master_entry(
+        journal, "Joe Shmoe", op_event, ("01/30/2024", "9:54 AM"), clock_in=True
+    )
+
+    assert journal.receive()[0].body == {
+        "id": "13804489:1706630094:in",
+        "volunteer": "Joe Shmoe",
+        "userId": 13804489,
+        "timestamp": 1706630094,
+        "clockIn": True,
+        "entry": ["01/30/2024", "9:54 AM"],
+        "spreadsheetId": None,
+    }
+
+
+def test_read_journal_respects_max_entries():
+    journal = InMemoryQueue()
+    for i in range(25):
+        journal.put({"id": str(i)})
+
+    assert len(read_journal(journal, max_entries=12)) == 12
+    assert len(read_journal(journal)) == 13
+
+
+def test_apply_master_entries_orders_per_volunteer(sheets_service):
+    set_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Joe Shmoe'", 10)
+    sheets_service.spreadsheets().values().batchGet().execute.return_value = {
+        "valueRanges": [{"values": [["01/31/2024", "3:00 PM", "5:00 PM"]]}]
+    }
+
+    flushed = apply_master_entries(
+        sheets_service,
+        [
+            entry("1:200:out", 200, False, "5:00 PM"),
+            entry("1:100:in", 100, True, ["02/01/2024", "3:00 PM"]),
+        ],
+    )
+
+    assert flushed == 2
+    sheets_service.spreadsheets().values().batchUpdate.assert_called_once_with(
+        spreadsheetId=MASTER_LOG_SPREADSHEET_ID,
+        body={
+            "valueInputOption": "USER_ENTERED",
+            "data": [
+                {
+                    "range": "'Joe Shmoe'!A11:B11",
+                    "values": [["02/01/2024", "3:00 PM"]],
+                },
+                {
+                    "range": "'Joe Shmoe'!C11:D11",
+                    "values": [["5:00 PM", 0.08333333]],
+                },
+            ],
+        },
+        fields="totalUpdatedCells",
+    )
+
+
+def test_apply_master_entries_replay_is_skipped(sheets_service):
+    set_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Joe Shmoe'", 10)
+    entries = [entry("1:100:in", 100, True, ["02/01/2024", "3:00 PM"])]
+
+    assert apply_master_entries(sheets_service, entries) == 1
+    assert apply_master_entries(sheets_service, entries + entries) == 0
+
+    sheets_service.spreadsheets().values().batchUpdate.assert_called_once()
+
+
+def test_apply_master_entries_creates_missing_tab(sheets_service, mocker: MockerFixture):
+    create_mock = mocker.patch(
+        "helpers.master_journal.SheetsOperations.create_odv_sheet_in_master_spreadsheet"
+    )
+    set_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Jane Doe'", 2)
+
+    apply_master_entries(
+        sheets_service,
+        [
+            entry("2:100:in", 100, True, ["02/01/2024", "3:00 PM"], "Jane Doe"),
+            entry("2:200:out", 200, False, "5:00 PM", "Jane Doe"),
+        ],
+    )
+
+    create_mock.assert_called_once()
+
+
+def test_apply_master_entries_failure_is_not_marked_applied(sheets_service):
+    set_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Joe Shmoe'", 10)
+    batch_update = sheets_service.spreadsheets().values().batchUpdate
+    batch_update().execute.side_effect = RuntimeError("Sheets is down")
+    entries = [entry("1:100:in", 100, True, ["02/01/2024", "3:00 PM"])]
+
+    with pytest.raises(RuntimeError):
+        apply_master_entries(sheets_service, entries)
+
+    assert applied_entries.get("1:100:in") is None
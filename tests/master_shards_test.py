@@ -0,0 +1,284 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+from datetime import datetime
+
+import pytest
+from pytest_mock import MockerFixture
+from googleapiclient.errors import HttpError
+
+from helpers.master_shards import (
+    MasterLogShards,
+    has_open_shift,
+    open_shift_shards,
+    read_master_log,
+    shard_key,
+    shard_period,
+    shard_registry,
+)
+
+from config import MASTER_LOG_SPREADSHEET_ID
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    shard_registry.clear()
+    open_shift_shards.clear()
+    yield
+    shard_registry.clear()
+    open_shift_shards.clear()
+
+
+@pytest.fixture
+def drive_service(mocker: MockerFixture):
+    return mocker.MagicMock()
+
+
+def test_shard_key():
+    assert shard_key(datetime(2024, 1, 1), "year") == "2024"
+    assert shard_key(datetime(2024, 3, 31), "quarter") == "2024-Q1"
+    assert shard_key(datetime(2024, 4, 1), "quarter") == "2024-Q2"
+    assert shard_key(datetime(2024, 12, 31), "quarter") == "2024-Q4"
+
+
+def test_shard_period(monkeypatch):
+    monkeypatch.delenv("MASTER_LOG_SHARD_PERIOD", raising=False)
+    assert shard_period() is None
+
+    monkeypatch.setenv("MASTER_LOG_SHARD_PERIOD", "quarter")
+    assert shard_period() == "quarter"
+
+    monkeypatch.setenv("MASTER_LOG_SHARD_PERIOD", "month")
+    with pytest.raises(ValueError):
+        shard_period()
+
+
+def test_unsharded_uses_master_log(drive_service, monkeypatch):
+    monkeypatch.delenv("MASTER_LOG_SHARD_PERIOD", raising=False)
+    shards = MasterLogShards(drive_service)
+
+    assert (
+        shards.for_clock_event(1, datetime(2024, 1, 1), clock_in=True)
+        == MASTER_LOG_SPREADSHEET_ID
+    )
+    drive_service.files.assert_not_called()
+
+
+def test_existing_shard_is_found_and_cached(drive_service):
+    drive_service.files().list().execute.return_value = {"files": [{"id": "shard-2024"}]}
+    shards = MasterLogShards(drive_service, period="year")
+
+    assert shards.spreadsheet_id("2024") == "shard-2024"
+    assert shards.spreadsheet_id("2024") == "shard-2024"
+
+    assert "value='2024'" in drive_service.files().list.call_args.kwargs["q"]
+    assert drive_service.files().list().execute.call_count == 1
+    drive_service.files().copy.assert_not_called()
+
+
+def test_missing_shard_is_copied_from_template(
+    drive_service, monkeypatch, mocker: MockerFixture
+):
+    monkeypatch.setenv("MASTER_LOG_TEMPLATE_ID", "master-template")
+    drive_service.files().list().execute.side_effect = [
+        {"files": []},
+        {"files": [{"id": "shard-2024-Q2"}]},
+    ]
+    drive_service.files().copy().execute.return_value = {"id": "shard-2024-Q2"}
+    shards = MasterLogShards(drive_service, period="quarter")
+
+    assert shards.spreadsheet_id("2024-Q2") == "shard-2024-Q2"
+
+    drive_service.files().copy.assert_called_with(
+        fileId="master-template",
+        body={
+            "name": "ODV Master Log - 2024-Q2",
+            "parents": [mocker.ANY],
+            "appProperties": {"masterLogShard": "2024-Q2"},
+        },
+        fields="id",
+        supportsAllDrives=True,
+    )
+    drive_service.files().update.assert_not_called()
+
+
+def test_concurrently_created_shard_is_trashed(drive_service, monkeypatch):
+    monkeypatch.delenv("MASTER_LOG_TEMPLATE_ID", raising=False)
+    drive_service.files().list().execute.side_effect = [
+        {"files": []},
+        {"files": [{"id": "older"}, {"id": "ours"}]},
+    ]
+    drive_service.files().create().execute.return_value = {"id": "ours"}
+    shards = MasterLogShards(drive_service, period="year")
+
+    assert shards.spreadsheet_id("2024") == "older"
+
+    drive_service.files().update.assert_called_with(
+        fileId="ours", body={"trashed": True}, fields="id", supportsAllDrives=True
+    )
+
+
+def test_shared_registry_decides_concurrently_created_shard(
+    drive_service, monkeypatch
+):
+    monkeypatch.delenv("MASTER_LOG_TEMPLATE_ID", raising=False)
+    monkeypatch.setenv("CACHE_BACKEND", "dynamodb")
+    drive_service.files().create().execute.return_value = {"id": "ours"}
+    drive_service.files().list.reset_mock()
+    shards = MasterLogShards(drive_service, period="year")
+    # Another container registered its copy first
+    shard_registry.set("2024", "theirs", 60)
+
+    assert shards._create("2024") == "theirs"  # pylint: disable=protected-access
+
+    drive_service.files().list.assert_not_called()
+    drive_service.files().update.assert_called_with(
+        fileId="ours", body={"trashed": True}, fields="id", supportsAllDrives=True
+    )
+
+
+def test_shared_registry_keeps_first_registered_shard(drive_service, monkeypatch):
+    monkeypatch.delenv("MASTER_LOG_TEMPLATE_ID", raising=False)
+    monkeypatch.setenv("CACHE_BACKEND", "dynamodb")
+    drive_service.files().list().execute.return_value = {"files": []}
+    drive_service.files().create().execute.return_value = {"id": "ours"}
+    shards = MasterLogShards(drive_service, period="year")
+
+    assert shards.spreadsheet_id("2024") == "ours"
+
+    drive_service.files().update.assert_not_called()
+    assert shard_registry.get("2024") == "ours"
+
+
+def test_clock_out_uses_shard_of_clock_in(drive_service):
+    shards = MasterLogShards(drive_service, period="year")
+    shard_registry.set("2024", "shard-2024", 60)
+    shard_registry.set("2025", "shard-2025", 60)
+
+    clock_in = shards.for_clock_event(1, datetime(2024, 12, 31, 22), clock_in=True)
+    clock_out = shards.for_clock_event(1, datetime(2025, 1, 1, 1), clock_in=False)
+
+    assert clock_in == clock_out == "shard-2024"
+    assert (
+        shards.for_clock_event(1, datetime(2025, 1, 1, 2), clock_in=False)
+        == "shard-2025"
+    )
+
+
+@pytest.fixture
+def sheets_service(mocker: MockerFixture):
+    return mocker.MagicMock()
+
+
+def test_clock_out_on_other_container_checks_previous_shard(
+    drive_service, sheets_service
+):
+    shards = MasterLogShards(
+        drive_service, period="year", sheets_service=sheets_service
+    )
+    shard_registry.set("2024", "shard-2024", 60)
+    shard_registry.set("2025", "shard-2025", 60)
+    sheets_service.spreadsheets().values().get().execute.return_value = {
+        "values": [["12/31/2024", "10:00 PM"]]
+    }
+
+    clock_out = shards.for_clock_event(
+        1, datetime(2025, 1, 1, 1), clock_in=False, volunteer_name="Joe Shmoe"
+    )
+
+    assert clock_out == "shard-2024"
+    sheets_service.spreadsheets().values().get.assert_called_with(
+        spreadsheetId="shard-2024", range="'Joe Shmoe'!A3:C", fields="values"
+    )
+
+
+def test_clock_out_without_open_shift_uses_current_shard(
+    drive_service, sheets_service
+):
+    shards = MasterLogShards(
+        drive_service, period="year", sheets_service=sheets_service
+    )
+    shard_registry.set("2024", "shard-2024", 60)
+    shard_registry.set("2025", "shard-2025", 60)
+    sheets_service.spreadsheets().values().get().execute.return_value = {
+        "values": [["12/31/2024", "08:00 AM", "10:00 AM"]]
+    }
+
+    assert (
+        shards.for_clock_event(
+            1, datetime(2025, 1, 1, 1), clock_in=False, volunteer_name="Joe Shmoe"
+        )
+        == "shard-2025"
+    )
+
+
+def test_clock_out_later_in_period_skips_previous_shard(
+    drive_service, sheets_service
+):
+    shards = MasterLogShards(
+        drive_service, period="year", sheets_service=sheets_service
+    )
+    shard_registry.set("2025", "shard-2025", 60)
+
+    assert (
+        shards.for_clock_event(
+            1, datetime(2025, 1, 2, 2), clock_in=False, volunteer_name="Joe Shmoe"
+        )
+        == "shard-2025"
+    )
+    sheets_service.spreadsheets().values().get.assert_not_called()
+
+
+def test_has_open_shift(sheets_service, mocker: MockerFixture):
+    execute = sheets_service.spreadsheets().values().get().execute
+
+    execute.return_value = {"values": [["12/31/2024", "10:00 PM", ""]]}
+    assert has_open_shift(sheets_service, "shard-2024", "Joe Shmoe")
+
+    execute.return_value = {}
+    assert not has_open_shift(sheets_service, "shard-2024", "Joe Shmoe")
+
+    execute.side_effect = HttpError(mocker.Mock(status=400), b"Unable to parse range")
+    assert not has_open_shift(sheets_service, "shard-2024", "Joe Shmoe")
+
+
+def test_all_spreadsheet_ids(drive_service, caplog):
+    drive_service.files().list().execute.return_value = {
+        "files": [
+            {"id": "shard-2025", "appProperties": {"masterLogShard": "2025"}},
+            {"id": "shard-2024", "appProperties": {"masterLogShard": "2024"}},
+            {"id": "copy-2024", "appProperties": {"masterLogShard": "2024"}},
+            {"id": "unrelated"},
+        ]
+    }
+    shards = MasterLogShards(drive_service, period="year")
+
+    assert shards.all_spreadsheet_ids() == {
+        "": MASTER_LOG_SPREADSHEET_ID,
+        "2024": "shard-2024",
+        "2025": "shard-2025",
+    }
+    assert "Duplicate master log shard 2024: copy-2024" in caplog.text
+
+
+def test_read_master_log_fans_out_across_shards(mocker: MockerFixture):
+    def get(spreadsheetId, range, fields):  # pylint: disable=redefined-builtin,invalid-name
+        assert range == "'Joe Shmoe'!A3:D"
+        assert fields == "values"
+        request = mocker.Mock()
+        if spreadsheetId == "shard-2024":
+            request.execute.side_effect = HttpError(
+                mocker.Mock(status=400), b"Unable to parse range"
+            )
+        else:
+            request.execute.return_value = {"values": [[spreadsheetId]]}
+        return request
+
+    service = mocker.MagicMock()
+    service.spreadsheets().values().get.side_effect = get
+    mocker.patch("helpers.master_shards.get_service", return_value=service)
+
+    rows = read_master_log(
+        "creds", ["master-log", "shard-2024", "shard-2025"], "Joe Shmoe"
+    )
+
+    assert rows == [["master-log"], ["shard-2025"]]
@@ -5,9 +5,17 @@ Test Openpath dataclasses.
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+import pytest
 from pytest_mock import MockerFixture
 
-from helpers.openpath_classes import OpenpathEvent, OpenpathUser
+from helpers.openpath_classes import OpenpathEvent, OpenpathUser, user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
 
 
 def test_openpath_event():
@@ -56,3 +64,65 @@ def test_openpath_user(mocker: MockerFixture):
             "email": "test@testemail.com",
         }
     }
+
+
+def test_openpath_user_is_cached(mocker: MockerFixture):
+    """
+    Test OpenpathUser only calls the Openpath API once per user.
+    """
+
+    get_user = mocker.patch("helpers.openpath_classes.getUser")
+    get_user.return_value = {
+        "identity": {
+            "firstName": "Joe",
+            "lastName": "Shmoe",
+            "email": "test@testemail.com",
+        }
+    }
+
+    first = OpenpathUser(123)
+    second = OpenpathUser(123)
+
+    get_user.assert_called_once_with(123)
+    assert first.full_name == second.full_name == "Joe Shmoe"
+
+
+def test_openpath_user_cache_expires(mocker: MockerFixture):
+    """
+    Test OpenpathUser looks the user up again once the cache entry expires.
+    """
+
+    get_user = mocker.patch("helpers.openpath_classes.getUser")
+    get_user.return_value = {
+        "identity": {"firstName": "Joe", "lastName": "Shmoe", "email": "a@b.com"}
+    }
+    time_mock = mocker.patch("helpers.cache.time.time")
+    time_mock.return_value = 1000
+
+    OpenpathUser(123)
+
+    time_mock.return_value = 1000 + 24 * 60 * 60
+
+    OpenpathUser(123)
+
+    assert get_user.call_count == 2
+
+
+def test_openpath_user_from_directory_index(mocker: MockerFixture):
+    """
+    Test OpenpathUser uses the directory index without calling the Openpath API.
+    """
+
+    get_user = mocker.patch("helpers.openpath_classes.getUser")
+    mocker.patch("helpers.openpath_classes.directory.lookup").return_value = {
+        "identity": {
+            "firstName": "Jane",
+            "lastName": "Doe",
+            "email": "jane@testemail.com",
+        }
+    }
+
+    user = OpenpathUser(456)
+
+    get_user.assert_not_called()
+    assert user.full_name == "Jane Doe"
@@ -0,0 +1,163 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import json
+import datetime
+
+import pytest
+from pytest_mock import MockerFixture
+
+from helpers.openpath_directory import (
+    FULL_SYNC_INTERVAL,
+    DirectoryIndex,
+    load_index,
+    save_index,
+    sync_directory,
+)
+
+
+def make_user(user_id, modified_at, first_name="Joe"):
+    return {
+        "id": user_id,
+        "modifiedAt": modified_at,
+        "identity": {
+            "firstName": first_name,
+            "lastName": "Shmoe",
+            "email": f"{user_id}@testemail.com",
+        },
+        "groups": [{"id": 2}, {"id": 1}],
+    }
+
+
+@pytest.fixture
+def location(tmp_path):
+    return str(tmp_path / "directory.json")
+
+
+def test_full_sync_writes_index(location, mocker: MockerFixture):
+    mocker.patch("helpers.openpath_directory.PAGE_SIZE", 2)
+    list_users = mocker.patch("helpers.openpath_directory.listUsers")
+    list_users.side_effect = [
+        [make_user(1, "2024-01-01"), make_user(2, "2024-01-03")],
+        [make_user(3, "2024-01-02")],
+    ]
+
+    index = sync_directory(location)
+
+    assert list_users.call_count == 2
+    assert index["highWater"] == "2024-01-03"
+
+    with open(location, encoding="utf-8") as f:
+        saved = json.load(f)
+
+    assert saved["users"]["1"] == {
+        "firstName": "Joe",
+        "lastName": "Shmoe",
+        "email": "1@testemail.com",
+        "groups": [1, 2],
+        "modifiedAt": "2024-01-01",
+    }
+    assert set(saved["users"]) == {"1", "2", "3"}
+
+
+def test_incremental_sync_stops_at_unchanged_users(location, mocker: MockerFixture):
+    list_users = mocker.patch("helpers.openpath_directory.listUsers")
+    list_users.return_value = [make_user(1, "2024-01-01")]
+    sync_directory(location)
+
+    list_users.reset_mock()
+    list_users.return_value = [
+        make_user(2, "2024-02-01", first_name="Jane"),
+        make_user(1, "2024-01-01"),
+    ]
+
+    index = sync_directory(location)
+
+    list_users.assert_called_once_with(
+        offset=0, limit=1000, sort="modifiedAt", order="desc"
+    )
+    assert index["users"]["2"]["firstName"] == "Jane"
+    assert index["highWater"] == "2024-02-01"
+    assert set(index["users"]) == {"1", "2"}
+
+
+def test_incremental_sync_falls_back_to_full_scan(location, mocker: MockerFixture):
+    list_users = mocker.patch("helpers.openpath_directory.listUsers")
+    list_users.return_value = [make_user(1, "2024-01-01")]
+    sync_directory(location)
+
+    list_users.reset_mock()
+    list_users.side_effect = [ValueError("bad sort"), [make_user(1, "2024-01-01")]]
+
+    sync_directory(location)
+
+    assert list_users.call_args_list[-1] == mocker.call(offset=0, limit=1000)
+
+
+def test_incremental_sync_falls_back_when_not_sorted(
+    location, mocker: MockerFixture
+):
+    list_users = mocker.patch("helpers.openpath_directory.listUsers")
+    list_users.return_value = [make_user(1, "2024-01-01")]
+    sync_directory(location)
+
+    list_users.reset_mock()
+    list_users.return_value = [
+        make_user(2, "2024-02-01"),
+        make_user(1, "2024-01-01"),
+        make_user(3, "2024-03-01"),
+    ]
+
+    index = sync_directory(location)
+
+    assert list_users.call_args_list[-1] == mocker.call(offset=0, limit=1000)
+    assert set(index["users"]) == {"1", "2", "3"}
+
+
+def test_stale_index_gets_full_sync(location, mocker: MockerFixture):
+    list_users = mocker.patch("helpers.openpath_directory.listUsers")
+    list_users.return_value = [make_user(1, "2024-01-01"), make_user(2, "2024-01-01")]
+    sync_directory(location)
+
+    index = load_index(location)
+    full_synced_at = datetime.datetime.fromisoformat(index["fullSyncAt"])
+    index["fullSyncAt"] = (full_synced_at - FULL_SYNC_INTERVAL).isoformat()
+    save_index(index, location)
+
+    # User 2 was deleted in Openpath
+    list_users.reset_mock()
+    list_users.return_value = [make_user(1, "2024-01-01")]
+
+    index = sync_directory(location)
+
+    list_users.assert_called_once_with(offset=0, limit=1000)
+    assert set(index["users"]) == {"1"}
+    assert datetime.datetime.fromisoformat(index["fullSyncAt"]) > full_synced_at
+
+
+def test_incremental_sync_keeps_full_sync_time(location, mocker: MockerFixture):
+    list_users = mocker.patch("helpers.openpath_directory.listUsers")
+    list_users.return_value = [make_user(1, "2024-01-01")]
+    full_synced_at = sync_directory(location)["fullSyncAt"]
+
+    assert sync_directory(location)["fullSyncAt"] == full_synced_at
+
+
+def test_directory_index_lookup(location, mocker: MockerFixture):
+    mocker.patch("helpers.openpath_directory.listUsers").return_value = [
+        make_user(1, "2024-01-01")
+    ]
+    sync_directory(location)
+
+    directory = DirectoryIndex(location)
+
+    assert directory.lookup(1)["identity"] == {
+        "firstName": "Joe",
+        "lastName": "Shmoe",
+        "email": "1@testemail.com",
+    }
+    assert directory.lookup(2) is None
+
+
+def test_directory_index_missing_file(location):
+    assert DirectoryIndex(location).lookup(1) is None
+    assert DirectoryIndex(None).lookup(1) is None
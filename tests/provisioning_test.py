@@ -0,0 +1,149 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import pytest
+from pytest_mock import MockerFixture
+from googleapiclient.errors import HttpError
+
+import helpers.provisioning
+from helpers.google_services import master_sheets
+from helpers.provisioning import TimesheetPool, fill_master_tab_pool
+
+from config import MASTER_LOG_SPREADSHEET_ID
+
+
+@pytest.fixture(autouse=True)
+def clear_pool(monkeypatch):
+    monkeypatch.setattr(helpers.provisioning, "_available_timesheets", None)
+    monkeypatch.setattr(helpers.provisioning, "_pool_empty_until", 0.0)
+    monkeypatch.setenv("PROVISION_POOL_SIZE", "3")
+    master_sheets.clear()
+    yield
+    master_sheets.clear()
+
+
+@pytest.fixture
+def drive_service(mocker: MockerFixture):
+    return mocker.MagicMock()
+
+
+@pytest.fixture
+def sheets_service(mocker: MockerFixture):
+    return mocker.MagicMock()
+
+
+def test_claim_renames_and_names_in_one_call(drive_service, sheets_service):
+    drive_service.files().list().execute.return_value = {
+        "files": [{"id": "pooled", "appProperties": {"odvPoolSheetId": "42"}}]
+    }
+
+    timesheet_id = TimesheetPool(drive_service, sheets_service).claim("Joe Shmoe")
+
+    assert timesheet_id == "pooled"
+    batch_update = sheets_service.spreadsheets().batchUpdate
+    batch_update.assert_called_once()
+    assert batch_update.call_args.kwargs["spreadsheetId"] == "pooled"
+    requests = batch_update.call_args.kwargs["body"]["requests"]
+    assert requests[0]["addNamedRange"]["namedRange"]["name"] == "Claimed"
+    assert requests[1]["updateSpreadsheetProperties"]["properties"] == {
+        "title": "ODV Timesheet - Joe Shmoe"
+    }
+    assert requests[2]["updateCells"]["start"] == {
+        "sheetId": 42,
+        "rowIndex": 0,
+        "columnIndex": 5,
+    }
+    assert (
+        requests[2]["updateCells"]["rows"][0]["values"][0]["userEnteredValue"]
+        == {"stringValue": "Name: Joe Shmoe"}
+    )
+
+
+def test_claim_skips_timesheet_claimed_elsewhere(
+    drive_service, sheets_service, mocker: MockerFixture
+):
+    drive_service.files().list().execute.return_value = {
+        "files": [{"id": "first"}, {"id": "second"}]
+    }
+    sheets_service.spreadsheets().batchUpdate().execute.side_effect = [
+        HttpError(mocker.Mock(status=400), b"Named range already exists"),
+        {},
+    ]
+
+    timesheet_id = TimesheetPool(drive_service, sheets_service).claim("Joe Shmoe")
+
+    assert timesheet_id in ["first", "second"]
+
+
+def test_claim_empty_pool(drive_service, sheets_service):
+    drive_service.files().list().execute.return_value = {"files": []}
+
+    assert TimesheetPool(drive_service, sheets_service).claim("Joe Shmoe") is None
+    sheets_service.spreadsheets().batchUpdate.assert_not_called()
+
+
+def test_empty_pool_is_not_listed_again(
+    drive_service, sheets_service, mocker: MockerFixture
+):
+    time_mock = mocker.patch("helpers.provisioning.time.time", return_value=1000)
+    drive_service.files().list().execute.return_value = {"files": []}
+    drive_service.files().list.reset_mock()
+    pool = TimesheetPool(drive_service, sheets_service)
+
+    assert pool.claim("Joe Shmoe") is None
+    assert pool.claim("Jane Doe") is None
+    assert drive_service.files().list.call_count == 1
+
+    time_mock.return_value = 1000 + helpers.provisioning.POOL_EMPTY_TTL
+    assert pool.claim("Jane Doe") is None
+    assert drive_service.files().list.call_count == 2
+
+
+def test_claim_skipped_when_pool_is_off(drive_service, sheets_service, monkeypatch):
+    monkeypatch.delenv("PROVISION_POOL_SIZE")
+
+    assert TimesheetPool(drive_service, sheets_service).claim("Joe Shmoe") is None
+    drive_service.files().list.assert_not_called()
+
+
+def test_fill_provisions_missing_timesheets(
+    drive_service, sheets_service, mocker: MockerFixture
+):
+    drive_service.files().list().execute.return_value = {"files": [{"id": "pooled"}]}
+    drive_service.files().copy().execute.return_value = {"id": "new"}
+    initialize_mock = mocker.patch(
+        "helpers.provisioning.SheetsOperations.initialize_copied_template",
+        return_value=42,
+    )
+
+    assert TimesheetPool(drive_service, sheets_service).fill(3) == 2
+
+    assert initialize_mock.call_count == 2
+    drive_service.files().update.assert_called_with(
+        fileId="new",
+        body={"appProperties": {"odvPoolSheetId": "42"}},
+        fields="id",
+        supportsAllDrives=True,
+    )
+
+
+def test_fill_master_tab_pool(sheets_service, mocker: MockerFixture):
+    sheets_service.spreadsheets().get().execute.return_value = {
+        "sheets": [
+            {"properties": {"sheetId": 1, "title": "Joe Shmoe"}},
+            {"properties": {"sheetId": 2, "title": "Pool abcd1234"}},
+        ]
+    }
+    sheets_service.spreadsheets().batchUpdate().execute.return_value = {
+        "replies": [{"addSheet": {"properties": {"sheetId": 3}}}]
+    }
+    format_mock = mocker.patch(
+        "helpers.provisioning.SheetsOperations.batch_update_new_master_sheet"
+    )
+
+    assert fill_master_tab_pool(sheets_service, MASTER_LOG_SPREADSHEET_ID, 2) == 1
+
+    format_mock.assert_called_once_with(MASTER_LOG_SPREADSHEET_ID, 3, "")
+    add_sheet = sheets_service.spreadsheets().batchUpdate.call_args_list[-1]
+    properties = add_sheet.kwargs["body"]["requests"][0]["addSheet"]["properties"]
+    assert properties["hidden"] is True
+    assert properties["title"].startswith("Pool ")
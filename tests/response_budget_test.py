@@ -0,0 +1,312 @@
+# pylint: disable=missing-docstring, redefined-outer-name, protected-access
+"""
+Response size budgets for the Google calls made while handling a clock event.
+
+The clients are real, built from the bundled discovery documents, and talk to a
+fake transport that returns full resources trimmed by the request's fields
+mask, like the APIs do. A call that loses its mask, or asks for more fields,
+goes over its budget.
+"""
+
+import json
+import re
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+import pytest
+from pytest_mock import MockerFixture
+
+from helpers import google_services
+from helpers.google_services import (
+    DriveOperations,
+    SheetsOperations,
+    TimesheetBatchWriter,
+    get_service,
+    reset_response_stats,
+    response_stats,
+    folder_ids,
+    master_sheets,
+    row_pointers,
+)
+
+# Largest expected response body, in bytes, of each hot-path call
+BUDGETS = {
+    "drive.files.list": 120,
+    "drive.files.copy": 40,
+    "drive.files.update": 40,
+    "sheets.spreadsheets.get": 200,
+    "sheets.spreadsheets.batchUpdate": 60,
+    "sheets.spreadsheets.values.append": 80,
+    "sheets.spreadsheets.values.batchGet": 80,
+    "sheets.spreadsheets.values.batchUpdate": 40,
+}
+
+FULL_FILE = {
+    "kind": "drive#file",
+    "id": "file-1",
+    "name": "ODV Timesheet - Joe Shmoe",
+    "mimeType": "application/vnd.google-apps.spreadsheet",
+    "parents": ["parent-folder"],
+    "appProperties": {"opUserId": "1"},
+    "starred": False,
+    "trashed": False,
+    "createdTime": "2024-01-02T15:04:05.000Z",
+    "modifiedTime": "2024-02-01T15:04:05.000Z",
+    "webViewLink": "https://docs.google.com/spreadsheets/d/file-1/edit",
+    "iconLink": "https://drive-thirdparty.googleusercontent.com/16/type/sheet",
+    "driveId": "on-duty-drive",
+    "capabilities": {
+        "canEdit": True,
+        "canCopy": True,
+        "canComment": True,
+        "canShare": True,
+        "canTrash": True,
+        "canRename": True,
+    },
+}
+
+FULL_SHEET = {
+    "properties": {
+        "sheetId": 12345,
+        "title": "Joe Shmoe",
+        "index": 0,
+        "sheetType": "GRID",
+        "gridProperties": {"rowCount": 1000, "columnCount": 26, "frozenRowCount": 2},
+    },
+    "protectedRanges": [
+        {
+            "protectedRangeId": 678,
+            "range": {"sheetId": 12345, "startRowIndex": 0, "endRowIndex": 2},
+            "description": "Header rows",
+            "warningOnly": False,
+            "requestingUserCanEdit": True,
+            "editors": {
+                "users": ["membership@asmbly.org", "leadership@asmbly.org"],
+                "groups": ["classes@asmbly.org"],
+            },
+        }
+    ],
+    "conditionalFormats": [
+        {
+            "ranges": [{"sheetId": 12345, "startColumnIndex": 3, "endColumnIndex": 4}],
+            "booleanRule": {
+                "condition": {
+                    "type": "NUMBER_GREATER",
+                    "values": [{"userEnteredValue": "1"}],
+                },
+                "format": {"backgroundColor": {"red": 1, "green": 0.8, "blue": 0.8}},
+            },
+        }
+    ],
+}
+
+FULL_SPREADSHEET = {
+    "spreadsheetId": "spreadsheet",
+    "properties": {
+        "title": "ODV Master Log",
+        "locale": "en_US",
+        "autoRecalc": "ON_CHANGE",
+        "timeZone": "America/Chicago",
+        "defaultFormat": {"backgroundColor": {"red": 1, "green": 1, "blue": 1}},
+    },
+    "sheets": [FULL_SHEET, FULL_SHEET],
+    "spreadsheetUrl": "https://docs.google.com/spreadsheets/d/spreadsheet/edit",
+}
+
+UPDATED = {
+    "spreadsheetId": "spreadsheet",
+    "updatedRange": "Sheet1!A7:B7",
+    "updatedRows": 1,
+    "updatedColumns": 2,
+    "updatedCells": 2,
+}
+
+# (HTTP method, URL path pattern) -> full response
+ROUTES = [
+    ("GET", r"/drive/v3/files$", {"kind": "drive#fileList", "files": [FULL_FILE]}),
+    ("POST", r"/drive/v3/files/[^/]+/copy$", FULL_FILE),
+    ("PATCH", r"/drive/v3/files/[^/]+$", FULL_FILE),
+    ("GET", r"/v4/spreadsheets/[^/:]+$", FULL_SPREADSHEET),
+    (
+        "POST",
+        r"/v4/spreadsheets/[^/]+:batchUpdate$",
+        {"spreadsheetId": "spreadsheet", "replies": [{}, {}, {}, {}]},
+    ),
+    (
+        "POST",
+        r"/values/[^/]+:append$",
+        {
+            "spreadsheetId": "spreadsheet",
+            "tableRange": "Sheet1!A1:D6",
+            "updates": UPDATED,
+        },
+    ),
+    (
+        "GET",
+        r"/values:batchGet$",
+        {
+            "spreadsheetId": "spreadsheet",
+            "valueRanges": [
+                {
+                    "range": "Sheet1!A7:B7",
+                    "majorDimension": "ROWS",
+                    "values": [["02/01/2024", "3:00 PM"]],
+                }
+            ],
+        },
+    ),
+    (
+        "POST",
+        r"/values:batchUpdate$",
+        {
+            "spreadsheetId": "spreadsheet",
+            "totalUpdatedRows": 1,
+            "totalUpdatedColumns": 2,
+            "totalUpdatedCells": 2,
+            "totalUpdatedSheets": 1,
+            "responses": [UPDATED],
+        },
+    ),
+]
+
+
+def parse_mask(fields: str) -> dict:
+    """Parse a fields mask, e.g. "files(id, name),nextPageToken", into a tree."""
+    tree = {}
+    stack = [tree]
+    path = ""
+
+    def add_path():
+        node = stack[-1]
+        names = [name for name in re.split(r"[./]", path.strip()) if name]
+        for name in names[:-1]:
+            node = node.setdefault(name, {})
+        if names:
+            node.setdefault(names[-1], {})
+        return node.get(names[-1]) if names else None
+
+    for char in fields:
+        if char == "(":
+            stack.append(add_path())
+            path = ""
+        elif char == ")":
+            add_path()
+            stack.pop()
+            path = ""
+        elif char == ",":
+            add_path()
+            path = ""
+        else:
+            path += char
+    add_path()
+
+    return tree
+
+
+def apply_mask(value, mask: dict):
+    if not mask:
+        return value
+    if isinstance(value, list):
+        return [apply_mask(item, mask) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: apply_mask(value[key], mask[key]) for key in mask if key in value}
+
+
+class FakeHttp:
+    """Transport answering with full resources trimmed by the fields mask."""
+
+    def request(self, uri, method="GET", **_kwargs):
+        url = urlparse(uri)
+        for route_method, pattern, response in ROUTES:
+            if method == route_method and re.search(pattern, url.path):
+                fields = parse_qs(url.query).get("fields")
+                if fields:
+                    response = apply_mask(response, parse_mask(fields[0]))
+                return (
+                    httplib2.Response({"status": "200"}),
+                    json.dumps(response).encode(),
+                )
+
+        raise AssertionError(f"Unexpected request: {method} {uri}")
+
+
+@pytest.fixture(autouse=True)
+def fake_transport(mocker: MockerFixture):
+    mocker.patch("helpers.google_services.httplib2.Http", return_value=FakeHttp())
+    google_services._service_cache.__dict__.clear()
+    for store in (folder_ids, master_sheets, row_pointers):
+        store.clear()
+    reset_response_stats()
+    yield
+    google_services._service_cache.__dict__.clear()
+    for store in (folder_ids, master_sheets, row_pointers):
+        store.clear()
+
+
+@pytest.fixture
+def credentials(mocker: MockerFixture):
+    return mocker.Mock(universe_domain="googleapis.com")
+
+
+@pytest.fixture
+def drive_service(credentials):
+    return get_service("drive", "v3", credentials)
+
+
+@pytest.fixture
+def sheets_service(credentials):
+    return get_service("sheets", "v4", credentials)
+
+
+def assert_within_budgets():
+    stats = response_stats()
+    assert stats
+    for method_id, method_stats in stats.items():
+        assert method_stats["maxBytes"] <= BUDGETS[method_id], (
+            f"{method_id} returned {method_stats['maxBytes']} bytes, "
+            f"over its budget of {BUDGETS[method_id]}"
+        )
+
+
+def test_drive_calls_within_budget(drive_service, mocker: MockerFixture):
+    mocker.patch.object(DriveOperations, "slideshow_folder_id", new="lobby")
+    mocker.patch.object(DriveOperations, "volunteer_slides_folder_id", new="slides")
+    drive_ops = DriveOperations(drive_service, "Joe Shmoe", user_id=1)
+
+    drive_ops.check_timesheet_exists()
+    drive_ops.add_volunteer_to_slideshow()
+    drive_ops.remove_volunteer_from_slideshow()
+    drive_ops.create_timesheet()
+    DriveOperations(drive_service, "Joe Shmoe").slide_search(
+        "drive", "Joe Shmoe", "lobby"
+    )
+
+    assert set(response_stats()) == {
+        "drive.files.list",
+        "drive.files.copy",
+        "drive.files.update",
+    }
+    assert_within_budgets()
+
+
+def test_sheets_calls_within_budget(sheets_service):
+    sheets_ops = SheetsOperations(sheets_service, "Joe Shmoe", "timesheet", "master")
+
+    sheets_ops.get_master_sheet_ids(refresh=True)
+    sheets_ops.initialize_copied_template()
+    sheets_ops.record_clock_in(("02/01/2024", "3:00 PM"), master=False)
+
+    writer = TimesheetBatchWriter(sheets_service)
+    writer.add_clock_out("master", "'Joe Shmoe'", "5:00 PM")
+    writer.execute()
+
+    assert "sheets.spreadsheets.values.batchGet" in response_stats()
+    assert_within_budgets()
+
+
+def test_unmasked_call_goes_over_budget(sheets_service):
+    sheets_service.spreadsheets().get(spreadsheetId="master").execute()
+
+    with pytest.raises(AssertionError, match="over its budget"):
+        assert_within_budgets()
@@ -3,11 +3,28 @@
 import pytest
 from pytest_mock import MockerFixture
 
-from helpers.google_services import SheetsOperations
+from helpers.google_services import (
+    SheetsOperations,
+    TimesheetBatchWriter,
+    get_row_pointer,
+    set_row_pointer,
+    shift_hours,
+    row_pointers,
+    master_sheets,
+)
 
 from config import MASTER_LOG_SPREADSHEET_ID, PRIV_SA
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    row_pointers.clear()
+    master_sheets.clear()
+    yield
+    row_pointers.clear()
+    master_sheets.clear()
+
+
 class TestSheetsOperations:
     @pytest.fixture
     def mock_instance(self, mocker: MockerFixture):
@@ -17,14 +34,6 @@ class TestSheetsOperations:
 
         return mock_instance
 
-    @pytest.fixture
-    def mock_clock_in_entry(self):
-        return ("02/01/2024", "3:00 PM")
-
-    @pytest.fixture
-    def mock_clock_out_entry(self):
-        return "5:00 PM"
-
     def test_init(self, mock_instance):
         assert mock_instance.volunteer_name == "Test Volunteer Name"
         assert mock_instance.volunteer_timesheet_id == "12345678"
@@ -80,6 +89,7 @@ class TestSheetsOperations:
                 ]
             },
             valueInputOption="USER_ENTERED",
+            fields="updates.updatedRange",
         )
 
         mock_instance.batch_update_copied_spreadsheet.assert_called_with(
@@ -88,170 +98,6 @@ class TestSheetsOperations:
             678,
         )
 
-    def test_clock_in_master_sheet(self, mock_instance, mock_clock_in_entry):
-        mock_instance.add_clock_in_entry_to_timesheet(mock_clock_in_entry, master=True)
-
-        mock_instance.sheet.values().append.assert_called_with(
-            spreadsheetId=mock_instance.master_sheet_id,
-            range=f"'{mock_instance.volunteer_name}'!A3:B",
-            body={"values": [[mock_clock_in_entry[0], mock_clock_in_entry[1]]]},
-            valueInputOption="USER_ENTERED",
-        )
-
-    def test_clock_in_individual_sheet(self, mock_instance, mock_clock_in_entry):
-        mock_instance.add_clock_in_entry_to_timesheet(mock_clock_in_entry)
-
-        mock_instance.sheet.values().append.assert_called_with(
-            spreadsheetId=mock_instance.volunteer_timesheet_id,
-            range="Sheet1!A3:B",
-            body={"values": [[mock_clock_in_entry[0], mock_clock_in_entry[1]]]},
-            valueInputOption="USER_ENTERED",
-        )
-
-    def test_clock_out_master_sheet_gt_2_rows(
-        self, mock_instance, mock_clock_out_entry, mocker: MockerFixture
-    ):
-        new_value = {
-            "values": [
-                ["ODV Timesheet - Test Volunteer Name"],
-                ["Date", "Time"],
-                ["02/01/2024", "3:00 PM"],
-                ["02/01/2024", "5:00 PM"],
-                ["02/01/2024", "7:00 PM"],
-            ]
-        }
-
-        m = mocker.MagicMock()
-        m.values().get().execute.return_value = new_value
-
-        mocker.patch.object(
-            mock_instance,
-            "sheet",
-            new=m,
-        )
-
-        mock_instance.add_clock_out_entry_to_timesheet(
-            mock_clock_out_entry, master=True
-        )
-
-        m.values().update.assert_called_with(
-            spreadsheetId=mock_instance.master_sheet_id,
-            range=f"'{mock_instance.volunteer_name}'!C5:D5",
-            body={
-                "values": [
-                    [
-                        mock_clock_out_entry,
-                        "=IF(C5-B5>0, C5-B5, 1 + (C5-B5))",
-                    ]
-                ]
-            },
-            valueInputOption="USER_ENTERED",
-        )
-
-    def test_clock_out_ind_sheet_gt_2_rows(
-        self, mock_instance, mock_clock_out_entry, mocker: MockerFixture
-    ):
-        new_value = {
-            "values": [
-                ["ODV Timesheet - Test Volunteer Name"],
-                ["Date", "Time"],
-                ["02/01/2024", "3:00 PM"],
-                ["02/01/2024", "5:00 PM"],
-                ["02/01/2024", "7:00 PM"],
-            ]
-        }
-
-        m = mocker.MagicMock()
-        m.values().get().execute.return_value = new_value
-
-        mocker.patch.object(
-            mock_instance,
-            "sheet",
-            new=m,
-        )
-
-        mock_instance.add_clock_out_entry_to_timesheet(mock_clock_out_entry)
-
-        m.values().update.assert_called_with(
-            spreadsheetId=mock_instance.volunteer_timesheet_id,
-            range="Sheet1!C5:D5",
-            body={
-                "values": [
-                    [
-                        mock_clock_out_entry,
-                        "=IF(C5-B5>0, C5-B5, 1 + (C5-B5))",
-                    ]
-                ]
-            },
-            valueInputOption="USER_ENTERED",
-        )
-
-    def test_clock_out_master_sheet_lt_2_rows(
-        self, mock_instance, mock_clock_out_entry, mocker: MockerFixture
-    ):
-        new_value = {
-            "values": [["ODV Timesheet - Test Volunteer Name"], ["Date", "Time"]]
-        }
-
-        m = mocker.MagicMock()
-        m.values().get().execute.return_value = new_value
-
-        mocker.patch.object(
-            mock_instance,
-            "sheet",
-            new=m,
-        )
-
-        mock_instance.add_clock_out_entry_to_timesheet(
-            mock_clock_out_entry, master=True
-        )
-
-        m.values().update.assert_called_with(
-            spreadsheetId=mock_instance.master_sheet_id,
-            range=f"'{mock_instance.volunteer_name}'!C3:D3",
-            body={
-                "values": [
-                    [
-                        mock_clock_out_entry,
-                        "=IF(C3-B3>0, C3-B3, 1 + (C3-B3))",
-                    ]
-                ]
-            },
-            valueInputOption="USER_ENTERED",
-        )
-
-    def test_clock_out_ind_sheet_lt_2_rows(
-        self, mock_instance, mock_clock_out_entry, mocker: MockerFixture
-    ):
-        new_value = {
-            "values": [["ODV Timesheet - Test Volunteer Name"], ["Date", "Time"]]
-        }
-
-        m = mocker.MagicMock()
-        m.values().get().execute.return_value = new_value
-
-        mocker.patch.object(
-            mock_instance,
-            "sheet",
-            new=m,
-        )
-
-        mock_instance.add_clock_out_entry_to_timesheet(mock_clock_out_entry)
-
-        m.values().update.assert_called_with(
-            spreadsheetId=mock_instance.volunteer_timesheet_id,
-            range="Sheet1!C3:D3",
-            body={
-                "values": [
-                    [
-                        mock_clock_out_entry,
-                        "=IF(C3-B3>0, C3-B3, 1 + (C3-B3))",
-                    ]
-                ]
-            },
-            valueInputOption="USER_ENTERED",
-        )
-
     def test_check_master_log_with_volunteer_sheet(
         self, mock_instance, mocker: MockerFixture
     ):
@@ -294,6 +140,105 @@ class TestSheetsOperations:
 
         assert mock_instance.check_master_log() is False
 
+    def test_get_all_sheets_uses_fields_mask(self, mock_instance):
+        mock_instance.get_all_sheets()
+
+        mock_instance.sheet.get.assert_called_with(
+            spreadsheetId=mock_instance.master_sheet_id,
+            fields="sheets.properties(sheetId,title)",
+        )
+
+    def test_create_master_tab_claims_pooled_tab(
+        self, mock_instance, mocker: MockerFixture
+    ):
+        mocker.patch.object(mock_instance, "sheet", new=mocker.MagicMock())
+        master_sheets.set(
+            mock_instance.master_sheet_id, {"Jane Doe": 1, "Pool abcd1234": 7}, 60
+        )
+
+        mock_instance.create_odv_sheet_in_master_spreadsheet()
+
+        requests = mock_instance.sheet.batchUpdate.call_args.kwargs["body"]["requests"]
+        assert requests[0]["addNamedRange"]["namedRange"]["name"] == "Claimed_7"
+        assert requests[1]["updateSheetProperties"]["properties"] == {
+            "sheetId": 7,
+            "title": "Test Volunteer Name",
+            "hidden": False,
+        }
+        mock_instance.sheet.batchUpdate.assert_called_once()
+        assert master_sheets.get(mock_instance.master_sheet_id) == {
+            "Jane Doe": 1,
+            "Test Volunteer Name": 7,
+        }
+
+    def test_create_master_tab_without_pool_adds_sheet(
+        self, mock_instance, mocker: MockerFixture
+    ):
+        mocker.patch.object(mock_instance, "sheet", new=mocker.MagicMock())
+        mocker.patch.object(mock_instance, "batch_update_new_master_sheet")
+        master_sheets.set(mock_instance.master_sheet_id, {"Jane Doe": 1}, 60)
+
+        mock_instance.create_odv_sheet_in_master_spreadsheet()
+
+        requests = mock_instance.sheet.batchUpdate.call_args.kwargs["body"]["requests"]
+        assert requests == [
+            {"addSheet": {"properties": {"title": "Test Volunteer Name"}}}
+        ]
+
+    def test_check_master_log_is_cached(self, mock_instance, mocker: MockerFixture):
+        get_all_sheets = mocker.patch(
+            "helpers.google_services.SheetsOperations.get_all_sheets"
+        )
+        get_all_sheets.return_value = [
+            {"properties": {"title": "Test Volunteer Name", "sheetId": 5}}
+        ]
+
+        assert mock_instance.check_master_log() is True
+        assert mock_instance.check_master_log() is True
+
+        get_all_sheets.assert_called_once()
+        assert mock_instance.get_master_sheet_ids() == {"Test Volunteer Name": 5}
+
+    def test_check_master_log_refreshes_on_miss(
+        self, mock_instance, mocker: MockerFixture
+    ):
+        get_all_sheets = mocker.patch(
+            "helpers.google_services.SheetsOperations.get_all_sheets"
+        )
+        get_all_sheets.side_effect = [
+            [{"properties": {"title": "asdfasdf", "sheetId": 1}}],
+            [
+                {"properties": {"title": "asdfasdf", "sheetId": 1}},
+                {"properties": {"title": "Test Volunteer Name", "sheetId": 5}},
+            ],
+        ]
+
+        assert mock_instance.check_master_log() is True
+        assert get_all_sheets.call_count == 2
+
+    def test_create_odv_sheet_updates_cached_map(
+        self, mock_instance, mocker: MockerFixture
+    ):
+        mocker.patch(
+            "helpers.google_services.SheetsOperations.get_all_sheets"
+        ).return_value = [{"properties": {"title": "asdfasdf", "sheetId": 1}}]
+        mocker.patch(
+            "helpers.google_services.SheetsOperations.batch_update_new_master_sheet"
+        )
+        m = mocker.MagicMock()
+        m.batchUpdate().execute.return_value = {
+            "replies": [{"addSheet": {"properties": {"sheetId": 12345678}}}]
+        }
+        mocker.patch.object(mock_instance, "sheet", new=m)
+
+        mock_instance.get_master_sheet_ids()
+        mock_instance.create_odv_sheet_in_master_spreadsheet()
+
+        assert mock_instance.get_master_sheet_ids() == {
+            "asdfasdf": 1,
+            "Test Volunteer Name": 12345678,
+        }
+
     def test_create_odv_sheet_in_master(self, mock_instance, mocker: MockerFixture):
         m = mocker.MagicMock()
         m.batchUpdate().execute.return_value = {
@@ -332,8 +277,387 @@ class TestSheetsOperations:
                     }
                 ]
             },
+            fields="replies.addSheet.properties.sheetId",
         )
 
         mock_instance.batch_update_new_master_sheet.assert_called_with(
             mock_instance.master_sheet_id, 12345678, mock_instance.volunteer_name
         )
+
+
+class TestShiftHours:
+    def test_same_day(self):
+        assert shift_hours(("02/01/2024", "3:00 PM"), "5:30 PM") == 0.10416667
+
+    def test_past_midnight(self):
+        assert shift_hours(("02/01/2024", "11:00 PM"), "1:00 AM") == 0.08333333
+
+    def test_dst_start(self):
+        # Clocks go forward at 2:00 AM on 03/10/2024 in Chicago
+        assert shift_hours(("03/10/2024", "1:00 AM"), "4:00 AM") == 0.08333333
+
+    def test_dst_end(self):
+        # Clocks go back at 2:00 AM on 11/03/2024 in Chicago
+        assert shift_hours(("11/02/2024", "11:00 PM"), "3:00 AM") == 0.20833333
+
+    def test_unparsable(self):
+        assert shift_hours(("Date", "Time In"), "5:00 PM") is None
+        assert shift_hours(("02/01/2024",), "5:00 PM") is None
+
+    def test_convert_hours_formulas(self, mocker: MockerFixture):
+        sheets_ops = SheetsOperations(mocker.MagicMock(), "Joe Shmoe", "individual")
+        values = sheets_ops.sheet.values()
+        values.get().execute.return_value = {
+            "values": [
+                ["02/01/2024", "3:00 PM", "5:00 PM", "=IF(C3-B3>0, C3-B3, 1 + (C3-B3))"],
+                ["02/02/2024", "3:00 PM", "5:00 PM", 0.08333333],
+                ["02/03/2024", "3:00 PM"],
+                ["02/04/2024", "11:00 PM", "1:00 AM", "=IF(C6-B6>0, C6-B6, 1 + (C6-B6))"],
+                ["", "bad", "1:00 AM", "=IF(C7-B7>0, C7-B7, 1 + (C7-B7))"],
+            ]
+        }
+
+        assert sheets_ops.convert_hours_formulas() == 2
+
+        values.get.assert_called_with(
+            spreadsheetId="individual",
+            range="Sheet1!A3:D",
+            majorDimension="ROWS",
+            valueRenderOption="FORMULA",
+            dateTimeRenderOption="FORMATTED_STRING",
+            fields="values",
+        )
+        values.batchUpdate.assert_called_once_with(
+            spreadsheetId="individual",
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [
+                    {"range": "Sheet1!D3", "values": [[0.08333333]]},
+                    {"range": "Sheet1!D6", "values": [[0.08333333]]},
+                ],
+            },
+            fields="totalUpdatedCells",
+        )
+
+
+class TestTimesheetBatchWriter:
+    @pytest.fixture
+    def writer(self, mocker: MockerFixture):
+        return TimesheetBatchWriter(mocker.MagicMock())
+
+    def test_range_prefix(self, mocker: MockerFixture):
+        sheets_ops = SheetsOperations(mocker.Mock(), "Test Volunteer Name", "123")
+
+        assert sheets_ops.range_prefix() == "Sheet1"
+        assert sheets_ops.range_prefix(master=True) == "'Test Volunteer Name'"
+
+    def test_plan_appends_after_existing_rows(self, writer):
+        writer.add_clock_in("sheet", "Sheet1", ("02/01/2024", "3:00 PM"))
+        writer.add_clock_out("sheet", "Sheet1", "5:00 PM")
+        writer.add_clock_in("sheet", "Sheet1", ("02/01/2024", "6:00 PM"))
+
+        assert writer.plan("sheet", {"Sheet1": 4}) == [
+            {"range": "Sheet1!A5:B5", "values": [["02/01/2024", "3:00 PM"]]},
+            {"range": "Sheet1!C5:D5", "values": [["5:00 PM", 0.08333333]]},
+            {"range": "Sheet1!A6:B6", "values": [["02/01/2024", "6:00 PM"]]},
+        ]
+
+    def test_plan_empty_sheet_starts_on_row_3(self, writer):
+        writer.add_clock_in("master", "'Joe'", ("02/01/2024", "3:00 PM"))
+        writer.add_clock_out("master", "'Jane'", "5:00 PM")
+
+        assert writer.plan("master", {"'Joe'": 2, "'Jane'": 2}) == [
+            {"range": "'Joe'!A3:B3", "values": [["02/01/2024", "3:00 PM"]]},
+            {
+                "range": "'Jane'!C3:D3",
+                "values": [["5:00 PM", "=IF(C3-B3>0, C3-B3, 1 + (C3-B3))"]],
+            },
+        ]
+
+    def test_plan_skips_entries_already_written(self, writer):
+        writer.add_clock_in("sheet", "Sheet1", ("02/01/2024", "9:00 AM"))
+        writer.add_clock_out("sheet", "Sheet1", "11:00 AM")
+        writer.add_clock_in("sheet", "Sheet1", ("02/01/2024", "3:00 PM"))
+        writer.add_clock_out("sheet", "Sheet1", "5:00 PM")
+
+        # The sheet formats dates without leading zeros
+        last_row = {"Sheet1": ("2/1/2024", "3:00 PM")}
+        assert writer.plan("sheet", {"Sheet1": 6}, last_row) == [
+            {"range": "Sheet1!C6:D6", "values": [["5:00 PM", 0.08333333]]},
+        ]
+
+    def test_execute_replay_writes_nothing_twice(self, writer):
+        values = writer.sheet.values()
+        values.batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["02/01/2024", "3:00 PM"]]}]
+        }
+        set_row_pointer("sheet", "Sheet1", 7)
+
+        writer.add_clock_in("sheet", "Sheet1", ("02/01/2024", "3:00 PM"))
+
+        assert writer.execute() == {"sheet": {}}
+        values.batchUpdate.assert_not_called()
+        assert get_row_pointer("sheet", "Sheet1") == 7
+
+    def test_execute_one_read_and_write_per_spreadsheet(self, writer):
+        values = writer.sheet.values()
+        values.batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["title"], ["header"], ["a", "b", "c"]]}, {}]
+        }
+
+        writer.add_clock_in("master", "'Joe'", ("02/01/2024", "3:00 PM"))
+        writer.add_clock_in("master", "'Jane'", ("02/01/2024", "3:05 PM"))
+
+        writer.execute()
+
+        values.batchGet.assert_called_with(
+            spreadsheetId="master",
+            ranges=["'Joe'!A1:C", "'Jane'!A1:C"],
+            majorDimension="ROWS",
+            fields="valueRanges.values",
+        )
+        values.batchUpdate.assert_called_with(
+            spreadsheetId="master",
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [
+                    {"range": "'Joe'!A4:B4", "values": [["02/01/2024", "3:00 PM"]]},
+                    {"range": "'Jane'!A3:B3", "values": [["02/01/2024", "3:05 PM"]]},
+                ],
+            },
+            fields="totalUpdatedCells",
+        )
+
+    def test_execute_reads_from_row_pointers(self, writer):
+        set_row_pointer("master", "'Joe'", 1042)
+        values = writer.sheet.values()
+        values.batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["02/01/2024", "9:00 AM", "11:00 AM"]]}]
+        }
+
+        writer.add_clock_in("master", "'Joe'", ("02/01/2024", "3:00 PM"))
+        writer.add_clock_out("master", "'Joe'", "5:00 PM")
+
+        writer.execute()
+
+        values.batchGet.assert_called_with(
+            spreadsheetId="master",
+            ranges=["'Joe'!A1042:C"],
+            majorDimension="ROWS",
+            fields="valueRanges.values",
+        )
+        assert get_row_pointer("master", "'Joe'") == 1043
+
+    def test_execute_writes_spreadsheets_on_own_clients(self, mocker: MockerFixture):
+        thread_service = mocker.MagicMock()
+        get_service = mocker.patch(
+            "helpers.google_services.get_service", return_value=thread_service
+        )
+        writer = TimesheetBatchWriter(mocker.MagicMock(), credentials="creds")
+        set_row_pointer("individual", "Sheet1", 7)
+        set_row_pointer("master", "'Joe'", 42)
+
+        thread_service.spreadsheets().values().batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["02/01/2024", "3:00 PM"]]}]
+        }
+        thread_service.spreadsheets().values().batchGet.reset_mock()
+
+        writer.add_clock_out("individual", "Sheet1", "5:00 PM")
+        writer.add_clock_out("master", "'Joe'", "5:00 PM")
+
+        writer.execute()
+
+        assert get_service.call_count == 2
+        get_service.assert_called_with("sheets", "v4", "creds")
+        assert thread_service.spreadsheets().values().batchUpdate.call_count == 2
+        assert thread_service.spreadsheets().values().batchGet.call_count == 2
+        writer.sheet.values().batchUpdate.assert_not_called()
+
+    def test_execute_raises_first_failure(self, mocker: MockerFixture):
+        thread_service = mocker.MagicMock()
+        thread_service.spreadsheets().values().batchUpdate().execute.side_effect = (
+            RuntimeError("Sheets is down")
+        )
+        mocker.patch("helpers.google_services.get_service", return_value=thread_service)
+        writer = TimesheetBatchWriter(mocker.MagicMock(), credentials="creds")
+        set_row_pointer("individual", "Sheet1", 7)
+        set_row_pointer("master", "'Joe'", 42)
+
+        writer.add_clock_in("individual", "Sheet1", ("02/01/2024", "3:00 PM"))
+        writer.add_clock_in("master", "'Joe'", ("02/01/2024", "3:00 PM"))
+
+        with pytest.raises(RuntimeError, match="Sheets is down"):
+            writer.execute()
+
+    def test_record_clock_in_after_last_row(self, mocker: MockerFixture):
+        sheets_ops = SheetsOperations(mocker.MagicMock(), "Joe Shmoe", "individual")
+        values = sheets_ops.sheet.values()
+        values.batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["01/31/2024", "3:00 PM", "5:00 PM"]]}]
+        }
+        set_row_pointer("individual", "Sheet1", 7)
+        set_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Joe Shmoe'", 42)
+        values.batchGet.reset_mock()
+
+        sheets_ops.record_clock_in(("02/01/2024", "3:00 PM"))
+
+        assert values.batchGet.call_count == 2
+        values.batchUpdate.assert_any_call(
+            spreadsheetId="individual",
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [
+                    {"range": "Sheet1!A8:B8", "values": [["02/01/2024", "3:00 PM"]]}
+                ],
+            },
+            fields="totalUpdatedCells",
+        )
+        values.batchUpdate.assert_any_call(
+            spreadsheetId=MASTER_LOG_SPREADSHEET_ID,
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [
+                    {
+                        "range": "'Joe Shmoe'!A43:B43",
+                        "values": [["02/01/2024", "3:00 PM"]],
+                    }
+                ],
+            },
+            fields="totalUpdatedCells",
+        )
+        assert get_row_pointer("individual", "Sheet1") == 8
+        assert get_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Joe Shmoe'") == 43
+
+    def test_record_clock_out_updates_last_rows(self, mocker: MockerFixture):
+        sheets_ops = SheetsOperations(mocker.MagicMock(), "Joe Shmoe", "individual")
+        sheets_ops.sheet.values().batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["02/01/2024", "3:00 PM"]]}]
+        }
+        set_row_pointer("individual", "Sheet1", 8)
+        set_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Joe Shmoe'", 43)
+
+        sheets_ops.record_clock_out("5:00 PM")
+
+        sheets_ops.sheet.values().batchUpdate.assert_any_call(
+            spreadsheetId="individual",
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [
+                    {
+                        "range": "Sheet1!C8:D8",
+                        "values": [["5:00 PM", 0.08333333]],
+                    }
+                ],
+            },
+            fields="totalUpdatedCells",
+        )
+        assert get_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Joe Shmoe'") == 43
+
+    def test_execute_corrects_stale_row_pointer(self, writer):
+        set_row_pointer("sheet", "Sheet1", 10)
+        values = writer.sheet.values()
+        values.batchGet().execute.return_value = {
+            "valueRanges": [
+                {
+                    "values": [
+                        ["02/01/2024", "3:00 PM", "5:00 PM"],
+                        ["02/02/2024", "3:00 PM"],
+                    ]
+                }
+            ]
+        }
+
+        writer.add_clock_out("sheet", "Sheet1", "5:00 PM")
+        writer.execute()
+
+        values.batchUpdate.assert_called_with(
+            spreadsheetId="sheet",
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [
+                    {"range": "Sheet1!C11:D11", "values": [["5:00 PM", 0.08333333]]}
+                ],
+            },
+            fields="totalUpdatedCells",
+        )
+        assert get_row_pointer("sheet", "Sheet1") == 11
+
+    def test_execute_reads_clock_in_of_last_row(self, writer):
+        set_row_pointer("sheet", "Sheet1", 7)
+        values = writer.sheet.values()
+        values.batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["02/01/2024", "11:00 PM"]]}]
+        }
+
+        writer.add_clock_out("sheet", "Sheet1", "1:00 AM")
+        writer.execute()
+
+        values.batchGet.assert_called_with(
+            spreadsheetId="sheet",
+            ranges=["Sheet1!A7:C"],
+            majorDimension="ROWS",
+            fields="valueRanges.values",
+        )
+        values.batchUpdate.assert_called_with(
+            spreadsheetId="sheet",
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [{"range": "Sheet1!C7:D7", "values": [["1:00 AM", 0.08333333]]}],
+            },
+            fields="totalUpdatedCells",
+        )
+
+    def test_execute_checks_row_pointer_before_clock_out(self, writer):
+        set_row_pointer("sheet", "Sheet1", 7)
+        values = writer.sheet.values()
+        values.batchGet().execute.side_effect = [
+            {"valueRanges": [{"values": [["01/31/2024", "3:00 PM", "5:00 PM"]]}]},
+            {"valueRanges": [{"values": [["02/01/2024", "3:00 PM"]]}]},
+        ]
+
+        writer.add_clock_in("sheet", "Sheet1", ("02/01/2024", "3:00 PM"))
+        writer.execute()
+        writer.add_clock_out("sheet", "Sheet1", "5:00 PM")
+        writer.execute()
+
+        values.batchGet.assert_called_with(
+            spreadsheetId="sheet",
+            ranges=["Sheet1!A8:C"],
+            majorDimension="ROWS",
+            fields="valueRanges.values",
+        )
+        writer.sheet.values().batchUpdate.assert_called_with(
+            spreadsheetId="sheet",
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [{"range": "Sheet1!C8:D8", "values": [["5:00 PM", 0.08333333]]}],
+            },
+            fields="totalUpdatedCells",
+        )
+
+    def test_record_clock_in_does_not_overwrite_rows_written_elsewhere(
+        self, mocker: MockerFixture
+    ):
+        # Row 11 was written by another container after this one saw row 10
+        sheets_ops = SheetsOperations(mocker.MagicMock(), "Joe Shmoe", "individual")
+        values = sheets_ops.sheet.values()
+        values.batchGet().execute.return_value = {
+            "valueRanges": [
+                {
+                    "values": [
+                        ["01/30/2024", "3:00 PM", "5:00 PM"],
+                        ["01/31/2024", "3:00 PM", "5:00 PM"],
+                    ]
+                }
+            ]
+        }
+        set_row_pointer("individual", "Sheet1", 10)
+        set_row_pointer(MASTER_LOG_SPREADSHEET_ID, "'Joe Shmoe'", 10)
+
+        sheets_ops.record_clock_in(("02/01/2024", "3:00 PM"))
+
+        written = [
+            call.kwargs["body"]["data"][0]["range"]
+            for call in values.batchUpdate.call_args_list
+        ]
+        assert sorted(written) == ["'Joe Shmoe'!A12:B12", "Sheet1!A12:B12"]
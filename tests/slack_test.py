@@ -6,7 +6,22 @@ from pytest_mock import MockerFixture
 import requests_mock
 import requests
 
-from helpers.slack import SlackOps, lookup_by_email, lookup_by_name
+from helpers.slack import (
+    SLACK_ID_MISS_TTL,
+    SLACK_ID_TTL,
+    SlackLookupError,
+    SlackOps,
+    lookup_by_email,
+    lookup_by_name,
+    slack_ids,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_slack_ids():
+    slack_ids.clear()
+    yield
+    slack_ids.clear()
 
 
 @pytest.fixture
@@ -250,10 +265,94 @@ def test_get_slack_user_id_by_email(email_only_user: SlackOps):
         assert email_only_user.get_slack_user_id() == "U03P4JKB7PE"
 
 
+def test_get_slack_user_id_cached(mocker: MockerFixture):
+    by_email = mocker.patch("helpers.slack.lookup_by_email", return_value="U1")
+    set_cache = mocker.spy(slack_ids, "set")
+
+    assert SlackOps("Joe@Example.com", "Joe", "Schmoe", 1).get_slack_user_id() == "U1"
+    assert SlackOps("joe@example.com", "Joe", "Schmoe").get_slack_user_id() == "U1"
+    assert SlackOps("new@example.com", "Joe", "Schmoe", 1).get_slack_user_id() == "U1"
+
+    by_email.assert_called_once()
+    set_cache.assert_any_call("user:1", {"id": "U1"}, SLACK_ID_TTL)
+    set_cache.assert_any_call("email:joe@example.com", {"id": "U1"}, SLACK_ID_TTL)
+
+
+def test_get_slack_user_id_miss_cached(mocker: MockerFixture):
+    by_email = mocker.patch("helpers.slack.lookup_by_email", return_value=None)
+    by_name = mocker.patch("helpers.slack.lookup_by_name", return_value=None)
+    set_cache = mocker.spy(slack_ids, "set")
+
+    slack_user = SlackOps("joe@example.com", "Joe", "Schmoe", 1)
+    assert slack_user.get_slack_user_id() is None
+    assert slack_user.get_slack_user_id() is None
+
+    by_email.assert_called_once()
+    by_name.assert_called_once()
+    set_cache.assert_any_call("user:1", {"id": None}, SLACK_ID_MISS_TTL)
+
+
+def test_get_slack_user_id_error_not_cached(mocker: MockerFixture):
+    set_cache = mocker.spy(slack_ids, "set")
+    slack_user = SlackOps("joe@example.com", "Joe", "Schmoe", 1)
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "https://slack.com/api/users.lookupByEmail",
+            status_code=200,
+            json={"ok": False, "error": "ratelimited"},
+        )
+        assert slack_user.get_slack_user_id() is None
+
+        m.get(
+            "https://slack.com/api/users.lookupByEmail",
+            status_code=200,
+            json={"ok": True, "user": {"id": "U1"}},
+        )
+        assert slack_user.get_slack_user_id() == "U1"
+
+    set_cache.assert_any_call("user:1", {"id": "U1"}, SLACK_ID_TTL)
+    assert mocker.call("user:1", {"id": None}, SLACK_ID_MISS_TTL) not in (
+        set_cache.call_args_list
+    )
+
+
+def test_get_slack_user_id_name_lookup_error_not_cached(mocker: MockerFixture):
+    set_cache = mocker.spy(slack_ids, "set")
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "https://slack.com/api/users.lookupByEmail",
+            status_code=200,
+            json={"ok": False, "error": "users_not_found"},
+        )
+        m.get("https://slack.com/api/users.list", status_code=503)
+
+        slack_user = SlackOps("joe@example.com", "Joe", "Schmoe", 1)
+        assert slack_user.get_slack_user_id() is None
+
+    set_cache.assert_not_called()
+
+
+def test_lookup_by_email_strict_raises_on_error():
+    session = requests.Session()
+
+    with requests_mock.Mocker(session=session) as m:
+        m.get(
+            "https://slack.com/api/users.lookupByEmail",
+            status_code=200,
+            json={"ok": False, "error": "invalid_auth"},
+        )
+
+        assert lookup_by_email(session, "joe@example.com") is None
+        with pytest.raises(SlackLookupError):
+            lookup_by_email(session, "joe@example.com", strict=True)
+
+
 def test_clock_in_slack_message_with_user_id(
     user_with_email: SlackOps, mocker: MockerFixture
 ):
-    mocker.patch("helpers.slack.requests.post").return_value.json.return_value = {
+    mocker.patch("helpers.slack.http_client.post").return_value.json.return_value = {
         "ok": True,
     }
 
@@ -282,7 +381,7 @@ def test_clock_in_slack_message_with_user_id(
 
 
 def test_clock_in_slack_message_no_user_id(no_user: SlackOps, mocker: MockerFixture):
-    mocker.patch("helpers.slack.requests.post").return_value = mocker.Mock()
+    mocker.patch("helpers.slack.http_client.post").return_value = mocker.Mock()
 
     assert no_user.clock_in_slack_message(slack_id=None) == {
         "blocks": [
@@ -312,7 +411,7 @@ def test_clock_in_slack_message_no_user_id(no_user: SlackOps, mocker: MockerFixt
 def test_clock_out_slack_message_with_user_id(
     user_with_email: SlackOps, mocker: MockerFixture
 ):
-    mocker.patch("helpers.slack.requests.post").return_value.json.return_value = {
+    mocker.patch("helpers.slack.http_client.post").return_value.json.return_value = {
         "ok": True,
     }
 
@@ -341,7 +440,7 @@ def test_clock_out_slack_message_with_user_id(
 
 
 def test_clock_out_slack_message_no_user_id(no_user: SlackOps, mocker: MockerFixture):
-    mocker.patch("helpers.slack.requests.post").return_value = mocker.Mock()
+    mocker.patch("helpers.slack.http_client.post").return_value = mocker.Mock()
 
     assert no_user.clock_out_slack_message(slack_id=None) == {
         "blocks": [
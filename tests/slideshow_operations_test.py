@@ -8,9 +8,18 @@ from googleapiclient.discovery import Resource
 
 from helpers.google_services import (
     DriveOperations,
+    folder_ids,
+    update_slideshows,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_folder_ids():
+    folder_ids.clear()
+    yield
+    folder_ids.clear()
+
+
 class TestSlideshowOperations:
     @pytest.fixture
     def drive_service(self, mocker: MockerFixture):
@@ -405,3 +414,44 @@ class TestSlideshowOperations:
         assert slideshow_operations_with_slideshow_folder.slideshow_folder_id == "123"
 
         slideshow_operations_with_slideshow_folder.trash_slide.assert_not_called()
+
+
+def test_update_slideshows_batches_searches_and_changes(mocker: MockerFixture):
+    drive_service = mocker.MagicMock()
+    mocker.patch.object(DriveOperations, "slideshow_folder_id", new="lobby")
+    mocker.patch.object(DriveOperations, "volunteer_slides_folder_id", new="slides")
+    batches = []
+
+    class FakeBatch:
+        def __init__(self, _drive_service):
+            self.keys = []
+            batches.append(self)
+
+        def add(self, key, _request):
+            self.keys.append(key)
+
+        def execute(self):
+            if len(batches) == 1:
+                return {key: {"files": [{"id": f"slide-{key}"}]} for key in self.keys}
+            return {key: {} for key in self.keys}
+
+    mocker.patch("helpers.google_services.DriveBatch", FakeBatch)
+
+    arriving = DriveOperations(drive_service, "Arriving Volunteer")
+    known = DriveOperations(drive_service, "Known Volunteer", "known-slide")
+    leaving = DriveOperations(drive_service, "Leaving Volunteer")
+
+    failures = update_slideshows([(arriving, True), (known, True), (leaving, False)])
+
+    assert failures == {}
+    assert [batch.keys for batch in batches] == [["0", "2"], ["1", "0", "2"]]
+    assert arriving.slide_file_id == "slide-0"
+    drive_service.files().copy.assert_any_call(
+        fileId="known-slide",
+        body={"name": "Known Volunteer", "parents": ["lobby"]},
+        fields="id",
+        supportsAllDrives=True,
+    )
+    drive_service.files().update.assert_called_with(
+        fileId="slide-2", body={"trashed": True}, fields="id", supportsAllDrives=True
+    )
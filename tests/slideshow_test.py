@@ -0,0 +1,184 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import pytest
+from pytest_mock import MockerFixture
+
+from helpers.cache import MemoryStore, SQLiteStore, TieredStore
+from helpers.google_services import DriveOperations
+from helpers.slideshow import (
+    ON_DUTY_TTL,
+    on_duty_store,
+    on_duty_volunteers,
+    set_on_duty,
+    set_off_duty,
+    slideshow_mode,
+    reconcile_slideshow,
+    purge_trashed_slides,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_on_duty():
+    on_duty_store.clear()
+    yield
+    on_duty_store.clear()
+
+
+@pytest.fixture
+def batches(mocker: MockerFixture):
+    batches = []
+
+    class FakeBatch:
+        def __init__(self, _drive_service):
+            self.requests = {}
+            batches.append(self)
+
+        def add(self, key, request):
+            self.requests[key] = request
+
+        def execute(self):
+            return {key: {"files": []} for key in self.requests}
+
+    mocker.patch("helpers.slideshow.DriveBatch", FakeBatch)
+    return batches
+
+
+@pytest.fixture
+def folders(mocker: MockerFixture):
+    mocker.patch.object(DriveOperations, "slideshow_folder_id", new="lobby")
+    mocker.patch.object(DriveOperations, "volunteer_slides_folder_id", new="slides")
+
+
+def test_on_duty_state(mocker: MockerFixture):
+    mocker.patch("helpers.slideshow.time.time", return_value=1000)
+
+    set_on_duty(1, "Joe Shmoe", 900, "slide-1")
+    set_on_duty(2, "Jane Doe", 950)
+    set_off_duty(2)
+
+    assert on_duty_volunteers() == {
+        "1": {"name": "Joe Shmoe", "since": 900, "slideId": "slide-1"}
+    }
+    # Volunteers who never clock out drop off after the longest shift
+    assert on_duty_volunteers(900 + ON_DUTY_TTL) == {}
+
+
+def test_unknown_slideshow_mode(monkeypatch):
+    monkeypatch.setenv("SLIDESHOW_MODE", "sideways")
+
+    with pytest.raises(ValueError):
+        slideshow_mode()
+
+
+def test_slideshow_mode_needs_shared_cache(monkeypatch):
+    monkeypatch.setenv("SLIDESHOW_MODE", "reconcile")
+    monkeypatch.setenv("CACHE_BACKEND", "sqlite")
+
+    with pytest.raises(ValueError):
+        slideshow_mode()
+
+    monkeypatch.setenv("CACHE_BACKEND", "dynamodb")
+    assert slideshow_mode() == "reconcile"
+
+
+def test_on_duty_state_is_shared_by_containers(tmp_path, mocker: MockerFixture):
+    path = str(tmp_path / "cache.sqlite3")
+    mocker.patch(
+        "helpers.slideshow.on_duty_store",
+        TieredStore(MemoryStore(), SQLiteStore(path, "on_duty")),
+    )
+    set_on_duty(1, "Joe Shmoe", 900)
+
+    # Another container clocks a second volunteer in and the first one out
+    mocker.patch(
+        "helpers.slideshow.on_duty_store",
+        TieredStore(MemoryStore(), SQLiteStore(path, "on_duty")),
+    )
+    mocker.patch("helpers.slideshow.time.time", return_value=1000)
+    set_on_duty(2, "Jane Doe", 950)
+    set_off_duty(1)
+
+    assert on_duty_volunteers() == {
+        "2": {"name": "Jane Doe", "since": 950, "slideId": None}
+    }
+
+
+def test_reconcile_applies_difference_in_one_batch(
+    batches, folders, mocker: MockerFixture
+):  # pylint: disable=unused-argument
+    drive_service = mocker.MagicMock()
+    drive_service.files().list().execute.return_value = {
+        "files": [
+            {"id": "copy-1", "name": "Joe Shmoe", "appProperties": {"opUserId": "1"}},
+            {"id": "dup-1", "name": "Joe Shmoe", "appProperties": {"opUserId": "1"}},
+            {"id": "copy-2", "name": "Jane Doe", "appProperties": {"opUserId": "2"}},
+            {"id": "legacy-4", "name": "Pat Lee"},
+            {"id": "announcement", "name": "Open House.png"},
+        ]
+    }
+
+    results = reconcile_slideshow(
+        drive_service,
+        {
+            "1": {"name": "Joe Shmoe", "slideId": "slide-1"},
+            "3": {"name": "Sam Smith", "slideId": "slide-3"},
+            "4": {"name": "Pat Lee", "slideId": None},
+        },
+    )
+
+    assert results == {"copied": 1, "trashed": 2, "failed": 0}
+    drive_service.files().list.assert_called_with(
+        q='"lobby" in parents and trashed=false',
+        fields="nextPageToken, files(id, name, appProperties)",
+        pageSize=1000,
+        pageToken=None,
+        supportsAllDrives=True,
+        driveId=mocker.ANY,
+        corpora="drive",
+        includeItemsFromAllDrives=True,
+    )
+    changes, searches = batches
+    assert not searches.requests
+    assert list(changes.requests) == ["trash:dup-1", "trash:copy-2", "copy:3"]
+    drive_service.files().copy.assert_called_with(
+        fileId="slide-3",
+        body={
+            "name": "Sam Smith",
+            "parents": ["lobby"],
+            "appProperties": {"opUserId": "3"},
+        },
+        fields="id",
+        supportsAllDrives=True,
+    )
+
+
+def test_reconcile_searches_unknown_slides(batches, folders, mocker: MockerFixture):
+    # pylint: disable=unused-argument
+    drive_service = mocker.MagicMock()
+    drive_service.files().list().execute.return_value = {"files": []}
+
+    results = reconcile_slideshow(
+        drive_service, {"5": {"name": "New Volunteer", "slideId": None}}
+    )
+
+    changes, searches = batches
+    assert list(searches.requests) == ["5"]
+    assert not changes.requests
+    assert results == {"copied": 0, "trashed": 0, "failed": 0}
+
+
+def test_purge_deletes_only_stamped_copies(batches, folders, mocker: MockerFixture):
+    # pylint: disable=unused-argument
+    drive_service = mocker.MagicMock()
+    drive_service.files().list().execute.return_value = {
+        "files": [
+            {"id": "copy-1", "appProperties": {"opUserId": "1"}},
+            {"id": "announcement"},
+        ]
+    }
+
+    assert purge_trashed_slides(drive_service) == 1
+    assert list(batches[0].requests) == ["copy-1"]
+    drive_service.files().delete.assert_called_with(
+        fileId="copy-1", supportsAllDrives=True
+    )
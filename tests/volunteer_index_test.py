@@ -0,0 +1,195 @@
+# pylint: disable=missing-docstring, redefined-outer-name
+
+import pytest
+from pytest_mock import MockerFixture
+from googleapiclient.errors import HttpError
+
+from helpers.google_services import DriveOperations, folder_ids, master_sheets
+from helpers.volunteer_index import (
+    volunteer_index,
+    get_volunteer_resources,
+    update_volunteer_resources,
+    forget_volunteer_resources,
+    refresh_volunteer_index,
+    stale_resource_error,
+)
+from lambda_function import get_sheets_operations
+
+from config import MASTER_LOG_SPREADSHEET_ID
+
+
+@pytest.fixture(autouse=True)
+def clear_stores():
+    volunteer_index.clear()
+    folder_ids.clear()
+    master_sheets.clear()
+    yield
+    volunteer_index.clear()
+    folder_ids.clear()
+    master_sheets.clear()
+
+
+def test_update_merges_and_removes_fields():
+    update_volunteer_resources(1, timesheetId="sheet", slideId="slide")
+    update_volunteer_resources(1, slideId=None, masterTabs={"master": 7})
+
+    assert get_volunteer_resources(1) == {
+        "timesheetId": "sheet",
+        "masterTabs": {"master": 7},
+    }
+
+    forget_volunteer_resources(1)
+
+    assert get_volunteer_resources(1) == {}
+
+
+def test_refresh_indexes_with_one_listing_of_each_kind(mocker: MockerFixture):
+    drive_service = mocker.MagicMock()
+    sheets_service = mocker.MagicMock()
+    mocker.patch(
+        "helpers.volunteer_index.list_timesheets",
+        return_value=[
+            {
+                "id": "sheet-1",
+                "name": "ODV Timesheet - Joe Shmoe",
+                "appProperties": {"opUserId": "1"},
+            },
+            {
+                "id": "sheet-2",
+                "name": "ODV Timesheet - Jane Doe",
+                "appProperties": {"opUserId": "2"},
+            },
+            {"id": "sheet-3", "name": "ODV Timesheet - No Timesheet"},
+        ],
+    )
+    mocker.patch.object(
+        DriveOperations, "volunteer_slides_folder_id", new="slides-folder"
+    )
+    drive_service.files().list().execute.return_value = {
+        "files": [
+            {
+                "id": "slide-1",
+                "name": "ODV - Joe Shmoe.png",
+                "appProperties": {"opUserId": "1"},
+            },
+            {"id": "slide-2", "name": "ODV - Jane Doe.png"},
+        ]
+    }
+    sheets_service.spreadsheets().get().execute.return_value = {
+        "sheets": [{"properties": {"title": "Joe Shmoe", "sheetId": 7}}]
+    }
+    update_volunteer_resources(
+        2,
+        slideId="old-slide",
+        masterTabs={
+            "other": {"title": "Jane Doe", "sheetId": 3},
+            "renamed": {"title": "Jane Smith", "sheetId": 4},
+        },
+    )
+
+    indexed = refresh_volunteer_index(
+        drive_service,
+        sheets_service,
+        {
+            1: {"firstName": "Joe", "lastName": "Shmoe"},
+            2: {"firstName": "Jane", "lastName": "Doe"},
+            3: {"firstName": "No", "lastName": "Timesheet"},
+        },
+    )
+
+    assert indexed == 2
+    assert get_volunteer_resources(1) == {
+        "timesheetId": "sheet-1",
+        "slideId": "slide-1",
+        "masterTabs": {
+            MASTER_LOG_SPREADSHEET_ID: {"title": "Joe Shmoe", "sheetId": 7}
+        },
+    }
+    # Tabs of other Master Logs are kept, and slides that no longer exist or
+    # aren't stamped are dropped. Unstamped timesheets aren't matched by name.
+    assert get_volunteer_resources(2) == {
+        "timesheetId": "sheet-2",
+        "masterTabs": {"other": {"title": "Jane Doe", "sheetId": 3}},
+    }
+    assert get_volunteer_resources(3) == {}
+
+
+def test_indexed_timesheet_skips_search(mocker: MockerFixture):
+    drive_ops = mocker.Mock()
+    op_user = mocker.Mock(user_id=1, full_name="Joe Shmoe")
+    update_volunteer_resources(1, timesheetId="sheet-1")
+
+    sheets_ops = get_sheets_operations(drive_ops, mocker.MagicMock(), op_user)
+
+    assert sheets_ops.volunteer_timesheet_id == "sheet-1"
+    drive_ops.check_timesheet_exists.assert_not_called()
+
+
+def test_found_timesheet_is_indexed(mocker: MockerFixture):
+    drive_ops = mocker.Mock()
+    drive_ops.check_timesheet_exists.return_value = [{"id": "sheet-1"}]
+    op_user = mocker.Mock(user_id=1, full_name="Joe Shmoe")
+
+    get_sheets_operations(drive_ops, mocker.MagicMock(), op_user)
+
+    assert get_volunteer_resources(1) == {"timesheetId": "sheet-1"}
+
+
+def test_stale_slide_id_is_searched_again(mocker: MockerFixture):
+    drive_service = mocker.MagicMock()
+    mocker.patch.object(DriveOperations, "slideshow_folder_id", new="lobby")
+    mocker.patch.object(DriveOperations, "volunteer_slides_folder_id", new="slides")
+    mocker.patch.object(DriveOperations, "invalidate_folder_ids")
+    drive_service.files().list().execute.return_value = {"files": []}
+    drive_service.files().copy().execute.side_effect = [
+        HttpError(mocker.Mock(status=404), b"File not found"),
+        {},
+    ]
+    drive_ops = DriveOperations(drive_service, "Joe Shmoe", "old-slide")
+    mocker.patch.object(
+        drive_ops, "slide_search", return_value={"files": [{"id": "new-slide"}]}
+    )
+
+    drive_ops.add_volunteer_to_slideshow()
+
+    assert drive_ops.slide_file_id == "new-slide"
+    drive_service.files().copy.assert_called_with(
+        fileId="new-slide",
+        body={"name": "Joe Shmoe", "parents": ["lobby"]},
+        fields="id",
+        supportsAllDrives=True,
+    )
+
+
+def test_refresh_matches_renamed_volunteer_by_stamp(mocker: MockerFixture):
+    mocker.patch(
+        "helpers.volunteer_index.list_timesheets",
+        return_value=[
+            {
+                "id": "sheet-1",
+                "name": "ODV Timesheet - Joe Shmoe",
+                "appProperties": {"opUserId": "1"},
+            },
+        ],
+    )
+    mocker.patch.object(DriveOperations, "volunteer_slides_folder_id", new=None)
+
+    indexed = refresh_volunteer_index(
+        mocker.MagicMock(),
+        mocker.MagicMock(),
+        {"1": {"firstName": "Joseph", "lastName": "Shmoe"}},
+    )
+
+    assert indexed == 1
+    assert get_volunteer_resources(1)["timesheetId"] == "sheet-1"
+
+
+def test_stale_resource_error(mocker: MockerFixture):
+    assert stale_resource_error(HttpError(mocker.Mock(status=404), b"Not found"))
+    assert stale_resource_error(
+        HttpError(mocker.Mock(status=400), b"Unable to parse range: 'Joe'!A3:C")
+    )
+    assert not stale_resource_error(
+        HttpError(mocker.Mock(status=400), b"Invalid value")
+    )
+    assert not stale_resource_error(HttpError(mocker.Mock(status=500), b"Error"))